@@ -0,0 +1,141 @@
+"""Project loading benchmark for large directory-per-model projects.
+
+Generates a synthetic v5 project — ``--models`` model directories with
+``--columns`` columns each, plus views, cubes and a relationship per model
+pair — and times ``build_json`` and ``validate_project`` under three
+loaders:
+
+* ``sequential`` — one file at a time with the pure-Python ``SafeLoader``,
+  the behaviour before parallel loading,
+* ``libyaml`` — one file at a time with ``CSafeLoader``,
+* ``parallel`` — ``CSafeLoader`` on the prefetch thread pool (the default).
+
+Each configuration reports the best of ``--repeat`` runs (default 1), cold (no
+``target/.build_cache.json`` involved), and checks that it produces the
+same manifest as ``sequential``.
+
+Usage (from ``core/wren``)::
+
+    uv run --no-sync python benchmarks/context_load.py
+    uv run --no-sync python benchmarks/context_load.py --models 5000 --columns 40
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import yaml
+
+from wren import context_cache
+from wren.context import build_json, validate_project
+
+
+def _write_project(root: Path, models: int, columns: int) -> None:
+    (root / "wren_project.yml").write_text(
+        "schema_version: 5\nname: bench\nversion: '1.0'\n"
+        "catalog: wren\nschema: public\ndata_source: postgres\n",
+        encoding="utf-8",
+    )
+    rels = []
+    for i in range(models):
+        name = f"model_{i:05d}"
+        cols = [
+            {
+                "name": f"col_{j}",
+                "type": "VARCHAR" if j % 3 else "INTEGER",
+                "not_null": j == 0,
+                "properties": {"description": f"Column {j} of {name}."},
+            }
+            for j in range(columns)
+        ]
+        model = {
+            "name": name,
+            "table_reference": {"catalog": "", "schema": "public", "table": name},
+            "columns": cols,
+            "primary_key": "col_0",
+            "properties": {"description": f"Synthetic model {i}."},
+        }
+        d = root / "models" / name
+        d.mkdir(parents=True)
+        (d / "metadata.yml").write_text(yaml.safe_dump(model), encoding="utf-8")
+        if i % 2:
+            rels.append(
+                {
+                    "name": f"rel_{i:05d}",
+                    "models": [f"model_{i - 1:05d}", name],
+                    "join_type": "MANY_TO_ONE",
+                    "condition": f"model_{i - 1:05d}.col_0 = {name}.col_0",
+                }
+            )
+        if i % 10 == 0:
+            v = root / "views" / f"view_{i:05d}"
+            v.mkdir(parents=True)
+            (v / "metadata.yml").write_text(
+                yaml.safe_dump({"name": f"view_{i:05d}", "properties": {}}),
+                encoding="utf-8",
+            )
+            (v / "sql.yml").write_text(
+                yaml.safe_dump({"statement": f"SELECT * FROM {name}"}),
+                encoding="utf-8",
+            )
+    (root / "relationships.yml").write_text(
+        yaml.safe_dump({"relationships": rels}), encoding="utf-8"
+    )
+
+
+@contextmanager
+def _loader(mode: str):
+    fast, threshold = context_cache._FAST_LOADER, context_cache.PREFETCH_MIN_FILES
+    if mode == "sequential":
+        context_cache._FAST_LOADER = yaml.SafeLoader
+    if mode != "parallel":
+        context_cache.PREFETCH_MIN_FILES = 1 << 30
+    try:
+        yield
+    finally:
+        context_cache._FAST_LOADER = fast
+        context_cache.PREFETCH_MIN_FILES = threshold
+
+
+def _best(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--models", type=int, default=2000)
+    parser.add_argument("--columns", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        _write_project(root, args.models, args.columns)
+        print(
+            f"{args.models} models x {args.columns} columns, "
+            f"libyaml {'available' if yaml.__with_libyaml__ else 'missing'}"
+        )
+        print(f"{'loader':<12}{'build_json':>12}{'validate':>12}")
+        expected = None
+        for mode in ("sequential", "libyaml", "parallel"):
+            with _loader(mode):
+                manifest = json.dumps(build_json(root), sort_keys=True)
+                expected = expected or manifest
+                assert manifest == expected, f"{mode} built a different manifest"
+                build = _best(lambda: build_json(root), args.repeat)
+                validate = _best(lambda: validate_project(root), args.repeat)
+            print(f"{mode:<12}{build * 1000:>10.0f}ms{validate * 1000:>10.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
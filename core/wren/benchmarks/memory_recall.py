@@ -0,0 +1,217 @@
+"""Recall quality and latency benchmark for Wren Memory search modes.
+
+Builds a throwaway memory store, fills ``query_history`` with NL→SQL pairs
+synthesised from an MDL manifest (or a generated wide schema), then asks
+two kinds of questions about known pairs and reports, per search mode:
+
+* ``recall@k`` — share of questions whose source pair is in the top *k*,
+* ``MRR`` — mean reciprocal rank of the source pair,
+* ``p50``/``p95`` search latency.
+
+Question sets:
+
+* ``identifier`` — names the exact column/table identifiers (``o_totalprice``),
+  the case embeddings handle worst,
+* ``paraphrase`` — reworded natural language without identifiers.
+
+Usage (from ``core/wren``, with the ``memory`` extra installed)::
+
+    uv run --no-sync python benchmarks/memory_recall.py
+    uv run --no-sync python benchmarks/memory_recall.py --mdl target/mdl.json
+    uv run --no-sync python benchmarks/memory_recall.py --embedding hash --scale 50
+
+``--embedding hash`` swaps the sentence-transformer for a deterministic hash
+embedder: no model download, meaningless vectors — useful for latency at
+scale and for showing what the BM25 side contributes on its own.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+_AGGREGATES = (("SUM", "total"), ("AVG", "average"), ("MAX", "highest"))
+_PARAPHRASE = {"total": "overall", "average": "typical", "highest": "largest"}
+
+
+class _HashEmbedding:
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def _vec(self, text: str) -> list[float]:
+        out: list[float] = []
+        seed = text.encode("utf-8")
+        while len(out) < self.dim:
+            seed = hashlib.sha256(seed).digest()
+            out.extend(b / 255.0 for b in seed)
+        return out[: self.dim]
+
+    def compute_source_embeddings(self, texts):
+        return [self._vec(t) for t in texts]
+
+    def compute_query_embeddings(self, query):
+        return [self._vec(query)]
+
+
+def _synthetic_manifest(models: int, columns: int) -> dict:
+    return {
+        "models": [
+            {
+                "name": f"fact_{m}",
+                "columns": [
+                    {"name": f"f{m}_dim_{c}", "type": "varchar"} for c in range(3)
+                ]
+                + [
+                    {"name": f"f{m}_metric_{c}", "type": "double"}
+                    for c in range(columns)
+                ],
+            }
+            for m in range(models)
+        ]
+    }
+
+
+def _words(identifier: str) -> str:
+    return identifier.replace("_", " ")
+
+
+def _build_pairs(manifest: dict) -> tuple[list[dict], list[dict]]:
+    """Return (pairs, questions); each question names its source pair index."""
+    pairs: list[dict] = []
+    questions: list[dict] = []
+    for model in manifest.get("models", []):
+        cols = model.get("columns", [])
+        measures = [
+            c["name"]
+            for c in cols
+            if c.get("type") in ("double", "int", "integer", "bigint", "decimal")
+        ]
+        dims = [c["name"] for c in cols if c["name"] not in measures][:2]
+        for measure in measures:
+            for agg, word in _AGGREGATES:
+                for dim in dims or [None]:
+                    nl = f"{word} {_words(measure)} of {_words(model['name'])}"
+                    sql = f"SELECT {agg}({measure}) FROM {model['name']}"
+                    if dim:
+                        nl += f" by {_words(dim)}"
+                        sql = f"SELECT {dim}, {agg}({measure}) FROM {model['name']} GROUP BY 1"
+                    idx = len(pairs)
+                    pairs.append({"nl": nl, "sql": sql, "source": "bench"})
+                    ident = f"{agg.lower()} {measure}" + (f" {dim}" if dim else "")
+                    questions.append({"kind": "identifier", "q": ident, "target": idx})
+                    para = nl.replace(word, _PARAPHRASE[word], 1)
+                    questions.append({"kind": "paraphrase", "q": para, "target": idx})
+    return pairs, questions
+
+
+def _run(store, pairs, questions, modes, k):
+    rows = []
+    for mode in modes:
+        for kind in ("identifier", "paraphrase"):
+            subset = [q for q in questions if q["kind"] == kind]
+            hits, rr, latencies = 0, 0.0, []
+            for q in subset:
+                start = time.perf_counter()
+                results = store.recall_queries(q["q"], limit=k, mode=mode)
+                latencies.append(time.perf_counter() - start)
+                target = pairs[q["target"]]
+                ranked = [(r["nl_query"], r["sql_query"]) for r in results]
+                key = (target["nl"], target["sql"])
+                if key in ranked:
+                    hits += 1
+                    rr += 1.0 / (ranked.index(key) + 1)
+            latencies.sort()
+            rows.append(
+                {
+                    "mode": mode,
+                    "questions": kind,
+                    "n": len(subset),
+                    f"recall@{k}": hits / len(subset) if subset else 0.0,
+                    "mrr": rr / len(subset) if subset else 0.0,
+                    "p50_ms": statistics.median(latencies) * 1000,
+                    "p95_ms": latencies[int(0.95 * (len(latencies) - 1))] * 1000,
+                }
+            )
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mdl", type=Path, help="MDL JSON to synthesise pairs from")
+    parser.add_argument("--models", type=int, default=20, help="synthetic models")
+    parser.add_argument("--columns", type=int, default=5, help="metrics per model")
+    parser.add_argument(
+        "--scale",
+        type=int,
+        default=1,
+        help="filler copies of the corpus (latency at size)",
+    )
+    parser.add_argument("--questions", type=int, default=200, help="questions per set")
+    parser.add_argument("-k", type=int, default=5)
+    parser.add_argument("--embedding", choices=("model", "hash"), default="model")
+    parser.add_argument("--modes", default="vector,hybrid")
+    parser.add_argument("--json", action="store_true", help="print JSON rows")
+    args = parser.parse_args()
+
+    from wren.memory.store import MemoryStore  # noqa: PLC0415
+
+    manifest = (
+        json.loads(args.mdl.read_text(encoding="utf-8"))
+        if args.mdl
+        else _synthetic_manifest(args.models, args.columns)
+    )
+    pairs, questions = _build_pairs(manifest)
+    if not pairs:
+        raise SystemExit("The manifest has no numeric columns to build pairs from.")
+    by_kind: dict[str, list[dict]] = {}
+    for q in questions:
+        by_kind.setdefault(q["kind"], []).append(q)
+    questions = [q for qs in by_kind.values() for q in qs[: args.questions]]
+
+    corpus = list(pairs)
+    for copy in range(1, args.scale):
+        corpus += [
+            {
+                "nl": f"{p['nl']} (variant {copy})",
+                "sql": f"{p['sql']} -- v{copy}",
+                "source": "bench",
+            }
+            for p in pairs
+        ]
+
+    with tempfile.TemporaryDirectory(prefix="wren-recall-bench-") as tmp:
+        store = MemoryStore(path=tmp)
+        if args.embedding == "hash":
+            store._embed_fn_cached = _HashEmbedding()
+        start = time.perf_counter()
+        store.load_queries(corpus, overwrite=True)
+        load_s = time.perf_counter() - start
+        rows = _run(store, pairs, questions, args.modes.split(","), args.k)
+
+    if args.json:
+        print(
+            json.dumps(
+                {"rows": len(corpus), "load_s": load_s, "results": rows}, indent=2
+            )
+        )
+        return
+    print(
+        f"query_history rows: {len(corpus)}  (loaded in {load_s:.1f}s, embedding={args.embedding})"
+    )
+    header = f"{'mode':<8} {'questions':<11} {'n':>5} {'recall@' + str(args.k):>9} {'MRR':>6} {'p50 ms':>8} {'p95 ms':>8}"
+    print(header)
+    print("-" * len(header))
+    for r in rows:
+        print(
+            f"{r['mode']:<8} {r['questions']:<11} {r['n']:>5} {r[f'recall@{args.k}']:>9.3f} "
+            f"{r['mrr']:>6.3f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,16 @@
 """Wren — semantic SQL layer for 20+ data sources."""
 
+from __future__ import annotations
+
+from importlib import import_module
 from importlib.metadata import PackageNotFoundError
 from importlib.metadata import version as _pkg_version
+from typing import TYPE_CHECKING
 
-from wren.engine import WrenEngine
-from wren.model.data_source import DataSource
-from wren.model.error import WrenError
+if TYPE_CHECKING:
+    from wren.engine import WrenEngine
+    from wren.model.data_source import DataSource
+    from wren.model.error import WrenError
 
 try:
     __version__ = _pkg_version("wrenai")
@@ -13,3 +18,25 @@ except PackageNotFoundError:  # editable install without metadata, dev checkouts
     __version__ = "0.0.0+unknown"
 
 __all__ = ["WrenEngine", "DataSource", "WrenError", "__version__"]
+
+# Resolved on first access: importing ``wren.engine`` pulls in sqlglot,
+# pyarrow and the native extension, which CLI commands like ``wren version``
+# or ``wren context show`` never need.
+_LAZY_ATTRS = {
+    "WrenEngine": "wren.engine",
+    "DataSource": "wren.model.data_source",
+    "WrenError": "wren.model.error",
+}
+
+
+def __getattr__(name: str):
+    module = _LAZY_ATTRS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
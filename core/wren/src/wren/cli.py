@@ -4,14 +4,93 @@ from __future__ import annotations
 
 import json
 import os
+from collections.abc import Iterator, MutableMapping
+from importlib import import_module
 from pathlib import Path
 from typing import Annotated, Optional
 
+import click
 import typer
+from typer.core import TyperGroup
+
+# Subcommands registered by import path and loaded on first use, in help
+# order: ``wren version`` must not pay for importing every sub-app (and
+# whatever they import) at startup. Values are ``module:attribute`` — a
+# Typer sub-app, or a plain function for a single command.
+_LAZY_SUBCOMMANDS: dict[str, str] = {
+    "docs": "wren.docs_cli:docs_app",
+    "ask": "wren.ask_cli:ask",
+    "context": "wren.context_cli:context_app",
+    "cube": "wren.cube_cli:cube_app",
+    "utils": "wren.utils_cli:utils_app",
+    "skills": "wren.skills_cli:skills_app",
+    # Always registered: `wren memory store` writes knowledge/sql/*.md
+    # without the optional `memory` extra, and the lancedb-backed commands
+    # degrade with a clear "install wren[memory]" message. lancedb / the
+    # heavy ML stack are imported inside the commands that need them.
+    "memory": "wren.memory.cli:memory_app",
+    "genbi": "wren.genbi.cli:genbi_app",
+    "profile": "wren.profile_cli:profile_app",
+    "serve": "wren.serve_cli:serve_app",
+    "daemon": "wren.daemon_cli:daemon_app",
+}
+
+
+def _load_subcommand(name: str, target: str) -> click.Command:
+    module, _, attr = target.partition(":")
+    obj = getattr(import_module(module), attr)
+    if isinstance(obj, typer.Typer):
+        return typer.main.get_group(obj)
+    holder = typer.Typer()
+    holder.command(name=name)(obj)
+    return typer.main.get_command(holder)
+
+
+class _LazyCommands(MutableMapping):
+    """Command mapping that imports lazy subcommands when they are looked up.
+
+    Listing names (help, completion, "no such command" suggestions) never
+    imports anything; only fetching a command does.
+    """
+
+    def __init__(self, commands: MutableMapping[str, click.Command]):
+        self._commands: dict[str, click.Command | str] = dict(commands)
+        for name, target in _LAZY_SUBCOMMANDS.items():
+            self._commands.setdefault(name, target)
+
+    def __getitem__(self, name: str) -> click.Command:
+        command = self._commands[name]
+        if isinstance(command, str):
+            command = self._commands[name] = _load_subcommand(name, command)
+        return command
+
+    def __setitem__(self, name: str, command: click.Command) -> None:
+        self._commands[name] = command
+
+    def __delitem__(self, name: str) -> None:
+        del self._commands[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._commands
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._commands)
+
+    def __len__(self) -> int:
+        return len(self._commands)
 
-from wren.context_cli import context_app
 
-app = typer.Typer(name="wren", help="Wren Engine CLI", no_args_is_help=False)
+class _LazyGroup(TyperGroup):
+    """Root group whose :data:`_LAZY_SUBCOMMANDS` load on first use."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.commands = _LazyCommands(self.commands)
+
+
+app = typer.Typer(
+    name="wren", help="Wren Engine CLI", no_args_is_help=False, cls=_LazyGroup
+)
 
 _WREN_HOME = Path(os.environ.get("WREN_HOME", str(Path.home() / ".wren"))).expanduser()
 _DEFAULT_CONN = _WREN_HOME / "connection_info.json"
@@ -194,6 +273,18 @@ def _resolve_datasource(conn_dict: dict, explicit: str | None = None) -> str:
     raise typer.Exit(1)
 
 
+def _new_engine(*args, **kwargs):
+    """Construct a WrenEngine — inside ``wren daemon``, a warm pooled one."""
+    from wren.daemon import engine_pool  # noqa: PLC0415
+
+    pool = engine_pool()
+    if pool is not None:
+        return pool.get(*args, **kwargs)
+    from wren.engine import WrenEngine  # noqa: PLC0415
+
+    return WrenEngine(*args, **kwargs)
+
+
 def _build_engine(
     mdl: str | None,
     connection_info: str | None,
@@ -203,7 +294,6 @@ def _build_engine(
     datasource: str | None = None,
 ):
     from wren.config import load_config  # noqa: PLC0415
-    from wren.engine import WrenEngine  # noqa: PLC0415
     from wren.model.data_source import DataSource  # noqa: PLC0415
     from wren.model.error import WrenError  # noqa: PLC0415
 
@@ -245,7 +335,7 @@ def _build_engine(
                 typer.echo(f"Error: {e}", err=True)
                 raise typer.Exit(1) from e
             try:
-                return WrenEngine(
+                return _new_engine(
                     manifest_str=manifest_str,
                     data_source=ds,
                     connection_info=prof_dict,
@@ -267,7 +357,7 @@ def _build_engine(
 
     try:
         config = load_config(_WREN_HOME)
-        return WrenEngine(
+        return _new_engine(
             manifest_str=manifest_str,
             data_source=ds,
             connection_info=conn_dict,
@@ -462,7 +552,6 @@ def dry_plan(
 ):
     """Plan SQL through MDL and print the expanded SQL (no DB required)."""
     from wren.config import load_config  # noqa: PLC0415
-    from wren.engine import WrenEngine  # noqa: PLC0415
     from wren.model.data_source import DataSource  # noqa: PLC0415
     from wren.model.error import WrenError  # noqa: PLC0415
 
@@ -491,7 +580,7 @@ def dry_plan(
             except (WrenError, OSError) as e:
                 typer.echo(f"Error: {e}", err=True)
                 raise typer.Exit(1) from e
-            with WrenEngine(
+            with _new_engine(
                 manifest_str=manifest_str,
                 data_source=ds,
                 connection_info={},
@@ -522,7 +611,7 @@ def dry_plan(
         typer.echo(f"Error: {e}", err=True)
         raise typer.Exit(1) from e
 
-    with WrenEngine(
+    with _new_engine(
         manifest_str=manifest_str, data_source=ds, connection_info={}, config=config
     ) as engine:
         try:
@@ -589,43 +678,5 @@ def version():
     typer.echo(f"wrenai {__version__}")
 
 
-# ── Docs subcommand ───────────────────────────────────────────────────────
-
-from wren.docs_cli import docs_app  # noqa: E402, PLC0415
-
-app.add_typer(docs_app)
-
-from wren.ask_cli import ask as _ask_command  # noqa: E402, PLC0415
-from wren.cube_cli import cube_app  # noqa: E402, PLC0415
-from wren.skills_cli import skills_app  # noqa: E402, PLC0415
-from wren.utils_cli import utils_app  # noqa: E402, PLC0415
-
-app.command(name="ask")(_ask_command)
-
-app.add_typer(context_app)
-app.add_typer(cube_app)
-app.add_typer(utils_app)
-app.add_typer(skills_app)
-
-# The `memory` subcommand group is always registered: `wren memory store`
-# writes knowledge/sql/*.md without the optional `memory` extra, and the
-# lancedb-backed commands degrade with a clear "install wren[memory]" message.
-# Importing memory_app stays light — lancedb / the heavy ML stack are imported
-# lazily inside the commands that need them, never at CLI startup.
-from wren.memory.cli import memory_app  # noqa: E402
-
-app.add_typer(memory_app)
-
-from wren.genbi.cli import genbi_app  # noqa: PLC0415, E402
-from wren.profile_cli import profile_app  # noqa: PLC0415, E402
-
-app.add_typer(genbi_app)
-app.add_typer(profile_app)
-
-from wren.serve_cli import serve_app  # noqa: PLC0415, E402
-
-app.add_typer(serve_app)
-
-
 if __name__ == "__main__":
     app()
@@ -11,6 +11,8 @@ from typing import Any
 
 import yaml
 
+from wren.context_cache import prefetch_yaml, read_yaml
+
 _WREN_HOME = Path(os.environ.get("WREN_HOME", Path.home() / ".wren"))
 _DEFAULT_PROJECT = _WREN_HOME / "project"
 PROJECT_FILE = "wren_project.yml"
@@ -421,7 +423,7 @@ def load_project_config(project_path: Path) -> dict:
     config_file = project_path / PROJECT_FILE
     if not config_file.exists():
         return {}
-    return yaml.safe_load(config_file.read_text(encoding="utf-8")) or {}
+    return read_yaml(config_file) or {}
 
 
 # Field order preferred when writing wren_project.yml back from a dict —
@@ -566,7 +568,7 @@ def _load_models_v1(project_path: Path) -> list[dict]:
         return []
     models = []
     for f in sorted(models_dir.glob("*.yml")):
-        data = yaml.safe_load(f.read_text(encoding="utf-8"))
+        data = read_yaml(f)
         if isinstance(data, dict):
             data["_source_dir"] = f.stem
             models.append(_normalize_model_columns(data))
@@ -583,29 +585,36 @@ def _load_models_v2(project_path: Path) -> list[dict]:
     models_dir = project_path / "models"
     if not models_dir.is_dir():
         return []
+    meta_files = _entity_metadata_files(models_dir)
     models = []
-    for d in sorted(models_dir.iterdir()):
-        if not d.is_dir():
-            continue
-        meta_file = d / "metadata.yml"
-        if not meta_file.exists():
-            continue
-        model = yaml.safe_load(meta_file.read_text(encoding="utf-8")) or {}
-        if not isinstance(model, dict):
-            continue
-        model["_source_dir"] = d.name
+    with prefetch_yaml(meta_files) as read:
+        for meta_file in meta_files:
+            d = meta_file.parent
+            model = read(meta_file) or {}
+            if not isinstance(model, dict):
+                continue
+            model["_source_dir"] = d.name
 
-        # Merge ref_sql.sql if present (takes precedence)
-        ref_sql_file = d / "ref_sql.sql"
-        if ref_sql_file.exists():
-            sql_content = ref_sql_file.read_text(encoding="utf-8").strip()
-            if sql_content:
-                model["ref_sql"] = sql_content
+            # Merge ref_sql.sql if present (takes precedence)
+            ref_sql_file = d / "ref_sql.sql"
+            if ref_sql_file.exists():
+                sql_content = ref_sql_file.read_text(encoding="utf-8").strip()
+                if sql_content:
+                    model["ref_sql"] = sql_content
 
-        models.append(_normalize_model_columns(model))
+            models.append(_normalize_model_columns(model))
     return models
 
 
+def _entity_metadata_files(entity_dir: Path) -> list[Path]:
+    """``<entity_dir>/<name>/metadata.yml`` files that exist, sorted by name."""
+    return [
+        d / "metadata.yml"
+        for d in sorted(entity_dir.iterdir())
+        if d.is_dir() and (d / "metadata.yml").exists()
+    ]
+
+
 def load_views(project_path: Path) -> list[dict]:
     """Load views — dispatches on schema_version.
 
@@ -624,7 +633,7 @@ def _load_views_v1(project_path: Path) -> list[dict]:
     views_file = project_path / "views.yml"
     if not views_file.exists():
         return []
-    data = yaml.safe_load(views_file.read_text(encoding="utf-8")) or {}
+    data = read_yaml(views_file) or {}
     views = data.get("views") if isinstance(data, dict) else None
     # A bare ``views:`` parses to None and means "no views", same as a missing
     # key. Any other non-list value is malformed; return nothing here and let
@@ -644,26 +653,29 @@ def _load_views_v2(project_path: Path) -> list[dict]:
     views_dir = project_path / "views"
     if not views_dir.is_dir():
         return []
+    meta_files = _entity_metadata_files(views_dir)
+    sql_files = {
+        f.parent: f.parent / "sql.yml"
+        for f in meta_files
+        if (f.parent / "sql.yml").exists()
+    }
     views = []
-    for d in sorted(views_dir.iterdir()):
-        if not d.is_dir():
-            continue
-        meta_file = d / "metadata.yml"
-        if not meta_file.exists():
-            continue
-        view = yaml.safe_load(meta_file.read_text(encoding="utf-8")) or {}
-        if not isinstance(view, dict):
-            continue
-        view["_source_dir"] = d.name
+    with prefetch_yaml([*meta_files, *sql_files.values()]) as read:
+        for meta_file in meta_files:
+            d = meta_file.parent
+            view = read(meta_file) or {}
+            if not isinstance(view, dict):
+                continue
+            view["_source_dir"] = d.name
 
-        # Merge sql.yml if present (takes precedence)
-        sql_file = d / "sql.yml"
-        if sql_file.exists():
-            sql_data = yaml.safe_load(sql_file.read_text(encoding="utf-8")) or {}
-            if isinstance(sql_data, dict) and sql_data.get("statement"):
-                view["statement"] = sql_data["statement"]
+            # Merge sql.yml if present (takes precedence)
+            sql_file = sql_files.get(d)
+            if sql_file is not None:
+                sql_data = read(sql_file) or {}
+                if isinstance(sql_data, dict) and sql_data.get("statement"):
+                    view["statement"] = sql_data["statement"]
 
-        views.append(view)
+            views.append(view)
     return views
 
 
@@ -687,7 +699,7 @@ def _load_cubes_v1(project_path: Path) -> list[dict]:
         return []
     cubes = []
     for f in sorted(cubes_dir.glob("*.yml")):
-        data = yaml.safe_load(f.read_text(encoding="utf-8"))
+        data = read_yaml(f)
         if isinstance(data, dict):
             data["_source_file"] = f.name
             cubes.append(data)
@@ -702,17 +714,14 @@ def _load_cubes_v2(project_path: Path) -> list[dict]:
     cubes_dir = project_path / "cubes"
     if not cubes_dir.is_dir():
         return []
+    meta_files = _entity_metadata_files(cubes_dir)
     cubes = []
-    for d in sorted(cubes_dir.iterdir()):
-        if not d.is_dir():
-            continue
-        meta_file = d / "metadata.yml"
-        if not meta_file.exists():
-            continue
-        data = yaml.safe_load(meta_file.read_text())
-        if isinstance(data, dict):
-            data["_source_file"] = str(meta_file.relative_to(cubes_dir))
-            cubes.append(data)
+    with prefetch_yaml(meta_files) as read:
+        for meta_file in meta_files:
+            data = read(meta_file)
+            if isinstance(data, dict):
+                data["_source_file"] = str(meta_file.relative_to(cubes_dir))
+                cubes.append(data)
     return cubes
 
 
@@ -732,7 +741,7 @@ def load_relationships(project_path: Path) -> list[dict]:
     rel_file = project_path / "relationships.yml"
     if not rel_file.exists():
         return []
-    data = yaml.safe_load(rel_file.read_text(encoding="utf-8")) or {}
+    data = read_yaml(rel_file) or {}
     rels = data.get("relationships") if isinstance(data, dict) else None
     # A bare ``relationships:`` parses to None and means "no relationships".
     if not isinstance(rels, list):
@@ -789,7 +798,7 @@ def load_knowledge_config(project_path: Path) -> dict:
     kfile = project_path / _KNOWLEDGE_CONFIG_FILE
     if not kfile.exists():
         return {}
-    data = yaml.safe_load(kfile.read_text(encoding="utf-8")) or {}
+    data = read_yaml(kfile) or {}
     return data if isinstance(data, dict) else {}
 
 
@@ -990,19 +999,16 @@ def validate_project(project_path: Path) -> list[ValidationError]:
         out: list[tuple[str, dict]] = []
         if sv == 1:
             for f in sorted(models_dir.glob("*.yml")):
-                data = yaml.safe_load(f.read_text(encoding="utf-8")) or {}
+                data = read_yaml(f) or {}
                 if isinstance(data, dict):
                     out.append((f"models/{f.name}", data))
         else:
-            for d in sorted(models_dir.iterdir()):
-                if not d.is_dir():
-                    continue
-                meta = d / "metadata.yml"
-                if not meta.exists():
-                    continue
-                data = yaml.safe_load(meta.read_text(encoding="utf-8")) or {}
-                if isinstance(data, dict):
-                    out.append((f"models/{d.name}/metadata.yml", data))
+            meta_files = _entity_metadata_files(models_dir)
+            with prefetch_yaml(meta_files) as read:
+                for meta in meta_files:
+                    data = read(meta) or {}
+                    if isinstance(data, dict):
+                        out.append((f"models/{meta.parent.name}/metadata.yml", data))
         return out
 
     # source key (_source_dir) -> raw columns list (file order) for
@@ -1231,7 +1237,7 @@ def validate_project(project_path: Path) -> list[ValidationError]:
     if sv == 1:
         views_file = project_path / "views.yml"
         if views_file.exists():
-            raw = yaml.safe_load(views_file.read_text(encoding="utf-8")) or {}
+            raw = read_yaml(views_file) or {}
             raw_views = raw.get("views") if isinstance(raw, dict) else None
             if raw_views is not None and not isinstance(raw_views, list):
                 # A bare ``views:`` (None) legitimately means "no views"; a
@@ -1261,7 +1267,7 @@ def validate_project(project_path: Path) -> list[ValidationError]:
     raw_relationships_list: list | None = None
     rel_file = project_path / "relationships.yml"
     if rel_file.exists():
-        raw = yaml.safe_load(rel_file.read_text(encoding="utf-8")) or {}
+        raw = read_yaml(rel_file) or {}
         if raw and not isinstance(raw, dict):
             # Most likely hand-edit: bare list / scalar root (omitted `relationships:` key).
             errors.append(
@@ -1953,9 +1959,6 @@ def validate_manifest(
     """
     import base64 as _base64  # noqa: PLC0415
 
-    from wren.engine import WrenEngine  # noqa: PLC0415
-    from wren.model.data_source import DataSource  # noqa: PLC0415
-
     errors: list[str] = []
     warnings: list[str] = []
 
@@ -1974,6 +1977,10 @@ def validate_manifest(
     # View SQL dry-plan — always checked (failures are errors)
     views = manifest.get("views", [])
     if views:
+        # The engine (sqlglot, pyarrow, wren_core) is only needed for views.
+        from wren.engine import WrenEngine  # noqa: PLC0415
+        from wren.model.data_source import DataSource  # noqa: PLC0415
+
         if isinstance(data_source, str):
             try:
                 data_source = DataSource(data_source)
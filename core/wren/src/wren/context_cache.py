@@ -0,0 +1,228 @@
+"""Incremental build cache for project YAML — ``target/.build_cache.json``.
+
+``wren context build`` used to YAML-parse every model, view, cube and
+``relationships.yml`` on every run, twice (once for validation, once for the
+manifest). PyYAML's pure-Python loader dominates that cost on large projects,
+so the cache keeps each source file's parsed content keyed by a content hash:
+
+* an unchanged ``(mtime_ns, size)`` reuses the stored fragment without
+  reading the file,
+* a changed stat re-reads the bytes and, if the SHA-256 still matches (e.g. a
+  ``touch`` or checkout), reuses the fragment anyway,
+* otherwise the file is re-parsed.
+
+Fragments are stored as JSON text, and only when the parsed value survives a
+JSON round trip unchanged — YAML values JSON cannot represent faithfully
+(dates, non-string keys, ...) are simply re-parsed every time. The cache is a
+pure accelerator: deleting it, or a corrupt/incompatible file, only costs a
+full parse. It is never a pickle, so a committed ``target/`` cannot inject
+code.
+
+Readers in :mod:`wren.context` go through :func:`read_yaml`, which consults
+the cache only inside a :func:`build_cache` block. Directory-per-entity
+loaders read their many small files through :func:`prefetch_yaml`, which
+parses them on a thread pool, and every parse uses libyaml's
+``CSafeLoader`` when PyYAML was built with it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+CACHE_FILE = ".build_cache.json"
+_CACHE_VERSION = 1
+
+# Below this many files a thread pool costs more than it saves.
+PREFETCH_MIN_FILES = 16
+
+# libyaml builds the same values several times faster than the pure-Python
+# loader, which is still used to report errors (its messages quote the
+# offending line).
+_FAST_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+_active_cache: ContextVar[BuildCache | None] = ContextVar(
+    "wren_build_cache", default=None
+)
+
+
+def safe_load(text: str) -> Any:
+    """``yaml.safe_load`` *text*, through libyaml when available.
+
+    A document libyaml rejects is re-parsed with ``yaml.safe_load``, so the
+    value or the error raised is exactly the pure-Python loader's.
+    """
+    try:
+        return yaml.load(text, Loader=_FAST_LOADER)
+    except yaml.YAMLError:
+        if _FAST_LOADER is yaml.SafeLoader:
+            raise
+        return yaml.safe_load(text)
+
+
+def read_yaml(path: Path) -> Any:
+    """``yaml.safe_load`` a UTF-8 file, via the active build cache if any."""
+    cache = _active_cache.get()
+    if cache is None:
+        return safe_load(path.read_text(encoding="utf-8"))
+    return cache.read_yaml(path)
+
+
+@contextmanager
+def prefetch_yaml(paths: Sequence[Path]) -> Iterator[Callable[[Path], Any]]:
+    """Read *paths* on a thread pool; yield a :func:`read_yaml` replacement.
+
+    The yielded reader returns a prefetched file's value — or raises its
+    error — only when called for that path, so a loader keeps the results
+    and the first error it would have met reading the files one by one.
+    Paths that were not prefetched are read on the spot. Small batches
+    (under :data:`PREFETCH_MIN_FILES`) are not prefetched at all.
+    """
+    if len(paths) < PREFETCH_MIN_FILES:
+        yield read_yaml
+        return
+    # Worker threads do not inherit the build cache's context variable.
+    cache = _active_cache.get()
+    reader = cache.read_yaml if cache is not None else read_yaml
+    pool = ThreadPoolExecutor(thread_name_prefix="wren-yaml")
+    futures: dict[Path, Future] = {p: pool.submit(reader, p) for p in paths}
+
+    def read(path: Path) -> Any:
+        future = futures.pop(path, None)
+        return future.result() if future is not None else read_yaml(path)
+
+    try:
+        yield read
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+class BuildCache:
+    """Parsed-fragment cache for one project, persisted under ``target/``."""
+
+    def __init__(self, project_path: Path, *, target_dir: str = "target"):
+        self.project_path = project_path
+        self.path = project_path / target_dir / CACHE_FILE
+        self._reused: set[str] = set()
+        self._parsed: set[str] = set()
+        self._entries: dict[str, dict] = {}
+        self._used: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    @property
+    def hits(self) -> int:
+        """Distinct files served from the persisted cache in this build."""
+        return len(self._reused)
+
+    @property
+    def misses(self) -> int:
+        """Distinct files that had to be parsed in this build."""
+        return len(self._parsed)
+
+    def _fingerprint(self) -> str:
+        return f"{_CACHE_VERSION}:{yaml.__version__}"
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("version") != self._fingerprint():
+            return
+        files = data.get("files")
+        if isinstance(files, dict):
+            self._entries = files
+
+    def _key(self, path: Path) -> str:
+        try:
+            return path.relative_to(self.project_path).as_posix()
+        except ValueError:
+            return str(path)
+
+    def read_yaml(self, path: Path) -> Any:
+        """Thread-safe: :func:`prefetch_yaml` calls this from a pool."""
+        key = self._key(path)
+        st = os.stat(path)
+        with self._lock:
+            entry = self._used.get(key)
+            if entry is None:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._reused.add(key)
+            if (
+                entry is not None
+                and entry.get("mtime_ns") == st.st_mtime_ns
+                and entry.get("size") == st.st_size
+            ):
+                self._used[key] = entry
+                return json.loads(entry["data"])
+
+        raw = path.read_bytes()
+        digest = hashlib.sha256(raw).hexdigest()
+        if entry is not None and entry.get("sha256") == digest:
+            entry = {**entry, "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+            with self._lock:
+                self._used[key] = entry
+            return json.loads(entry["data"])
+
+        with self._lock:
+            self._reused.discard(key)
+            self._parsed.add(key)
+        value = safe_load(raw.decode("utf-8"))
+        encoded = _encode_fragment(value)
+        if encoded is not None:
+            with self._lock:
+                self._used[key] = {
+                    "mtime_ns": st.st_mtime_ns,
+                    "size": st.st_size,
+                    "sha256": digest,
+                    "data": encoded,
+                }
+        return value
+
+    def save(self) -> None:
+        """Persist the entries read during this build; drop everything else.
+
+        Files that were not read (deleted models, renamed views) fall out of
+        the cache here. Write failures are ignored — the cache is optional.
+        """
+        payload = {"version": self._fingerprint(), "files": self._used}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            tmp.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+
+def _encode_fragment(value: Any) -> str | None:
+    """Return ``value`` as JSON text if it round-trips exactly, else None."""
+    try:
+        text = json.dumps(value, ensure_ascii=False, allow_nan=False)
+    except (TypeError, ValueError):
+        return None
+    return text if json.loads(text) == value else None
+
+
+@contextmanager
+def build_cache(project_path: Path) -> Iterator[BuildCache]:
+    """Route :func:`read_yaml` through the project's build cache, then save it."""
+    cache = BuildCache(project_path)
+    token = _active_cache.set(cache)
+    try:
+        yield cache
+    finally:
+        _active_cache.reset(token)
+    cache.save()
@@ -634,6 +634,7 @@ def build(
         save_target,
         validate_project,
     )
+    from wren.context_cache import build_cache  # noqa: PLC0415
 
     try:
         project_path = discover_project_path(path)
@@ -641,16 +642,19 @@ def build(
         typer.echo(str(e), err=True)
         raise typer.Exit(1)
 
-    if validate_first:
-        errors = validate_project(project_path)
-        hard_errors = [e for e in errors if e.level == "error"]
-        if hard_errors:
-            for e in hard_errors:
-                typer.echo(str(e), err=True)
-            typer.echo("\nBuild aborted due to validation errors.", err=True)
-            raise typer.Exit(1)
+    # Validation and the build share one parse of each changed file; files
+    # unchanged since the last build come from target/.build_cache.json.
+    with build_cache(project_path) as cache:
+        if validate_first:
+            errors = validate_project(project_path)
+            hard_errors = [e for e in errors if e.level == "error"]
+            if hard_errors:
+                for e in hard_errors:
+                    typer.echo(str(e), err=True)
+                typer.echo("\nBuild aborted due to validation errors.", err=True)
+                raise typer.Exit(1)
 
-    manifest_json = build_json(project_path)
+        manifest_json = build_json(project_path)
 
     if output:
         out_path = Path(output).expanduser()
@@ -662,6 +666,8 @@ def build(
     n_models = len(manifest_json.get("models", []))
     n_views = len(manifest_json.get("views", []))
     typer.echo(f"Built: {n_models} models, {n_views} views → {out_path}")
+    if cache.hits:
+        typer.echo(f"  ({cache.misses} file(s) parsed, {cache.hits} reused from cache)")
     typer.echo("")
     typer.echo("Next: wren --sql 'SELECT ...' to query your data.")
     # Soft nudge toward semantic memory once the schema crosses the threshold
@@ -0,0 +1,298 @@
+"""Persistent ``wren`` daemon for agents that shell out to the CLI.
+
+An agent driving Wren through the CLI starts a fresh interpreter for every
+``wren query`` or ``wren dry-plan``: it re-imports sqlglot and pyarrow,
+rebuilds the engine, reconnects to the warehouse and reloads the embedding
+model. ``wren daemon start`` keeps one process warm instead, and the
+``wrenc`` client (:mod:`wren.daemon_client`) runs commands in it:
+
+* the CLI command tree and every module it imported stay loaded,
+* engines — and their open connectors — are kept in an :class:`EnginePool`
+  keyed by manifest, data source and connection info, so a project's
+  repeated queries reuse one connection,
+* embedding models and the memory recall caches are process-wide already
+  (:mod:`wren.memory.embeddings`, :mod:`wren.memory.recall_cache`), as are
+  the shared memory service's stores (:mod:`wren.memory.service`).
+
+Commands run one at a time: each one gets the client's working directory
+and environment, and its stdout/stderr are streamed back as written. The
+daemon refuses clients with a different ``WREN_HOME``; the client then runs
+the command locally.
+
+Protocol: one JSON object per line in each direction.
+
+* ``{"op": "info"}`` → ``{"pid": ..., "version": ..., "commands": ...,
+  "engines": ..., "engine_hits": ...}``
+* ``{"op": "run", "argv": [...], "cwd": ..., "env": {...}}`` →
+  ``{"out": text}`` / ``{"err": text}`` lines, then ``{"exit": code}``
+* ``{"op": "stop"}`` → ``{"stopping": true}``
+* any failure → ``{"error": "..."}``
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import socketserver
+import sys
+import threading
+import traceback
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+
+from wren.daemon_client import default_socket_path, runs_locally
+
+# Warm engines kept per daemon; the least recently used one is closed.
+MAX_ENGINES = int(os.getenv("WREN_DAEMON_ENGINES", "8"))
+
+_active_pool: EnginePool | None = None
+
+
+def engine_pool() -> EnginePool | None:
+    """The engine pool of the daemon serving in this process, else None."""
+    return _active_pool
+
+
+class _PooledEngine:
+    """A pooled :class:`~wren.engine.WrenEngine` that stays open.
+
+    ``close()`` and leaving a ``with`` block keep the connector for the next
+    command — except when the block exits with an exception, which closes
+    it so a connection broken by the failure is reopened next time.
+    """
+
+    def __init__(self, engine):
+        self._engine = engine
+
+    def __getattr__(self, name: str):
+        return getattr(self._engine, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *_):
+        if exc_type is not None:
+            self._engine.close()
+
+    def close(self) -> None:
+        pass
+
+
+def _wren_engine(*args, **kwargs):
+    from wren.engine import WrenEngine  # noqa: PLC0415
+
+    return WrenEngine(*args, **kwargs)
+
+
+class EnginePool:
+    """LRU of warm engines keyed by their constructor arguments."""
+
+    def __init__(self, maxsize: int = MAX_ENGINES, factory: Callable | None = None):
+        self.maxsize = max(maxsize, 1)
+        self.hits = 0
+        self._factory = factory or _wren_engine
+        self._engines: OrderedDict[tuple, _PooledEngine] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._engines)
+
+    def get(
+        self,
+        manifest_str: str,
+        data_source,
+        connection_info,
+        function_path: str | None = None,
+        **kwargs,
+    ) -> _PooledEngine:
+        """Return the warm engine for these arguments, creating it if needed."""
+        key = (
+            manifest_str,
+            str(data_source),
+            json.dumps(connection_info, sort_keys=True, default=str),
+            function_path,
+            repr(sorted(kwargs.items())),
+        )
+        with self._lock:
+            engine = self._engines.get(key)
+            if engine is not None:
+                self._engines.move_to_end(key)
+                self.hits += 1
+                return engine
+        engine = _PooledEngine(
+            self._factory(
+                manifest_str, data_source, connection_info, function_path, **kwargs
+            )
+        )
+        with self._lock:
+            self._engines[key] = engine
+            while len(self._engines) > self.maxsize:
+                _, evicted = self._engines.popitem(last=False)
+                evicted._engine.close()
+        return engine
+
+    def close(self) -> None:
+        with self._lock:
+            engines = list(self._engines.values())
+            self._engines.clear()
+        for engine in engines:
+            engine._engine.close()
+
+
+class _StreamWriter(io.TextIOBase):
+    """Text stream sending each write to the client as ``{key: text}``."""
+
+    encoding = "utf-8"
+
+    def __init__(self, send: Callable[[dict], None], key: str):
+        self._send = send
+        self._key = key
+
+    def writable(self) -> bool:
+        return True
+
+    def isatty(self) -> bool:
+        return False
+
+    def write(self, text: str) -> int:
+        if not isinstance(text, str):  # click probes streams with b""
+            raise TypeError(f"write() argument must be str, not {type(text).__name__}")
+        if text:
+            self._send({self._key: text})
+        return len(text)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: WrenDaemon
+
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        if not line.strip():
+            return
+
+        def send(reply: dict) -> None:
+            self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+        try:
+            self.server.dispatch(json.loads(line), send)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client went away
+        except Exception as e:
+            send({"error": str(e)})
+
+
+class WrenDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Run ``wren`` commands for local clients in one warm process."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str | Path, command, *, pool=None):
+        global _active_pool
+        from wren.memory.embedding_server import _claim_socket  # noqa: PLC0415
+
+        self.socket_path = Path(socket_path)
+        self.command = command
+        self.pool = pool if pool is not None else EnginePool()
+        self.commands = 0
+        self._wren_home = os.environ.get("WREN_HOME")
+        self._run_lock = threading.Lock()
+        _claim_socket(self.socket_path, "A wren daemon")
+        super().__init__(str(self.socket_path), _Handler)
+        os.chmod(self.socket_path, 0o600)
+        _active_pool = self.pool
+
+    def info(self) -> dict:
+        from wren import __version__  # noqa: PLC0415
+
+        return {
+            "pid": os.getpid(),
+            "version": __version__,
+            "commands": self.commands,
+            "engines": len(self.pool),
+            "engine_hits": self.pool.hits,
+        }
+
+    def dispatch(self, request: dict, send: Callable[[dict], None]) -> None:
+        op = request.get("op")
+        if op == "info":
+            send(self.info())
+        elif op == "stop":
+            send({"stopping": True})
+            threading.Thread(target=self.shutdown, daemon=True).start()
+        elif op == "run":
+            argv = [str(a) for a in request.get("argv") or []]
+            env = {str(k): str(v) for k, v in (request.get("env") or {}).items()}
+            if runs_locally(argv):
+                send({"error": "this command runs locally"})
+            elif env.get("WREN_HOME") != self._wren_home:
+                send({"error": "the daemon serves a different WREN_HOME"})
+            else:
+                code = self.run(argv, request.get("cwd") or os.getcwd(), env, send)
+                send({"exit": code})
+        else:
+            send({"error": f"unknown op {op!r}"})
+
+    def run(
+        self,
+        argv: list[str],
+        cwd: str,
+        env: dict[str, str],
+        send: Callable[[dict], None],
+    ) -> int:
+        """Run one command with the client's cwd, environment and streams."""
+        with self._run_lock:
+            saved_cwd, saved_env = os.getcwd(), dict(os.environ)
+            saved_streams = sys.stdin, sys.stdout, sys.stderr
+            try:
+                os.chdir(cwd)
+                os.environ.clear()
+                os.environ.update(env)
+                sys.stdin = io.StringIO()
+                sys.stdout = _StreamWriter(send, "out")
+                sys.stderr = _StreamWriter(send, "err")
+                return self._invoke(argv)
+            finally:
+                sys.stdin, sys.stdout, sys.stderr = saved_streams
+                os.environ.clear()
+                os.environ.update(saved_env)
+                os.chdir(saved_cwd)
+                self.commands += 1
+
+    def _invoke(self, argv: list[str]) -> int:
+        try:
+            self.command.main(args=argv, prog_name="wren", standalone_mode=True)
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                return e.code or 0
+            sys.stderr.write(f"{e.code}\n")
+            return 1
+        except Exception:
+            traceback.print_exc()
+            return 1
+        return 0
+
+    def server_close(self) -> None:
+        global _active_pool
+        super().server_close()
+        if _active_pool is self.pool:
+            _active_pool = None
+        self.pool.close()
+        try:
+            self.socket_path.unlink()
+        except OSError:
+            pass
+
+
+def build_server(socket_path: str | Path | None = None) -> WrenDaemon:
+    """Import the CLI and engine stack once and bind a :class:`WrenDaemon`."""
+    from importlib import import_module  # noqa: PLC0415
+
+    import typer  # noqa: PLC0415
+
+    from wren.cli import app  # noqa: PLC0415
+
+    import_module("wren.engine")
+    return WrenDaemon(socket_path or default_socket_path(), typer.main.get_command(app))
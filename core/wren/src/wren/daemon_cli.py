@@ -0,0 +1,75 @@
+"""``wren daemon`` — a warm wren process for repeated CLI calls."""
+
+from __future__ import annotations
+
+from typing import Annotated, Optional
+
+import typer
+
+daemon_app = typer.Typer(
+    name="daemon",
+    help="Keep a warm wren process that `wrenc` runs commands in.",
+)
+
+SocketOpt = Annotated[
+    Optional[str],
+    typer.Option(
+        "--socket",
+        help="Unix socket path (default: WREN_DAEMON_SOCKET or ~/.wren/daemon.sock).",
+    ),
+]
+
+
+@daemon_app.command()
+def start(socket_path: SocketOpt = None) -> None:
+    """Serve `wrenc` clients until Ctrl+C.
+
+    `wrenc <args>` behaves like `wren <args>`, but runs the command in this
+    process: imports, engines with their open connections, and embedding
+    models stay warm between calls. Without a running daemon, `wrenc` runs
+    `wren` itself.
+    """
+    from wren.daemon import build_server  # noqa: PLC0415
+
+    try:
+        server = build_server(socket_path)
+    except RuntimeError as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(1)
+    typer.echo(
+        f"wren daemon listening on {server.socket_path}. Ctrl+C to stop.", err=True
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        typer.echo("wren daemon stopped.", err=True)
+
+
+def _request(socket_path: str | None, op: str) -> dict:
+    from wren.daemon_client import default_socket_path, request  # noqa: PLC0415
+
+    path = socket_path or default_socket_path()
+    try:
+        return request(path, {"op": op})
+    except OSError:
+        typer.echo(f"No wren daemon is listening on {path}.", err=True)
+        raise typer.Exit(1)
+
+
+@daemon_app.command()
+def status(socket_path: SocketOpt = None) -> None:
+    """Show whether the daemon is running and what it keeps warm."""
+    info = _request(socket_path, "info")
+    typer.echo(f"wren daemon {info['version']} (pid {info['pid']})")
+    typer.echo(f"  commands run: {info['commands']}")
+    typer.echo(f"  warm engines: {info['engines']} ({info['engine_hits']} reuse(s))")
+
+
+@daemon_app.command()
+def stop(socket_path: SocketOpt = None) -> None:
+    """Stop a running daemon."""
+    _request(socket_path, "stop")
+    typer.echo("wren daemon stopping.")
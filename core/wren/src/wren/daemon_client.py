@@ -0,0 +1,140 @@
+"""Thin ``wrenc`` client: run a ``wren`` command in the daemon if one is up.
+
+``wrenc`` takes exactly the arguments of ``wren``. When ``wren daemon
+start`` is listening on :func:`default_socket_path`, the argv, working
+directory and environment go over the socket and the command's output is
+streamed back; otherwise — or for commands that must run locally, see
+:func:`runs_locally` — ``wren`` itself is executed. Either way the exit code
+is the command's.
+
+Standard library only, so the client starts in milliseconds.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import socket
+import sys
+from pathlib import Path
+from typing import TextIO
+
+# Long-running, interactive or stdin-reading commands, by argv prefix.
+LOCAL_ONLY: tuple[tuple[str, ...], ...] = (
+    ("daemon",),
+    ("serve",),
+    ("genbi",),
+    ("profile",),
+    ("memory", "watch"),
+    ("memory", "embed-server"),
+    ("memory", "reset"),
+)
+
+# Commands that ask for confirmation unless given ``--force``/``-f``.
+PROMPTS_UNLESS_FORCED: tuple[tuple[str, ...], ...] = (("memory", "forget"),)
+
+
+def default_socket_path() -> Path:
+    """``WREN_DAEMON_SOCKET``, else ``~/.wren/daemon.sock``."""
+    env = os.getenv("WREN_DAEMON_SOCKET")
+    if env:
+        return Path(env).expanduser()
+    return Path.home() / ".wren" / "daemon.sock"
+
+
+def runs_locally(argv: list[str], *, piped_stdin: bool = False) -> bool:
+    """True when *argv* must not be forwarded to the daemon.
+
+    Besides :data:`LOCAL_ONLY`, that is any command that may read standard
+    input, which the daemon does not forward: a ``-`` argument, input piped
+    into the client (*piped_stdin*), or a confirmation prompt
+    (:data:`PROMPTS_UNLESS_FORCED` without ``--force``).
+    """
+    if piped_stdin or "-" in argv:
+        return True
+    words = [a for a in argv if not a.startswith("-")]
+
+    def matches(prefixes: tuple[tuple[str, ...], ...]) -> bool:
+        return any(tuple(words[: len(p)]) == p for p in prefixes)
+
+    if matches(PROMPTS_UNLESS_FORCED) and not {"--force", "-f"} & set(argv):
+        return True
+    return matches(LOCAL_ONLY)
+
+
+def _stdin_is_piped() -> bool:
+    """True when standard input is open and not a terminal."""
+    try:
+        return sys.stdin is not None and not sys.stdin.isatty()
+    except ValueError:  # closed
+        return False
+
+
+def request(socket_path: str | Path, payload: dict, timeout: float = 2.0) -> dict:
+    """Send one request and return the daemon's single-line reply."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(str(socket_path))
+        sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as reader:
+            return json.loads(reader.readline() or b"{}")
+
+
+def forward(
+    argv: list[str],
+    *,
+    socket_path: str | Path | None = None,
+    stdout: TextIO | None = None,
+    stderr: TextIO | None = None,
+) -> int | None:
+    """Run *argv* in the daemon, streaming its output; returns the exit code.
+
+    Returns None — nothing was run — when no daemon is listening or it
+    declines the command (e.g. a different ``WREN_HOME``).
+    """
+    stdout = stdout or sys.stdout
+    stderr = stderr or sys.stderr
+    payload = {"op": "run", "argv": argv, "cwd": os.getcwd(), "env": dict(os.environ)}
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    started = False
+    try:
+        sock.connect(str(socket_path or default_socket_path()))
+        sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+        for line in sock.makefile("rb"):
+            reply = json.loads(line)
+            if "error" in reply and not started:
+                return None
+            started = True
+            if "out" in reply:
+                stdout.write(reply["out"])
+                stdout.flush()
+            elif "err" in reply:
+                stderr.write(reply["err"])
+                stderr.flush()
+            elif "exit" in reply:
+                return int(reply["exit"])
+    except OSError:
+        if not started:
+            return None
+    finally:
+        sock.close()
+    stderr.write("Error: lost connection to the wren daemon.\n")
+    return 1
+
+
+def main() -> None:
+    """``wrenc`` console entry point."""
+    argv = sys.argv[1:]
+    local = runs_locally(argv, piped_stdin=_stdin_is_piped())
+    code = None if local else forward(argv)
+    if code is not None:
+        sys.exit(code)
+    wren = shutil.which("wren")
+    if wren:
+        os.execv(wren, [wren, *argv])
+    os.execv(sys.executable, [sys.executable, "-m", "wren.cli", *argv])
+
+
+if __name__ == "__main__":
+    main()
@@ -159,6 +159,21 @@ class WrenEngine:
     # Lifecycle
     # ------------------------------------------------------------------
 
+    def clone(self) -> WrenEngine:
+        """Return a new engine with the same MDL and connection settings.
+
+        The clone opens its own connector on first use, so it can run queries
+        on another thread without sharing a database connection.
+        """
+        return WrenEngine(
+            self.manifest_str,
+            self.data_source,
+            self.connection_info,
+            self.function_path,
+            fallback=self._fallback,
+            config=self._config,
+        )
+
     def close(self) -> None:
         if self._connector is not None:
             self._connector.close()
@@ -8,34 +8,230 @@ has already verified the ``mcp`` extra is installed (see ``serve_cli.py``).
 
 from __future__ import annotations
 
+import functools
+import inspect
 import json
 import math
-from dataclasses import dataclass
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from datetime import date, datetime, time
 from decimal import Decimal
 from pathlib import Path
 from typing import Any, Callable
 
+import anyio
 from loguru import logger
 from mcp.server.fastmcp import FastMCP
 from mcp.types import ToolAnnotations
 
+from wren.serve_runtime import (
+    SessionRateLimiter,
+    SingleFlight,
+    ToolBusyError,
+    ToolMetrics,
+)
+
 DEFAULT_ROW_LIMIT = 1000
 MAX_ROW_LIMIT = 10000
+DEFAULT_WORKER_THREADS = 8
+DEFAULT_DRAIN_TIMEOUT = 30.0
+# Tools that hold a warehouse connection get their own concurrency slots, so
+# a burst of them can never occupy the threads metadata tools run on.
+DEFAULT_TOOL_LIMITS = {"run_sql": 4, "query_cube": 4, "dry_run": 4}
+DEFAULT_QUEUE_SIZE = 16
+DEFAULT_SESSION_BURST = 10
 
 
 @dataclass
 class ServeContext:
-    """Shared state captured once at startup and used by every tool handler."""
+    """Shared state captured once at startup and used by every tool handler.
+
+    Tool handlers run on worker threads. A tool named in ``tool_limits`` runs
+    at most that many calls at once, with up to ``queue_size`` more waiting;
+    further calls are rejected with :class:`ToolBusyError`. All other tools
+    share a pool of ``threads`` slots. ``session_rate`` (calls per second,
+    0 = off) caps each MCP session with a token bucket of ``session_burst``.
+
+    When ``engine_factory`` is set, handlers that touch the database lease
+    their own engine (and therefore their own connector) from a per-process
+    pool seeded with ``engine``; without it every handler shares ``engine``.
+    """
 
     project: Path
     engine: Any  # wren.engine.WrenEngine
     allow_write: bool
     no_connect: bool
+    threads: int = DEFAULT_WORKER_THREADS
+    engine_factory: Callable[[], Any] | None = None
+    metrics: ToolMetrics = field(default_factory=ToolMetrics)
+    tool_limits: dict[str, int] = field(
+        default_factory=lambda: dict(DEFAULT_TOOL_LIMITS)
+    )
+    queue_size: int = DEFAULT_QUEUE_SIZE
+    session_rate: float = 0.0
+    session_burst: int = DEFAULT_SESSION_BURST
+
+    def __post_init__(self) -> None:
+        if self.threads < 1:
+            raise ValueError(f"threads must be at least 1, got {self.threads}.")
+        for name, limit in self.tool_limits.items():
+            if limit < 1:
+                raise ValueError(f"Limit for '{name}' must be at least 1, got {limit}.")
+        self.limiter = anyio.CapacityLimiter(self.threads)
+        self._tool_limiters = {
+            name: anyio.CapacityLimiter(limit)
+            for name, limit in self.tool_limits.items()
+        }
+        self.rate_limiter = (
+            SessionRateLimiter(self.session_rate, self.session_burst)
+            if self.session_rate > 0
+            else None
+        )
+        self.single_flight = SingleFlight(self.metrics)
+        self._pool_lock = threading.Lock()
+        self._idle_engines: list[Any] = [self.engine]
+        self._spawned_engines: list[Any] = []
+
+    @contextmanager
+    def lease_engine(self) -> Iterator[Any]:
+        """Borrow an engine for the duration of one tool call.
+
+        The pool grows on demand; its size is bounded by the concurrency
+        limits, since only that many handlers can hold a lease at once.
+        """
+        if self.engine_factory is None:
+            yield self.engine
+            return
+        with self._pool_lock:
+            engine = self._idle_engines.pop() if self._idle_engines else None
+        if engine is None:
+            engine = self.engine_factory()
+            with self._pool_lock:
+                self._spawned_engines.append(engine)
+        try:
+            yield engine
+        finally:
+            with self._pool_lock:
+                self._idle_engines.append(engine)
+
+    def admit(self, tool: str, session: object | None = None):
+        """Apply admission control to one call and return its thread limiter.
+
+        Raises :class:`ToolBusyError` when ``session`` is over its rate limit
+        or when ``tool`` is at its concurrency limit with a full wait queue.
+        Only the event loop calls this, so check-then-enqueue does not race.
+        """
+        if self.rate_limiter is not None and session is not None:
+            wait = self.rate_limiter.acquire(session)
+            if wait:
+                self.metrics.reject(tool, "rate_limited")
+                raise ToolBusyError(tool, "rate_limited", wait)
+
+        limiter = self._tool_limiters.get(tool)
+        if limiter is None:
+            return self.limiter
+        saturated = limiter.borrowed_tokens >= limiter.total_tokens
+        if saturated and self.metrics.queued(tool) >= self.queue_size:
+            self.metrics.reject(tool, "busy")
+            # Roughly one mean execution time frees a slot for the queue head.
+            retry_after = self.metrics.mean_latency(tool) or 1.0
+            raise ToolBusyError(tool, "busy", retry_after)
+        return limiter
+
+    def close(self) -> None:
+        """Close every engine the pool created, including the primary one."""
+        with self._pool_lock:
+            engines = [self.engine, *self._spawned_engines]
+            self._spawned_engines = []
+        for engine in engines:
+            if hasattr(engine, "close"):
+                engine.close()
+
+
+def _tool(
+    mcp: FastMCP,
+    ctx: ServeContext,
+    *,
+    coalesce: tuple[str, ...] = (),
+    **kwargs: Any,
+) -> Callable:
+    """Register a blocking tool handler that runs on ``ctx``'s worker threads.
+
+    FastMCP calls sync handlers inline on the event loop, so one slow
+    warehouse query would stall every other session on the server. The
+    registered wrapper is async: it passes the call through
+    :meth:`ServeContext.admit`, then hands it to a thread bounded by the
+    limiter that returns, recording queue depth, in-flight count and latency
+    in ``ctx.metrics``. ``functools.wraps`` keeps the original signature and
+    docstring, which FastMCP uses for the tool schema and description.
+
+    With *coalesce*, concurrent calls whose named arguments are equal share
+    one execution through ``ctx.single_flight``. The duplicates wait on the
+    event loop, before admission, so they take no thread or limiter slot.
+    """
+
+    def decorator(fn: Callable) -> Callable:
+        name = fn.__name__
+        signature = inspect.signature(fn)
+
+        async def run(arguments: dict[str, Any]) -> Any:
+            started = False
+
+            def call() -> Any:
+                nonlocal started
+                started = True
+                with ctx.metrics.track(name):
+                    return fn(**arguments)
+
+            limiter = ctx.admit(name, _current_session(mcp))
+            ctx.metrics.enqueue(name)
+            try:
+                return await anyio.to_thread.run_sync(call, limiter=limiter)
+            finally:
+                if not started:
+                    ctx.metrics.dequeue(name)
+
+        @functools.wraps(fn)
+        async def handler(**arguments: Any) -> Any:
+            if not coalesce:
+                return await run(arguments)
+            bound = signature.bind(**arguments)
+            bound.apply_defaults()
+            key = tuple(bound.arguments[arg] for arg in coalesce)
+            return await ctx.single_flight.do(
+                name, key, functools.partial(run, arguments)
+            )
+
+        mcp.tool(**kwargs)(handler)
+        return handler
+
+    return decorator
 
 
-def _memory_path(ctx: ServeContext) -> str:
-    """Return the project-local memory path derived solely from ctx.project."""
+def _current_session(mcp: FastMCP) -> object | None:
+    """Return the MCP session of the request being handled, if any.
+
+    Stateless HTTP creates a session per request, so per-session rate limits
+    only bite on stdio and stateful HTTP.
+    """
+    try:
+        return mcp.get_context().session
+    except ValueError:
+        return None
+
+
+def _memory_path(ctx: ServeContext) -> str | None:
+    """Return the project-local memory path derived solely from ctx.project.
+
+    None under ``WREN_MEMORY_SHARED_DIR``: the project's memory is then its
+    namespace in the shared directory (see :mod:`wren.memory.service`).
+    """
+    from wren.memory.service import shared_memory_dir  # noqa: PLC0415
+
+    if shared_memory_dir() is not None:
+        return None
     return str(ctx.project / ".wren" / "memory")
 
 
@@ -80,12 +276,14 @@ def _query_with_limit_probe(ctx: ServeContext, sql: str, limit: int | None) -> d
 
     The connector owns dialect-specific row limiting for opaque user SQL. The
     requested limit is capped at ``MAX_ROW_LIMIT`` before the probe is applied.
+    The SQL is planned once, by the leased engine that runs it.
     """
     if limit is not None and limit < 0:
         raise ValueError(f"run_sql limit must be non-negative, got {limit}.")
     effective_limit = DEFAULT_ROW_LIMIT if limit is None else limit
     effective_limit = min(effective_limit, MAX_ROW_LIMIT)
-    table = ctx.engine.query(sql, effective_limit + 1)
+    with ctx.lease_engine() as engine:
+        table = engine.query(sql, effective_limit + 1)
     truncated = table.num_rows > effective_limit
     if truncated:
         table = table.slice(0, effective_limit)
@@ -105,7 +303,8 @@ def _query_cube_with_limit_probe(
     effective_limit = DEFAULT_ROW_LIMIT if limit is None else limit
     effective_limit = min(effective_limit, MAX_ROW_LIMIT)
     sql = build_sql(effective_limit + 1)
-    table = ctx.engine.query(sql, None)
+    with ctx.lease_engine() as engine:
+        table = engine.query(sql, None)
     truncated = table.num_rows > effective_limit
     if truncated:
         table = table.slice(0, effective_limit)
@@ -114,8 +313,11 @@ def _query_cube_with_limit_probe(
 
 def _register_query_tools(mcp: FastMCP, ctx: ServeContext) -> None:
     if not ctx.no_connect:
-
-        @mcp.tool(
+        # Identical concurrent queries share one warehouse execution.
+        @_tool(
+            mcp,
+            ctx,
+            coalesce=("sql", "limit"),
             annotations=ToolAnnotations(title="Run SQL", readOnlyHint=True),
         )
         def run_sql(sql: str, limit: int | None = None) -> dict:
@@ -128,7 +330,9 @@ def _register_query_tools(mcp: FastMCP, ctx: ServeContext) -> None:
             """
             return _query_with_limit_probe(ctx, sql, limit)
 
-        @mcp.tool(
+        @_tool(
+            mcp,
+            ctx,
             annotations=ToolAnnotations(title="Dry Run SQL", readOnlyHint=True),
         )
         def dry_run(sql: str) -> dict:
@@ -137,11 +341,12 @@ def _register_query_tools(mcp: FastMCP, ctx: ServeContext) -> None:
             Cheap way to check a query is valid before calling ``run_sql``.
             Raises on failure with the engine's error message.
             """
-            ctx.engine.dry_run(sql)
+            with ctx.lease_engine() as engine:
+                engine.dry_run(sql)
             return {"ok": True}
 
-        @mcp.tool(
-            annotations=ToolAnnotations(title="Query Cube", readOnlyHint=True),
+        @_tool(
+            mcp, ctx, annotations=ToolAnnotations(title="Query Cube", readOnlyHint=True)
         )
         def query_cube(
             cube: str | None = None,
@@ -194,29 +399,28 @@ def _register_query_tools(mcp: FastMCP, ctx: ServeContext) -> None:
 
             return _query_cube_with_limit_probe(ctx, build_sql, limit)
 
-    @mcp.tool(
-        annotations=ToolAnnotations(title="Dry Plan SQL", readOnlyHint=True),
+    @_tool(
+        mcp, ctx, annotations=ToolAnnotations(title="Dry Plan SQL", readOnlyHint=True)
     )
     def dry_plan(sql: str) -> str:
         """Expand SQL through the MDL semantic layer and return the target-dialect SQL.
 
         No database connection is used — this only shows what would run.
         """
-        return ctx.engine.dry_plan(sql)
+        with ctx.lease_engine() as engine:
+            return engine.dry_plan(sql)
 
 
 def _register_context_tools(mcp: FastMCP, ctx: ServeContext) -> None:
-    @mcp.tool(
-        annotations=ToolAnnotations(title="Get MDL", readOnlyHint=True),
-    )
+    @_tool(mcp, ctx, annotations=ToolAnnotations(title="Get MDL", readOnlyHint=True))
     def get_mdl() -> dict:
         """Return the full compiled MDL (models, relationships, cubes) as JSON."""
         from wren.context import build_json  # noqa: PLC0415
 
         return build_json(ctx.project)
 
-    @mcp.tool(
-        annotations=ToolAnnotations(title="List Models", readOnlyHint=True),
+    @_tool(
+        mcp, ctx, annotations=ToolAnnotations(title="List Models", readOnlyHint=True)
     )
     def list_models() -> dict:
         """List the semantic models available to query, with column counts.
@@ -240,8 +444,8 @@ def _register_context_tools(mcp: FastMCP, ctx: ServeContext) -> None:
             )
         return {"models": result}
 
-    @mcp.tool(
-        annotations=ToolAnnotations(title="Describe Model", readOnlyHint=True),
+    @_tool(
+        mcp, ctx, annotations=ToolAnnotations(title="Describe Model", readOnlyHint=True)
     )
     def describe_model(name: str) -> dict:
         """Describe a model's columns, primary key, ref SQL, and relationships."""
@@ -276,7 +480,9 @@ def _register_context_tools(mcp: FastMCP, ctx: ServeContext) -> None:
             "relationships": relationships,
         }
 
-    @mcp.tool(
+    @_tool(
+        mcp,
+        ctx,
         annotations=ToolAnnotations(title="Get Data Source", readOnlyHint=True),
     )
     def get_data_source() -> dict:
@@ -285,9 +491,7 @@ def _register_context_tools(mcp: FastMCP, ctx: ServeContext) -> None:
 
         return {"data_source": load_project_config(ctx.project).get("data_source")}
 
-    @mcp.tool(
-        annotations=ToolAnnotations(title="List Cubes", readOnlyHint=True),
-    )
+    @_tool(mcp, ctx, annotations=ToolAnnotations(title="List Cubes", readOnlyHint=True))
     def list_cubes() -> dict:
         """List cubes defined in the project with their measures/dimensions.
 
@@ -313,8 +517,8 @@ def _register_context_tools(mcp: FastMCP, ctx: ServeContext) -> None:
             )
         return {"cubes": result}
 
-    @mcp.tool(
-        annotations=ToolAnnotations(title="Describe Cube", readOnlyHint=True),
+    @_tool(
+        mcp, ctx, annotations=ToolAnnotations(title="Describe Cube", readOnlyHint=True)
     )
     def describe_cube(name: str) -> dict:
         """Return the full definition of a cube (measures, dimensions, etc)."""
@@ -326,29 +530,41 @@ def _register_context_tools(mcp: FastMCP, ctx: ServeContext) -> None:
             raise ValueError(f"Cube '{name}' not found.")
         return cube
 
-    @mcp.tool(
-        annotations=ToolAnnotations(title="List Functions", readOnlyHint=True),
+    @_tool(
+        mcp, ctx, annotations=ToolAnnotations(title="List Functions", readOnlyHint=True)
     )
-    def list_functions() -> dict:
+    def list_functions(
+        prefix: str | None = None,
+        keyword: str | None = None,
+        function_type: str | None = None,
+        limit: int | None = None,
+    ) -> dict:
         """List SQL functions available for the project's data source.
 
         No database connection is required — functions are registered per
-        data source at session-context construction time. Returns
-        ``{"functions": [...]}``.
+        data source. Optionally narrow by name ``prefix``, a ``keyword`` in
+        the name or description, or ``function_type`` (``scalar``,
+        ``aggregate``, ``window``). Returns ``{"functions": [...]}``.
         """
-        from wren.mdl import get_session_context  # noqa: PLC0415
+        from wren.mdl.function_catalog import get_function_catalog  # noqa: PLC0415
 
-        session = get_session_context(
-            ctx.engine.manifest_str,
-            ctx.engine.function_path,
-            None,
-            ctx.engine.data_source.name,
+        catalog = get_function_catalog(
+            ctx.engine.data_source.name, ctx.engine.function_path
         )
-        return {"functions": [f.to_dict() for f in session.get_available_functions()]}
+        return {
+            "functions": catalog.search(
+                prefix=prefix,
+                keyword=keyword,
+                function_type=function_type,
+                limit=limit,
+            )
+        }
 
 
 def _register_knowledge_tools(mcp: FastMCP, ctx: ServeContext) -> None:
-    @mcp.tool(
+    @_tool(
+        mcp,
+        ctx,
         annotations=ToolAnnotations(title="Get Instructions", readOnlyHint=True),
     )
     def get_instructions() -> dict:
@@ -358,7 +574,11 @@ def _register_knowledge_tools(mcp: FastMCP, ctx: ServeContext) -> None:
         content, used_legacy = load_rules(ctx.project)
         return {"instructions": content or "", "used_legacy": used_legacy}
 
-    @mcp.tool(
+    # Fan-out clients often ask the same question at the same moment.
+    @_tool(
+        mcp,
+        ctx,
+        coalesce=("question", "limit"),
         annotations=ToolAnnotations(title="Recall Queries", readOnlyHint=True),
     )
     def recall_queries(question: str, limit: int = 3) -> dict:
@@ -370,19 +590,18 @@ def _register_knowledge_tools(mcp: FastMCP, ctx: ServeContext) -> None:
         """
         from wren.memory.index_backend import get_index  # noqa: PLC0415
 
-        mem_path = _memory_path(ctx)
-
-        idx = get_index(ctx.project, mem_path)
+        idx = get_index(ctx.project, _memory_path(ctx))
         return {"matches": idx.search(question, limit=limit)}
 
-    @mcp.tool(
-        annotations=ToolAnnotations(title="Get Context", readOnlyHint=True),
+    @_tool(
+        mcp, ctx, annotations=ToolAnnotations(title="Get Context", readOnlyHint=True)
     )
     def get_context(
         question: str,
         limit: int = 5,
         item_type: str | None = None,
         model_name: str | None = None,
+        budget_tokens: int | None = None,
     ) -> dict:
         """Semantic retrieval of the schema fragments relevant to a question.
 
@@ -391,24 +610,36 @@ def _register_knowledge_tools(mcp: FastMCP, ctx: ServeContext) -> None:
         Uses embedding search when the ``memory`` extra is installed and the
         schema has been indexed (``wren memory index``); otherwise falls back
         to the full plain-text schema description (same content as
-        ``describe_schema``).
+        ``describe_schema``). With ``budget_tokens``, returns schema text
+        packed to that many tokens instead: the most relevant models, the
+        models they join to (key columns) and the relationships between them.
         """
         from wren.context import build_json  # noqa: PLC0415
         from wren.memory import schema_indexer  # noqa: PLC0415
 
         manifest = build_json(ctx.project)
         try:
-            from wren.memory.store import MemoryStore  # noqa: PLC0415
+            from wren.memory.service import project_store  # noqa: PLC0415
 
-            store = MemoryStore(path=_memory_path(ctx))
+            store = project_store(ctx.project)
             return store.get_context(
                 manifest,
                 question,
                 limit=limit,
                 item_type=item_type,
                 model_name=model_name,
+                budget=budget_tokens,
             )
         except ImportError:
+            if budget_tokens is not None:
+                # Budget packing is dependency-free; it ranks lexically here.
+                from wren.memory.context_assembly import (  # noqa: PLC0415
+                    budget_context,
+                )
+
+                return budget_context(
+                    manifest, question, budget_tokens, model_name=model_name
+                )
             # Only the missing `memory` extra falls back to full-text; real
             # index/embedding errors from an installed store surface as-is.
             return {
@@ -420,7 +651,9 @@ def _register_knowledge_tools(mcp: FastMCP, ctx: ServeContext) -> None:
                 ),
             }
 
-    @mcp.tool(
+    @_tool(
+        mcp,
+        ctx,
         annotations=ToolAnnotations(title="Describe Schema", readOnlyHint=True),
     )
     def describe_schema() -> dict:
@@ -435,7 +668,9 @@ def _register_knowledge_tools(mcp: FastMCP, ctx: ServeContext) -> None:
 
         return {"schema": schema_indexer.describe_schema(build_json(ctx.project))}
 
-    @mcp.tool(
+    @_tool(
+        mcp,
+        ctx,
         annotations=ToolAnnotations(title="List Stored Queries", readOnlyHint=True),
     )
     def list_stored_queries(
@@ -448,9 +683,9 @@ def _register_knowledge_tools(mcp: FastMCP, ctx: ServeContext) -> None:
         "user", "seed"). Returns ``{"queries": [...]}``.
         """
         try:
-            from wren.memory.store import MemoryStore  # noqa: PLC0415
+            from wren.memory.service import project_store  # noqa: PLC0415
 
-            store = MemoryStore(path=_memory_path(ctx))
+            store = project_store(ctx.project)
             rows, _total = store.list_queries(
                 source=source,
                 limit=limit if limit is not None else MAX_ROW_LIMIT,
@@ -476,8 +711,8 @@ def _register_knowledge_tools(mcp: FastMCP, ctx: ServeContext) -> None:
             ]
             return {"queries": queries}
 
-    @mcp.tool(
-        annotations=ToolAnnotations(title="List Knowledge", readOnlyHint=True),
+    @_tool(
+        mcp, ctx, annotations=ToolAnnotations(title="List Knowledge", readOnlyHint=True)
     )
     def list_knowledge() -> dict:
         """List knowledge files readable via the wren://knowledge/{path} resource.
@@ -502,8 +737,8 @@ def _register_knowledge_tools(mcp: FastMCP, ctx: ServeContext) -> None:
 
 
 def _register_write_tools(mcp: FastMCP, ctx: ServeContext) -> None:
-    @mcp.tool(
-        annotations=ToolAnnotations(title="Store Query", readOnlyHint=False),
+    @_tool(
+        mcp, ctx, annotations=ToolAnnotations(title="Store Query", readOnlyHint=False)
     )
     def store_query(
         nl_query: str,
@@ -524,9 +759,9 @@ def _register_write_tools(mcp: FastMCP, ctx: ServeContext) -> None:
         )
 
         try:
-            from wren.memory.store import MemoryStore  # noqa: PLC0415
+            from wren.memory.service import project_store  # noqa: PLC0415
 
-            MemoryStore(path=_memory_path(ctx)).store_query(
+            project_store(ctx.project).store_query(
                 nl_query, sql_query, datasource=datasource, tags=tags
             )
         except Exception as e:
@@ -671,9 +906,25 @@ def _register_prompts(mcp: FastMCP, ctx: ServeContext) -> None:
         return _workflow_text(ctx, question)
 
 
-def build_server(ctx: ServeContext) -> FastMCP:
-    """Build and register all tools on a FastMCP server instance."""
-    mcp = FastMCP("wren")
+def _register_metrics_route(mcp: FastMCP, ctx: ServeContext) -> None:
+    @mcp.custom_route("/metrics", methods=["GET"])
+    async def metrics(request):
+        """Prometheus text exposition of this process's tool metrics."""
+        from starlette.responses import PlainTextResponse  # noqa: PLC0415
+
+        return PlainTextResponse(
+            ctx.metrics.render_prometheus(),
+            media_type="text/plain; version=0.0.4",
+        )
+
+
+def build_server(ctx: ServeContext, *, stateless_http: bool = False) -> FastMCP:
+    """Build and register all tools on a FastMCP server instance.
+
+    ``stateless_http`` drops per-session state on the HTTP transport so any
+    worker process can answer any request (required for ``--workers > 1``).
+    """
+    mcp = FastMCP("wren", stateless_http=stateless_http)
 
     _register_query_tools(mcp, ctx)
     _register_context_tools(mcp, ctx)
@@ -682,26 +933,53 @@ def build_server(ctx: ServeContext) -> FastMCP:
         _register_write_tools(mcp, ctx)
     _register_resources(mcp, ctx)
     _register_prompts(mcp, ctx)
+    _register_metrics_route(mcp, ctx)
 
     return mcp
 
 
+def build_http_app(
+    ctx: ServeContext,
+    *,
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    stateless_http: bool = False,
+):
+    """Build the Streamable HTTP ASGI app (``/mcp`` plus ``/metrics``)."""
+    mcp = build_server(ctx, stateless_http=stateless_http)
+    mcp.settings.host = host
+    mcp.settings.port = port
+    return mcp.streamable_http_app()
+
+
 def run_server(
     ctx: ServeContext,
     *,
     transport: str = "stdio",
     host: str = "127.0.0.1",
     port: int = 8080,
+    drain_timeout: float = DEFAULT_DRAIN_TIMEOUT,
 ) -> None:
-    """Build the FastMCP server and run it on the given transport."""
-    mcp = build_server(ctx)
+    """Build the FastMCP server and run it on the given transport.
 
+    On the HTTP transport, shutdown (Ctrl+C / SIGTERM) stops accepting new
+    connections and waits up to ``drain_timeout`` seconds for in-flight
+    requests before closing them.
+    """
     if transport == "stdio":
-        mcp.run(transport="stdio")
+        build_server(ctx).run(transport="stdio")
     elif transport == "http":
-        mcp.settings.host = host
-        mcp.settings.port = port
+        import uvicorn  # noqa: PLC0415
+
+        app = build_http_app(ctx, host=host, port=port)
         logger.info(f"Serving wren MCP over streamable-http at {host}:{port}")
-        mcp.run(transport="streamable-http")
+        config = uvicorn.Config(
+            app,
+            host=host,
+            port=port,
+            log_level="info",
+            timeout_graceful_shutdown=drain_timeout,
+        )
+        uvicorn.Server(config).run()
     else:
         raise ValueError(f"Unsupported transport '{transport}'.")
@@ -0,0 +1,98 @@
+"""Per-data-source catalog of SQL functions known to wren-core.
+
+``SessionContext.get_available_functions()`` crosses into Rust, wraps every
+registered UDF in a ``PyRemoteFunction`` and needs ``to_dict()`` per entry —
+too much work to repeat for every ``list_functions`` call. The registered set
+depends only on the data source and the optional custom-function CSV, never on
+the manifest, so the catalog is built once per ``(data_source, function_path)``
+from a manifest-free SessionContext and then answered from plain dicts.
+"""
+
+from __future__ import annotations
+
+import bisect
+from functools import lru_cache
+
+import wren_core
+
+
+class FunctionCatalog:
+    """Function descriptors indexed by name and by ``function_type``.
+
+    Descriptors are the ``to_dict()`` shape wren-core returns (``name``,
+    ``function_type``, ``return_type``, ``param_names``, ``param_types``,
+    ``description``), ordered by name. Lookups return copies so callers may
+    mutate results without touching the cached catalog.
+    """
+
+    def __init__(self, functions: list[dict]):
+        self._functions = sorted(
+            functions, key=lambda f: (f["name"].lower(), f.get("function_type") or "")
+        )
+        self._names = [f["name"].lower() for f in self._functions]
+        self._by_type: dict[str, list[int]] = {}
+        for i, f in enumerate(self._functions):
+            self._by_type.setdefault(f.get("function_type") or "", []).append(i)
+
+    def __len__(self) -> int:
+        return len(self._functions)
+
+    def categories(self) -> dict[str, int]:
+        """Return the number of functions per ``function_type``."""
+        return {kind: len(idx) for kind, idx in sorted(self._by_type.items())}
+
+    def get(self, name: str) -> list[dict]:
+        """Return every overload registered under ``name`` (case-insensitive)."""
+        return self.search(prefix=name, exact=True)
+
+    def search(
+        self,
+        *,
+        prefix: str | None = None,
+        keyword: str | None = None,
+        function_type: str | None = None,
+        limit: int | None = None,
+        exact: bool = False,
+    ) -> list[dict]:
+        """Filter the catalog; all filters are optional and case-insensitive.
+
+        ``prefix`` matches the start of the function name (the whole name when
+        ``exact``), ``keyword`` a substring of the name or description, and
+        ``function_type`` the category (``scalar``, ``aggregate``, ``window``).
+        """
+        if prefix:
+            needle = prefix.lower()
+            lo = bisect.bisect_left(self._names, needle)
+            if exact:
+                hi = bisect.bisect_right(self._names, needle)
+            else:
+                # Every name with this prefix sorts before prefix + U+10FFFF.
+                hi = bisect.bisect_left(self._names, needle + "\U0010ffff")
+            candidates = range(lo, hi)
+        else:
+            candidates = range(len(self._functions))
+
+        if function_type:
+            allowed = set(self._by_type.get(function_type.lower(), ()))
+            candidates = [i for i in candidates if i in allowed]
+
+        term = keyword.lower() if keyword else None
+        results: list[dict] = []
+        for i in candidates:
+            if limit is not None and len(results) >= limit:
+                break
+            f = self._functions[i]
+            if term and term not in self._names[i]:
+                if term not in (f.get("description") or "").lower():
+                    continue
+            results.append(dict(f))
+        return results
+
+
+@lru_cache(maxsize=16)
+def get_function_catalog(
+    data_source: str | None, function_path: str | None = None
+) -> FunctionCatalog:
+    """Build (or reuse) the function catalog for a data source."""
+    session = wren_core.SessionContext(None, function_path, None, data_source)
+    return FunctionCatalog([f.to_dict() for f in session.get_available_functions()])
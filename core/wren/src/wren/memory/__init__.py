@@ -59,17 +59,23 @@ class WrenMemory:
         item_type: str | None = None,
         model_name: str | None = None,
         threshold: int | None = None,
+        mode: str | None = None,
+        budget: int | None = None,
     ) -> dict:
         """Return schema context using the best strategy for the schema size.
 
         Small schemas (below *threshold* chars) are returned as full plain
         text.  Large schemas use embedding search with optional filters.
         See :data:`~wren.memory.schema_indexer.SCHEMA_DESCRIBE_THRESHOLD`.
+        A token *budget* packs the most relevant models and their
+        relationship neighbours instead (``strategy="budget"``).
         """
         kwargs: dict = {
             "limit": limit,
             "item_type": item_type,
             "model_name": model_name,
+            "mode": mode,
+            "budget": budget,
         }
         if threshold is not None:
             kwargs["threshold"] = threshold
@@ -92,9 +98,12 @@ class WrenMemory:
         *,
         limit: int = 3,
         datasource: str | None = None,
+        mode: str | None = None,
     ) -> list[dict]:
-        """Search past NL→SQL pairs by semantic similarity."""
-        return self._store.recall_queries(query, limit=limit, datasource=datasource)
+        """Search past NL→SQL pairs (hybrid BM25 + vector by default)."""
+        return self._store.recall_queries(
+            query, limit=limit, datasource=datasource, mode=mode
+        )
 
     def schema_is_current(self, manifest: dict) -> bool:
         """Check if the indexed schema matches the given manifest."""
@@ -39,6 +39,13 @@ MdlOpt = Annotated[
 OutputOpt = Annotated[
     str, typer.Option("--output", "-o", help="Output format: json|table")
 ]
+ModeOpt = Annotated[
+    Optional[str],
+    typer.Option(
+        "--mode",
+        help="Ranking: hybrid (BM25 + vector, default) or vector. LanceDB backend only.",
+    ),
+]
 
 
 # ── Helpers ───────────────────────────────────────────────────────────────
@@ -85,16 +92,33 @@ def _load_manifest(mdl: str | None) -> dict:
 
 
 def _get_store(path: str | None):
-    """Lazy-import and construct a MemoryStore."""
-    resolved = path or str(_default_memory_path())
+    """Lazy-import and construct a MemoryStore.
+
+    Without *path* and with ``WREN_MEMORY_SHARED_DIR`` set, this is the
+    project's namespace in the shared directory.
+    """
     try:
+        from wren.memory.service import (  # noqa: PLC0415
+            get_service,
+            shared_memory_dir,
+        )
         from wren.memory.store import MemoryStore  # noqa: PLC0415
 
-        return MemoryStore(path=resolved)
+        if path is None and shared_memory_dir() is not None:
+            try:
+                from wren.context import discover_project_path  # noqa: PLC0415
+
+                return get_service().store_for(discover_project_path())
+            except SystemExit:
+                return get_service().store()
+        return MemoryStore(path=path or str(_default_memory_path()))
     except ModuleNotFoundError as e:
         if (e.name or "").split(".")[0] not in {
             "lancedb",
             "sentence_transformers",
+            "onnxruntime",
+            "tokenizers",
+            "huggingface_hub",
             "pyarrow",
         }:
             raise
@@ -184,7 +208,7 @@ def index(
         except SystemExit as e:
             typer.echo(str(e), err=True)
             raise typer.Exit(1)
-        n = len(load_query_pairs(project_path))
+        n = len(load_query_pairs(project_path, cached=True))
         typer.echo(
             f"grep backend: {n} pair(s) in knowledge/sql/ — no index build needed."
         )
@@ -319,20 +343,37 @@ def fetch(
             "--threshold", help="Character threshold for full vs search strategy"
         ),
     ] = None,
+    budget: Annotated[
+        Optional[int],
+        typer.Option(
+            "--budget",
+            min=1,
+            help="Token budget: pack the most relevant models, their "
+            "relationship neighbours and key columns (overrides --threshold).",
+        ),
+    ] = None,
     path: PathOpt = None,
     output: OutputOpt = "table",
+    mode: ModeOpt = None,
 ) -> None:
     """Get schema context for an LLM.
 
     Small schemas are returned as full plain text.  Large schemas use
-    embedding search with optional --type and --model filters.
+    embedding search with optional --type and --model filters, or, with
+    --budget, a context packed to fit that many tokens.
     """
     manifest = _load_manifest(mdl)
     store = _get_store(path)
     kwargs: dict = {"limit": limit, "item_type": item_type, "model_name": model_name}
     if threshold is not None:
         kwargs["threshold"] = threshold
-    result = store.get_context(manifest, query, **kwargs)
+    if budget is not None:
+        kwargs["budget"] = budget
+    try:
+        result = store.get_context(manifest, query, mode=mode, **kwargs)
+    except ValueError as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(1) from e
     strategy = result["strategy"]
     if output.lower() == "json":
         payload = dict(result)
@@ -347,7 +388,13 @@ def fetch(
         typer.echo(json.dumps(payload, indent=2, ensure_ascii=False))
         return
     typer.echo(f"Strategy: {strategy}")
-    if strategy == "full":
+    if strategy == "budget":
+        typer.echo(
+            f"{len(result['included'])} item(s), ~{result['tokens']} of "
+            f"{result['budget']} tokens, {result['omitted']} omitted",
+            err=True,
+        )
+    if strategy in ("full", "budget"):
         typer.echo(result["schema"])
     else:
         _print_results(result["results"], output)
@@ -383,16 +430,18 @@ def store(
 
     # Best-effort: index into LanceDB when the memory extra is available.
     try:
+        from wren.memory.service import project_store  # noqa: PLC0415
         from wren.memory.store import MemoryStore  # noqa: PLC0415
 
-        resolved = path or str(_default_memory_path())
-        MemoryStore(path=resolved).store_query(
-            nl, sql, datasource=datasource, tags=tags
-        )
+        store = MemoryStore(path=path) if path else project_store(project_path)
+        store.store_query(nl, sql, datasource=datasource, tags=tags)
     except ModuleNotFoundError as e:
         if (e.name or "").split(".")[0] not in {
             "lancedb",
             "sentence_transformers",
+            "onnxruntime",
+            "tokenizers",
+            "huggingface_hub",
             "pyarrow",
         }:
             raise
@@ -406,6 +455,7 @@ def recall(
     datasource: Annotated[Optional[str], typer.Option("--datasource", "-d")] = None,
     path: PathOpt = None,
     output: OutputOpt = "table",
+    mode: ModeOpt = None,
 ) -> None:
     """Search past NL→SQL pairs over knowledge/sql/.
 
@@ -420,8 +470,12 @@ def recall(
     except SystemExit as e:
         typer.echo(str(e), err=True)
         raise typer.Exit(1)
-    idx = get_index(project, path or str(_default_memory_path()))
-    results = idx.search(query, limit=limit, datasource=datasource)
+    idx = get_index(project, path)
+    try:
+        results = idx.search(query, limit=limit, datasource=datasource, mode=mode)
+    except ValueError as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(1) from e
     _annotate_markdown_paths(results)
     _print_results(results, output)
 
@@ -439,7 +493,7 @@ def _annotate_markdown_paths(results: list[dict]) -> None:
         project = discover_project_path()
     except (SystemExit, Exception):  # noqa: BLE001 — annotation is optional
         return
-    nl_to_path = {p["nl"]: p["path"] for p in load_query_pairs(project)}
+    nl_to_path = {p["nl"]: p["path"] for p in load_query_pairs(project, cached=True)}
     for r in results:
         nl = r.get("nl_query") or r.get("nl")
         if nl and nl in nl_to_path:
@@ -459,7 +513,7 @@ def status(
     except SystemExit as e:
         typer.echo(str(e), err=True)
         raise typer.Exit(1)
-    info = get_index(project, path or str(_default_memory_path())).status()
+    info = get_index(project, path).status()
     typer.echo(f"Backend: {info['backend']}")
     if info["backend"] == "grep":
         typer.echo(f"  knowledge/sql: {info['pairs']} pair(s)")
@@ -468,8 +522,108 @@ def status(
     if not tables:
         typer.echo("No tables indexed yet.")
         return
+    if "namespace" in info:
+        typer.echo(f"  namespace: {info['namespace']}")
+    vectors = info.get("vectors", {})
     for name, count in tables.items():
-        typer.echo(f"  {name}: {count} rows")
+        line = f"  {name}: {count} rows"
+        if name in vectors:
+            line += f" ({vectors[name]} vectors)"
+        typer.echo(line)
+    for name, indexes in info.get("indexes", {}).items():
+        for ix in indexes:
+            columns = ", ".join(ix["columns"])
+            line = f"  {name}.{ix['name']} ({ix['type']} on {columns}): "
+            line += f"{ix['indexed_rows']} indexed"
+            if ix["unindexed_rows"]:
+                line += f", {ix['unindexed_rows']} unindexed"
+            typer.echo(line)
+    if "embedding_cache" in info:
+        typer.echo(f"  embedding cache: {info['embedding_cache']} vector(s)")
+
+
+@memory_app.command()
+def optimize(
+    path: PathOpt = None,
+    retention: Annotated[
+        Optional[float],
+        typer.Option(
+            "--retention",
+            min=0,
+            help="Keep dataset versions younger than this many seconds "
+            "(default: WREN_MEMORY_VERSION_RETENTION, 3600).",
+        ),
+    ] = None,
+    convert_vectors: Annotated[
+        bool,
+        typer.Option(
+            "--convert-vectors",
+            help="Rewrite tables whose vectors are not stored as "
+            "WREN_MEMORY_VECTOR_DTYPE in that type.",
+        ),
+    ] = False,
+) -> None:
+    """Compact the memory tables, prune old versions and catch indexes up."""
+    from datetime import timedelta  # noqa: PLC0415
+
+    from wren.memory.maintenance import format_report  # noqa: PLC0415
+
+    mem_store = _get_store(path)
+    report = mem_store.optimize(
+        retention=timedelta(seconds=retention) if retention is not None else None,
+        convert_vectors=convert_vectors,
+    )
+    if not report:
+        typer.echo("No tables indexed yet.")
+        return
+    for line in format_report(report):
+        typer.echo(f"  {line}")
+
+
+@memory_app.command("embed-server")
+def embed_server(
+    socket_path: Annotated[
+        Optional[str],
+        typer.Option(
+            "--socket",
+            help="Unix socket to listen on "
+            "(default: WREN_EMBEDDING_SOCKET, else ~/.wren/embedding.sock).",
+        ),
+    ] = None,
+    model: Annotated[
+        Optional[str],
+        typer.Option(
+            "--model",
+            help="Embedding model to keep resident (default: WREN_EMBEDDING_MODEL).",
+        ),
+    ] = None,
+) -> None:
+    """Serve embeddings to every local wren process from one resident model.
+
+    While the socket exists, memory commands, MCP servers and SDK toolkits
+    send their texts here instead of loading the model themselves; requests
+    from concurrent clients are batched together. Clients fall back to
+    in-process loading when the daemon is absent. Runs until Ctrl+C.
+    """
+    from wren.memory.embedding_server import build_server  # noqa: PLC0415
+
+    typer.echo("Loading embedding model...", err=True)
+    try:
+        server = build_server(socket_path, model)
+    except RuntimeError as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(1)
+    typer.echo(
+        f"Serving {server.model_key} on {server.socket_path}. Ctrl+C to stop.",
+        err=True,
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        typer.echo("Embedding daemon stopped.", err=True)
 
 
 @memory_app.command()
@@ -492,7 +646,7 @@ def reset(
     except SystemExit as e:
         typer.echo(str(e), err=True)
         raise typer.Exit(1)
-    idx = get_index(project, path or str(_default_memory_path()))
+    idx = get_index(project, path)
     if idx.name == "grep":
         typer.echo("grep backend has no derived index — knowledge/sql/ is the source.")
         return
@@ -524,15 +678,15 @@ def check(
         typer.echo(str(e), err=True)
         raise typer.Exit(1)
 
-    idx = get_index(project, path or str(_default_memory_path()))
+    idx = get_index(project, path)
     if idx.name == "grep":
-        n = len(load_query_pairs(project))
+        n = len(load_query_pairs(project, cached=True))
         typer.echo(
             f"grep backend: knowledge/sql/ is the index ({n} pair(s)) — always in sync."
         )
         return
 
-    md_nls = {p["nl"] for p in load_query_pairs(project)}
+    md_nls = {p["nl"] for p in load_query_pairs(project, cached=True)}
     mem_store = idx.store
     indexed, _ = mem_store.list_queries(limit=1_000_000)
     indexed_nls = {r.get("nl_query") for r in indexed}
@@ -572,9 +726,21 @@ def watch(
         typer.Option(
             "--interval",
             "-i",
-            help="Seconds between polls (min 1).",
+            help="Seconds between polls (min 1). With inotify, the longest "
+            "wait between checks.",
         ),
     ] = 5.0,
+    debounce: Annotated[
+        float,
+        typer.Option(
+            "--debounce",
+            help="Seconds of quiet that end a burst of file events.",
+        ),
+    ] = 0.2,
+    poll: Annotated[
+        bool,
+        typer.Option("--poll", help="Poll even where inotify is available."),
+    ] = False,
     reindex_on_start: Annotated[
         bool,
         typer.Option(
@@ -586,25 +752,31 @@ def watch(
         Optional[int],
         typer.Option(
             "--max-polls",
-            help="Stop after N polls (mainly for scripting/testing). "
+            help="Stop after N checks (mainly for scripting/testing). "
             "Default: run until Ctrl+C.",
         ),
     ] = None,
 ) -> None:
-    """Watch project sources and auto-reindex memory on change.
+    """Watch project sources and reindex only what changed.
 
-    Polls ``target/mdl.json`` and ``knowledge/sql/*.md`` on an interval; when
-    their content fingerprint changes, runs the equivalent of
-    ``wren memory index`` so semantic recall never serves a stale schema while
-    you are actively modelling. A reindex that fails leaves the change pending
-    and is retried on the next poll — an update is never silently dropped.
+    Waits on inotify events (Linux) or polls ``target/mdl.json`` and
+    ``knowledge/sql/*.md`` every interval, debounces bursts of edits, then
+    applies a partial reindex: an MDL change re-syncs the schema index and
+    seed pairs, an edited or new markdown file re-embeds just its pair, and a
+    deleted one drops its pair. Edits show up in recall within about a
+    second. A reindex that fails leaves the change pending and is retried —
+    an update is never silently dropped.
 
     Requires the ``memory`` extra (the index it maintains is LanceDB-backed).
     With the grep backend there is no derived index to keep fresh.
     """
     from wren.context import discover_project_path  # noqa: PLC0415
     from wren.memory.index_backend import resolve_backend  # noqa: PLC0415
-    from wren.memory.watch import watch_loop  # noqa: PLC0415
+    from wren.memory.markdown import (  # noqa: PLC0415
+        load_query_pair,
+        load_query_pairs,
+    )
+    from wren.memory.watch import watch_changes  # noqa: PLC0415
 
     if resolve_backend() == "grep":
         typer.echo(
@@ -640,51 +812,76 @@ def watch(
             )
             raise typer.Exit(1)
 
-    def _reindex() -> None:
-        manifest = _load_manifest(mdl)
-        mem_store = _get_store(path)
-        result = mem_store.index_schema(manifest, seed_queries=True)
-        from wren.memory.markdown import load_query_pairs  # noqa: PLC0415
+    # path → (NL, SQL, source) of every indexed markdown pair, so a deleted
+    # file's rows can be dropped without re-reading the whole directory.
+    def _pair_key(pair: dict) -> tuple[str, str, str]:
+        return pair["nl"], pair["sql"], pair.get("source") or "user"
 
-        md_pairs = load_query_pairs(project_path)
-        loaded = 0
-        if md_pairs:
-            res = mem_store.load_queries(md_pairs, upsert=True)
-            loaded = res["loaded"] + res["updated"]
-        typer.echo(
-            f"Reindexed {result['schema_items']} schema item(s)"
-            + (f", {loaded} pair(s)" if loaded else "")
-            + "."
-        )
+    known = {
+        p["path"]: _pair_key(p) for p in load_query_pairs(project_path, cached=True)
+    }
+
+    def _apply(changes) -> None:
+        mem_store = _get_store(path)
+        done: list[str] = []
+        if changes.mdl:
+            result = mem_store.index_schema(_load_manifest(mdl), seed_queries=True)
+            done.append(f"{result['schema_items']} schema item(s)")
+        pairs = []
+        for rel in changes.changed:
+            pair = load_query_pair(project_path / rel, project_path)
+            if pair is not None:
+                pairs.append(pair)
+        if pairs:
+            res = mem_store.load_queries(pairs, upsert=True)
+            done.append(f"{res['loaded'] + res['updated']} pair(s)")
+        after = dict(known)
+        for rel in changes.removed:
+            after.pop(rel, None)
+        for rel in changes.changed:
+            after.pop(rel, None)
+        after.update((p["path"], _pair_key(p)) for p in pairs)
+        # Only drop pairs no remaining file still provides, and only the rows
+        # loaded from them — not `memory store`/`load` rows sharing the NL.
+        gone = set(known.values()) - set(after.values())
+        if gone:
+            removed = mem_store.forget_query_pairs(
+                [{"nl": nl, "sql": sql, "source": src} for nl, sql, src in sorted(gone)]
+            )
+            done.append(f"{removed} removed")
+        known.clear()
+        known.update(after)
+        typer.echo(f"Reindexed {', '.join(done) or 'nothing'}.")
 
     def _on_event(event: str) -> None:
         if event == "change-detected":
             typer.echo("Change detected — reindexing...", err=True)
         elif event == "reindex-error":
             typer.echo(
-                "Reindex failed; change kept pending, will retry next poll.",
+                "Reindex failed; change kept pending, will retry.",
                 err=True,
             )
         elif event == "stopped":
             typer.echo("Stopped watching.", err=True)
 
     typer.echo(
-        f"Watching {project_path} every {max(interval, 1.0):g}s "
-        "(target/mdl.json + knowledge/sql/). Ctrl+C to stop.",
+        f"Watching {project_path} (target/mdl.json + knowledge/sql/). Ctrl+C to stop.",
         err=True,
     )
-    state = watch_loop(
+    state = watch_changes(
         project_path,
-        _reindex,
+        _apply,
         interval=interval,
+        debounce=debounce,
+        use_inotify=not poll,
         max_polls=max_polls,
         reindex_on_start=reindex_on_start,
         on_event=_on_event,
     )
     if max_polls is not None:
         typer.echo(
-            f"Polled {state.polls} time(s), {state.reindexes} reindex(es), "
-            f"{state.errors} error(s).",
+            f"Checked {state.polls} time(s) ({state.mode}), "
+            f"{state.reindexes} reindex(es), {state.errors} error(s).",
             err=True,
         )
 
@@ -0,0 +1,313 @@
+"""Token-budgeted schema context for large manifests.
+
+Between "the whole description" (small schemas) and "top-k isolated search
+hits" (large ones) sits a prompt that uses a token budget well: the most
+relevant models in full, the models they join to with just their key
+columns, and the relationships connecting them. :func:`assemble_context`
+packs exactly that, greedily and in relevance order, from two structures
+computed once per manifest hash (:func:`schema_graph`):
+
+* text blocks — the per-entity fragments of
+  :func:`~wren.memory.schema_indexer.describe_manifest`, plus a compact
+  *key block* per model (header, primary key, join and relationship
+  columns),
+* a relationship graph — model → (relationship, neighbour model) edges.
+
+Relevance comes from the caller (schema search hits, see
+:func:`hit_entity_keys`) topped up by :func:`rank_entities`, a lexical
+ranking that needs no index. Tokens are estimated at
+:data:`CHARS_PER_TOKEN` characters each, the same ratio behind
+:data:`~wren.memory.schema_indexer.SCHEMA_DESCRIBE_THRESHOLD`.
+
+Pure functions — no LanceDB or embedding dependency.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from wren.memory.schema_indexer import (
+    _as_list,
+    _describe_model,
+    _iter_section,
+    _relationship_models,
+    describe_manifest,
+)
+
+CHARS_PER_TOKEN = 4
+# Breadth-first relationship hops expanded around the ranked models.
+DEFAULT_HOPS = 1
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+# ``orders.o_custkey`` / ``"orders"."o_custkey"`` in a join condition.
+_QUALIFIED_RE = re.compile(r'"?(\w+)"?\s*\.\s*"?(\w+)"?')
+
+_GRAPH_CACHE_SIZE = 8
+_graph_cache: OrderedDict[str, SchemaGraph] = OrderedDict()
+_graph_cache_lock = threading.Lock()
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of *text* (``ceil(len / CHARS_PER_TOKEN)``)."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+@dataclass(frozen=True)
+class SchemaGraph:
+    """Per-manifest text blocks and relationship graph (see module docstring).
+
+    Keys are entity keys as in ``SchemaDescription.fragments``:
+    ``model:<name>``, ``relationship:<name>``, ``view:<name>``,
+    ``cube:<name>``.
+    """
+
+    mdl_hash: str
+    blocks: Mapping[str, str]
+    key_blocks: Mapping[str, str]
+    edges: Mapping[str, tuple[tuple[str, str], ...]]
+    endpoints: Mapping[str, tuple[str, ...]]
+    terms: Mapping[str, frozenset[str]]
+
+
+def schema_graph(manifest: dict) -> SchemaGraph:
+    """Return the memoized :class:`SchemaGraph` of *manifest*."""
+    description = describe_manifest(manifest)
+    with _graph_cache_lock:
+        cached = _graph_cache.get(description.mdl_hash)
+        if cached is not None:
+            _graph_cache.move_to_end(description.mdl_hash)
+            return cached
+    graph = _build_graph(manifest, description)
+    with _graph_cache_lock:
+        _graph_cache[graph.mdl_hash] = graph
+        while len(_graph_cache) > _GRAPH_CACHE_SIZE:
+            _graph_cache.popitem(last=False)
+    return graph
+
+
+def _words(text: str) -> set[str]:
+    """Lower-cased words of two or more characters, plus a naive singular."""
+    words = {w for w in _WORD_RE.findall(text.lower()) if len(w) >= 2}
+    return words | {w[:-1] for w in words if len(w) > 3 and w.endswith("s")}
+
+
+def _build_graph(manifest: dict, description) -> SchemaGraph:
+    edges: dict[str, list[tuple[str, str]]] = {}
+    endpoints: dict[str, tuple[str, ...]] = {}
+    join_columns: dict[str, set[str]] = {}
+    for rel in _iter_section(manifest, "relationships"):
+        if not isinstance(rel, dict) or not rel.get("name"):
+            continue
+        rel_key = f"relationship:{rel['name']}"
+        models = [
+            m for m in _relationship_models(rel, rel["name"]) if isinstance(m, str)
+        ]
+        endpoints.setdefault(rel_key, tuple(f"model:{m}" for m in models))
+        for model in models:
+            for other in models:
+                if other != model:
+                    edges.setdefault(f"model:{model}", []).append(
+                        (rel_key, f"model:{other}")
+                    )
+        for table, column in _QUALIFIED_RE.findall(str(rel.get("condition") or "")):
+            join_columns.setdefault(table, set()).add(column)
+
+    key_blocks: dict[str, str] = {}
+    for model in _iter_section(manifest, "models"):
+        if not isinstance(model, dict) or not model.get("name"):
+            continue
+        name = model["name"]
+        key = f"model:{name}"
+        if key in key_blocks:
+            continue
+        cols = [
+            c
+            for c in _as_list(model.get("columns"), "model", name, "columns")
+            if isinstance(c, dict) and c.get("name")
+        ]
+        keys = set(join_columns.get(name, ()))
+        if isinstance(model.get("primaryKey"), str):
+            keys.add(model["primaryKey"])
+        kept = [
+            c
+            for c in cols
+            if c["name"] in keys or c.get("isPrimaryKey") or c.get("relationship")
+        ]
+        lines: list[str] = []
+        _describe_model({**model, "columns": kept}, lines)
+        if len(kept) < len(cols):
+            # Before the block's trailing blank line.
+            lines.insert(len(lines) - 1, f"  … {len(cols) - len(kept)} more column(s)")
+        key_blocks[key] = "\n".join(lines)
+
+    terms = {
+        key: frozenset(_words(key.split(":", 1)[1].replace("_", " ")) | _words(block))
+        for key, block in description.fragments.items()
+    }
+    return SchemaGraph(
+        mdl_hash=description.mdl_hash,
+        blocks=description.fragments,
+        key_blocks=MappingProxyType(key_blocks),
+        edges=MappingProxyType({k: tuple(v) for k, v in edges.items()}),
+        endpoints=MappingProxyType(endpoints),
+        terms=MappingProxyType(terms),
+    )
+
+
+def hit_entity_keys(hits: Sequence[dict]) -> list[str]:
+    """Map schema search hits (best first) to entity keys, deduplicated.
+
+    Column hits stand for their model; cube members for their cube.
+    """
+    keys: list[str] = []
+    for hit in hits:
+        item_type = hit.get("item_type")
+        model = hit.get("model_name") or ""
+        name = hit.get("item_name") or ""
+        if item_type in ("model", "column"):
+            keys.append(f"model:{model}")
+        elif item_type in ("relationship", "view", "cube"):
+            keys.append(f"{item_type}:{name}")
+        elif item_type in ("measure", "cube_dimension", "time_dimension"):
+            keys.append(f"cube:{model}")
+    return list(dict.fromkeys(keys))
+
+
+def rank_entities(manifest: dict, question: str) -> list[str]:
+    """Entity keys sharing words with *question*, most shared words first.
+
+    Ties keep manifest order; entities sharing no word are left out.
+    """
+    graph = schema_graph(manifest)
+    words = _words(question)
+    scored = [
+        (-len(words & terms), position, key)
+        for position, (key, terms) in enumerate(graph.terms.items())
+        if words & terms
+    ]
+    return [key for _, _, key in sorted(scored)]
+
+
+def assemble_context(
+    manifest: dict,
+    ranked: Sequence[str],
+    budget: int,
+    *,
+    hops: int = DEFAULT_HOPS,
+) -> dict:
+    """Pack the schema context for *ranked* entity keys into *budget* tokens.
+
+    Ranked entities go in first, in order, each in full or — for a model
+    that does not fit — as its key block; a ranked relationship brings in
+    the models it joins (as key blocks) and is kept only if they fit. Then the
+    relationship graph is expanded breadth-first for *hops* hops: each
+    neighbour model as a key block, followed by the relationship that
+    reaches it. Anything that does not fit is skipped, so one oversized
+    model cannot starve the rest; budget left at the end upgrades key blocks
+    to full ones. With nothing ranked, models are taken in manifest order.
+
+    Returns ``schema`` (the packed text), ``tokens`` (its estimate),
+    ``budget``, ``included`` (entity keys in output order), ``key_only``
+    (models included as key blocks) and ``omitted`` (entities left out).
+    """
+    graph = schema_graph(manifest)
+    limit = max(budget, 0) * CHARS_PER_TOKEN
+    chosen: dict[str, str] = {}
+    key_only: set[str] = set()
+    used = 0
+
+    def add(key: str, text: str) -> bool:
+        nonlocal used
+        cost = len(text) + (1 if chosen else 0)  # joining newline
+        if used + cost > limit:
+            return False
+        chosen[key] = text
+        used += cost
+        return True
+
+    def add_entity(key: str) -> None:
+        if key in chosen:
+            return
+        if not add(key, graph.blocks[key]) and key in graph.key_blocks:
+            if add(key, graph.key_blocks[key]):
+                key_only.add(key)
+
+    seeds = [key for key in dict.fromkeys(ranked) if key in graph.blocks]
+    if not seeds:
+        seeds = list(graph.key_blocks)
+    for key in seeds:
+        endpoints = graph.endpoints.get(key)
+        if endpoints is None:
+            add_entity(key)
+            continue
+        # A relationship only helps next to the models it joins; unranked
+        # endpoints come in as key blocks.
+        for model in endpoints:
+            if model not in chosen and model in graph.key_blocks:
+                if add(model, graph.key_blocks[model]):
+                    key_only.add(model)
+        if key not in chosen and all(m in chosen for m in endpoints):
+            add(key, graph.blocks[key])
+
+    frontier = [key for key in chosen if key in graph.key_blocks]
+    for _ in range(max(hops, 0)):
+        reached: list[str] = []
+        for model in frontier:
+            for rel_key, neighbour in graph.edges.get(model, ()):
+                if neighbour not in chosen and neighbour in graph.key_blocks:
+                    if add(neighbour, graph.key_blocks[neighbour]):
+                        key_only.add(neighbour)
+                        reached.append(neighbour)
+                if (
+                    neighbour in chosen
+                    and rel_key not in chosen
+                    and rel_key in graph.blocks
+                ):
+                    add(rel_key, graph.blocks[rel_key])
+        frontier = reached
+
+    # Spend what is left upgrading key blocks to full ones, nearest first.
+    for key in [k for k in chosen if k in key_only]:
+        extra = len(graph.blocks[key]) - len(chosen[key])
+        if used + extra <= limit:
+            chosen[key] = graph.blocks[key]
+            used += extra
+            key_only.discard(key)
+
+    text = "\n".join(chosen.values())
+    return {
+        "schema": text,
+        "tokens": estimate_tokens(text),
+        "budget": budget,
+        "included": list(chosen),
+        "key_only": [key for key in chosen if key in key_only],
+        "omitted": len(graph.blocks) - len(chosen),
+    }
+
+
+def budget_context(
+    manifest: dict,
+    question: str,
+    budget: int,
+    *,
+    hits: Sequence[dict] = (),
+    model_name: str | None = None,
+) -> dict:
+    """Schema context for *question* within *budget* tokens.
+
+    The full description when it fits (``strategy="full"``); otherwise
+    :func:`assemble_context` seeded by *model_name*, then the schema search
+    *hits*, then :func:`rank_entities` (``strategy="budget"``).
+    """
+    description = describe_manifest(manifest)
+    if estimate_tokens(description.text) <= budget:
+        return {"strategy": "full", "schema": description.text}
+    ranked = hit_entity_keys(hits) + rank_entities(manifest, question)
+    if model_name:
+        ranked.insert(0, f"model:{model_name}")
+    return {"strategy": "budget", **assemble_context(manifest, ranked, budget)}
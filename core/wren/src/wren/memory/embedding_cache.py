@@ -0,0 +1,202 @@
+"""On-disk embedding cache for Wren Memory.
+
+Schema texts, seed queries and stored NL questions are mostly identical from
+one ``wren memory index`` (or ``watch`` cycle, or process) to the next, yet
+encoding them through the sentence-transformer is the slowest step of
+indexing. :class:`CachedEmbeddingFunction` wraps the embedding function and
+keeps every source vector it computes in a LanceDB side table under the
+memory directory, keyed by ``(model name, text digest)``. Only texts never
+seen with the current model reach the model.
+
+The cache lives in its own LanceDB directory so it never shows up among the
+memory tables, and it survives ``wren memory reset`` — it is keyed by model,
+so a swapped model simply misses. Failures to read or write the cache are
+ignored — a failed lookup is a miss (e.g. while another thread is still
+creating the table); it is a pure accelerator.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from datetime import timedelta
+from pathlib import Path
+
+import pyarrow as pa
+
+CACHE_DIR = "embedding_cache"
+_TABLE = "embeddings"
+# Digests per where-clause; keeps LanceDB filter expressions a sane size.
+_LOOKUP_BATCH = 500
+# What LanceDB raises for a missing, half-created or concurrently changed table.
+_CACHE_ERRORS = (OSError, RuntimeError, ValueError)
+
+
+def text_digest(text: str) -> str:
+    """Return the cache key digest for *text*."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+def _arrow_schema() -> pa.Schema:
+    return pa.schema(
+        [
+            pa.field("model", pa.utf8()),
+            pa.field("digest", pa.utf8()),
+            pa.field("vector", pa.list_(pa.float32())),
+        ]
+    )
+
+
+def _table_names(db) -> list[str]:
+    result = db.list_tables()
+    if isinstance(result, list):
+        return result
+    return result.tables
+
+
+class EmbeddingCache:
+    """Persistent ``(model, digest) → vector`` map backed by LanceDB."""
+
+    def __init__(self, path: str | Path, model_name: str):
+        import lancedb  # noqa: PLC0415
+
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.model_name = model_name
+        self._db = lancedb.connect(str(self.path))
+
+    def _table(self):
+        if _TABLE not in _table_names(self._db):
+            return None
+        return self._db.open_table(_TABLE)
+
+    def __len__(self) -> int:
+        try:
+            table = self._table()
+            if table is None:
+                return 0
+            return table.count_rows(f"model = '{_esc(self.model_name)}'")
+        except _CACHE_ERRORS:
+            return 0
+
+    def get_many(self, digests: list[str]) -> dict[str, list[float]]:
+        """Return the cached vectors for whichever *digests* are present.
+
+        A lookup that fails returns what was found so far; the rest miss.
+        """
+        if not digests:
+            return {}
+        try:
+            table = self._table()
+        except _CACHE_ERRORS:
+            return {}
+        if table is None:
+            return {}
+        found: dict[str, list[float]] = {}
+        model = _esc(self.model_name)
+        for i in range(0, len(digests), _LOOKUP_BATCH):
+            batch = digests[i : i + _LOOKUP_BATCH]
+            in_list = ", ".join(f"'{d}'" for d in batch)
+            try:
+                rows = (
+                    table.search()
+                    .where(f"model = '{model}' AND digest IN ({in_list})")
+                    .select(["digest", "vector"])
+                    .limit(None)
+                    .to_arrow()
+                    .to_pydict()
+                )
+            except _CACHE_ERRORS:
+                break
+            found.update(zip(rows["digest"], rows["vector"]))
+        return found
+
+    def put_many(self, vectors: dict[str, list[float]]) -> None:
+        """Store *vectors* (digest → vector); existing keys are left as-is."""
+        if not vectors:
+            return
+        data = pa.table(
+            {
+                "model": [self.model_name] * len(vectors),
+                "digest": list(vectors),
+                "vector": [[float(x) for x in v] for v in vectors.values()],
+            },
+            schema=_arrow_schema(),
+        )
+        try:
+            table = self._table()
+            if table is None:
+                table = self._db.create_table(_TABLE, data, schema=_arrow_schema())
+                self._ensure_index(table)
+                return
+            (
+                table.merge_insert(["model", "digest"])
+                .when_not_matched_insert_all()
+                .execute(data)
+            )
+        except _CACHE_ERRORS:
+            pass
+
+    @staticmethod
+    def _ensure_index(table) -> None:
+        """Give ``digest`` a B-tree index, so lookups stop scanning the table."""
+        from lancedb.index import BTree  # noqa: PLC0415
+
+        if not any("digest" in ix.columns for ix in table.list_indices()):
+            table.create_index("digest", config=BTree())
+
+    def optimize(self, *, retention: timedelta) -> dict | None:
+        """Compact the cache table and prune versions older than *retention*.
+
+        Every ``put_many`` appends a fragment and a version. Returns the same
+        per-table report as :meth:`MemoryStore.optimize
+        <wren.memory.store.MemoryStore.optimize>`, or None without a table.
+        """
+        table = self._table()
+        if table is None:
+            return None
+        before = table.stats()["fragment_stats"]["num_fragments"]
+        versions_before = len(table.list_versions())
+        self._ensure_index(table)
+        table.optimize(cleanup_older_than=retention)
+        return {
+            "rows": table.count_rows(),
+            "fragments_before": before,
+            "fragments_after": table.stats()["fragment_stats"]["num_fragments"],
+            "versions_before": versions_before,
+            "versions_after": len(table.list_versions()),
+        }
+
+
+class CachedEmbeddingFunction:
+    """Embedding function wrapper that serves source embeddings from a cache.
+
+    ``compute_source_embeddings`` looks every text up by digest, encodes the
+    misses in one batch, and writes them back. Query embeddings are passed
+    through unchanged.
+    """
+
+    def __init__(self, embed_fn, cache: EmbeddingCache):
+        self._embed_fn = embed_fn
+        self.cache = cache
+
+    def compute_source_embeddings(self, texts):
+        digests = [text_digest(t) for t in texts]
+        known = self.cache.get_many(list(dict.fromkeys(digests)))
+
+        missing: dict[str, str] = {}
+        for digest, text in zip(digests, texts):
+            if digest not in known:
+                missing.setdefault(digest, text)
+        if missing:
+            computed = self._embed_fn.compute_source_embeddings(list(missing.values()))
+            fresh = dict(zip(missing, computed))
+            self.cache.put_many(fresh)
+            known.update(fresh)
+        return [known[d] for d in digests]
+
+    def compute_query_embeddings(self, query):
+        return self._embed_fn.compute_query_embeddings(query)
+
+
+def _esc(value: str) -> str:
+    return value.replace("'", "''")
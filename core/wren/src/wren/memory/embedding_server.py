@@ -0,0 +1,212 @@
+"""Shared embedding daemon for Wren Memory over a Unix socket.
+
+Every process that embeds text (a ``wren memory`` command, an MCP server, an
+SDK toolkit) otherwise loads its own copy of the model. ``wren memory
+embed-server`` keeps one model resident and serves all of them:
+:func:`~wren.memory.embeddings.get_embedding_function` returns a
+:class:`~wren.memory.embeddings.RemoteEmbedding` client whenever the socket
+exists, and that client falls back to in-process loading if the daemon is
+gone or hosts a different model.
+
+Protocol: one JSON object per line in each direction.
+
+* ``{"op": "info"}`` → ``{"model": ..., "backend": ..., "batches": ...}``
+* ``{"op": "embed", "model": ..., "texts": [...]}`` → ``{"vectors": [...]}``
+* any failure → ``{"error": "..."}``
+
+``model`` in an embed request is the client's
+:func:`~wren.memory.embeddings.embedding_model_key`; the daemon refuses keys
+other than its own, so embedding caches keyed by it never mix vectors from
+different models or backends.
+
+Requests from all connections are coalesced by :class:`EmbeddingBatcher`, so
+concurrent clients share forward passes. Both supported backends embed
+queries and documents identically, so one batch path serves both.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import queue
+import socket
+import socketserver
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+
+# Wait this long for more requests before running a batch.
+BATCH_WINDOW_SECONDS = 0.005
+# Stop growing a batch once it holds this many texts.
+MAX_BATCH_TEXTS = 256
+
+
+def default_socket_path() -> Path:
+    """``WREN_EMBEDDING_SOCKET``, else ``~/.wren/embedding.sock``."""
+    env = os.getenv("WREN_EMBEDDING_SOCKET")
+    if env:
+        return Path(env).expanduser()
+    return Path.home() / ".wren" / "embedding.sock"
+
+
+class EmbeddingBatcher:
+    """Coalesce embedding requests from many threads into shared batches."""
+
+    def __init__(
+        self,
+        embed_fn,
+        *,
+        window: float = BATCH_WINDOW_SECONDS,
+        max_texts: int = MAX_BATCH_TEXTS,
+    ):
+        self._embed_fn = embed_fn
+        self._window = window
+        self._max_texts = max_texts
+        self._queue: queue.Queue[tuple[list[str], Future] | None] = queue.Queue()
+        self.batches = 0
+        self._thread = threading.Thread(
+            target=self._run, name="wren-embedding-batcher", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, texts: list[str]) -> Future:
+        future: Future = Future()
+        self._queue.put((texts, future))
+        return future
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            pending = [item]
+            size = len(item[0])
+            while size < self._max_texts:
+                try:
+                    item = self._queue.get(timeout=self._window)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)  # finish this batch, then stop
+                    break
+                pending.append(item)
+                size += len(item[0])
+            self._embed(pending)
+
+    def _embed(self, pending: list[tuple[list[str], Future]]) -> None:
+        texts = [t for batch, _ in pending for t in batch]
+        try:
+            vectors = self._embed_fn.compute_source_embeddings(texts) if texts else []
+        except Exception as e:
+            for _, future in pending:
+                future.set_exception(e)
+            return
+        self.batches += 1
+        offset = 0
+        for batch, future in pending:
+            chunk = vectors[offset : offset + len(batch)]
+            future.set_result([[float(x) for x in v] for v in chunk])
+            offset += len(batch)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: EmbeddingServer
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                reply = self.server.dispatch(json.loads(line))
+            except Exception as e:
+                reply = {"error": str(e)}
+            self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class EmbeddingServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Serve one resident embedding model to local clients."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        socket_path: str | Path,
+        model_key: str,
+        embed_fn,
+        *,
+        backend: str = "",
+    ):
+        self.socket_path = Path(socket_path)
+        self.model_key = model_key
+        self.backend = backend
+        self.batcher = EmbeddingBatcher(embed_fn)
+        _claim_socket(self.socket_path)
+        super().__init__(str(self.socket_path), _Handler)
+        os.chmod(self.socket_path, 0o600)
+
+    def dispatch(self, request: dict) -> dict:
+        op = request.get("op")
+        if op == "info":
+            return {
+                "model": self.model_key,
+                "backend": self.backend,
+                "batches": self.batcher.batches,
+            }
+        if op != "embed":
+            return {"error": f"unknown op {op!r}"}
+        if request.get("model") != self.model_key:
+            return {"error": f"daemon serves {self.model_key!r}"}
+        texts = [str(t) for t in request.get("texts") or []]
+        return {"vectors": self.batcher.submit(texts).result()}
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.batcher.close()
+        try:
+            self.socket_path.unlink()
+        except OSError:
+            pass
+
+
+def _claim_socket(path: Path, label: str = "An embedding daemon") -> None:
+    """Remove a stale socket file; refuse to replace a live daemon."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if not path.exists():
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(str(path))
+    except OSError:
+        path.unlink()
+        return
+    finally:
+        probe.close()
+    raise RuntimeError(f"{label} is already listening on {path}.")
+
+
+def build_server(
+    socket_path: str | Path | None = None, model_name: str | None = None
+) -> EmbeddingServer:
+    """Load the model once and bind an :class:`EmbeddingServer` (not started)."""
+    from wren.memory.embeddings import (  # noqa: PLC0415
+        _DEFAULT_MODEL,
+        embedding_model_key,
+        local_embedding_function,
+        resolve_embedding_backend,
+        warm_up,
+    )
+
+    model = model_name or _DEFAULT_MODEL
+    embed_fn = local_embedding_function(model)
+    warm_up(embed_fn)
+    return EmbeddingServer(
+        socket_path or default_socket_path(),
+        embedding_model_key(model),
+        embed_fn,
+        backend=resolve_embedding_backend(),
+    )
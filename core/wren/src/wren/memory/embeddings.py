@@ -1,26 +1,114 @@
 """Embedding function abstraction for Wren Memory.
 
-The sentence-transformer loads from the local HF cache before falling back to
-an online-capable load. Model construction is single-flighted per process.
+Two interchangeable backends implement :class:`EmbeddingBackend`, selected by
+``WREN_EMBEDDING_BACKEND``:
+
+* ``sentence-transformers`` (default) — LanceDB's sentence-transformers
+  adapter on PyTorch,
+* ``onnx`` — the model's int8-quantized ONNX export on ONNX Runtime
+  (:class:`OnnxEmbedding`): no torch import, a fraction of the memory, and
+  faster CPU inference. Same model, same dimension, normalized the same way,
+  so an existing store keeps working when the backend changes.
+
+Both load from the local HF cache before falling back to an online-capable
+load, and model construction is single-flighted per process. When a shared
+embedding daemon (:mod:`wren.memory.embedding_server`) is running,
+:func:`get_embedding_function` returns a :class:`RemoteEmbedding` client
+instead, so concurrent processes share one resident model.
 """
 
 from __future__ import annotations
 
 import contextlib
+import json
 import os
+import platform
+import socket
 import threading
+from abc import ABC, abstractmethod
+from importlib.util import find_spec
+from pathlib import Path
+
+from wren.memory.embedding_server import default_socket_path
 
 _DEFAULT_MODEL = os.getenv(
     "WREN_EMBEDDING_MODEL", "paraphrase-multilingual-MiniLM-L12-v2"
 )
 _DEFAULT_DIM = 384
 
+EMBEDDING_BACKENDS = ("sentence-transformers", "onnx")
+# Modules each backend needs beyond lancedb.
+_BACKEND_MODULES = {
+    "sentence-transformers": ("sentence_transformers",),
+    "onnx": ("onnxruntime", "tokenizers", "huggingface_hub"),
+}
+# ONNX Runtime intra-op threads (0 → ORT picks one per physical core).
+_ONNX_THREADS = int(os.getenv("WREN_EMBEDDING_THREADS", "0"))
+# Upper bound on texts per ONNX forward pass; see OnnxEmbedding.
+_ONNX_BATCH = int(os.getenv("WREN_EMBEDDING_BATCH", "32"))
+# The sentence-transformers config of the default model truncates here too.
+_MAX_SEQ_LENGTH = 128
+# Seconds to wait for the embedding daemon before embedding in-process.
+_REMOTE_TIMEOUT = float(os.getenv("WREN_EMBEDDING_TIMEOUT", "30"))
+
+
+def resolve_embedding_backend(backend: str | None = None) -> str:
+    """Return *backend*, or ``WREN_EMBEDDING_BACKEND``, validated."""
+    choice = (
+        (backend or os.getenv("WREN_EMBEDDING_BACKEND") or "sentence-transformers")
+        .strip()
+        .lower()
+    )
+    if choice not in EMBEDDING_BACKENDS:
+        raise ValueError(
+            f"Unknown embedding backend {choice!r}; expected one of "
+            f"{', '.join(EMBEDDING_BACKENDS)}."
+        )
+    return choice
+
+
+def embedding_backend_available(backend: str | None = None) -> bool:
+    """Whether the modules the selected backend needs are importable."""
+    try:
+        modules = _BACKEND_MODULES[resolve_embedding_backend(backend)]
+    except ValueError:
+        return False
+    return all(find_spec(m) is not None for m in modules)
+
+
+def embedding_model_key(model_name: str, backend: str | None = None) -> str:
+    """Identify vectors by model *and* backend (e.g. for the embedding cache).
+
+    Quantized ONNX vectors are close to, but not bit-identical with, the
+    PyTorch ones, so they must not be served in place of each other.
+    """
+    resolved = resolve_embedding_backend(backend)
+    if resolved == "sentence-transformers":
+        return model_name
+    return f"{model_name}@{resolved}-int8"
+
+
+class EmbeddingBackend(ABC):
+    """What :class:`~wren.memory.store.MemoryStore` needs from an embedder."""
+
+    @abstractmethod
+    def compute_source_embeddings(self, texts) -> list[list[float]]:
+        """Embed documents (schema items, stored questions)."""
+
+    @abstractmethod
+    def compute_query_embeddings(self, query) -> list[list[float]]:
+        """Embed one search query; returns a one-element list."""
+
 
 def _disable_transformers_progress_bar() -> None:
     # Imported lazily: transformers ships with the optional `memory` extra,
     # so this module must stay importable when that extra is not installed.
-    from transformers.utils import logging as transformers_logging  # noqa: PLC0415
-
+    try:
+        from transformers.utils import (  # noqa: PLC0415
+            logging as transformers_logging,
+        )
+    except ImportError:
+        return  # ONNX-only install: nothing to silence
     transformers_logging.disable_progress_bar()
 
 
@@ -70,24 +158,228 @@ def _get_local_first_embedding_class():
                     _model_cache = (key, model)
                     return model
 
+        EmbeddingBackend.register(LocalFirstSentenceTransformerEmbeddings)
         _local_first_embedding_cls = LocalFirstSentenceTransformerEmbeddings
         return _local_first_embedding_cls
 
 
-def get_embedding_function(model_name: str = _DEFAULT_MODEL):
-    """Return a LanceDB sentence-transformers embedding function.
+# ── ONNX Runtime backend ───────────────────────────────────────────────────
 
-    The returned object implements ``compute_source_embeddings(texts)``
-    and ``compute_query_embeddings(query)`` used by :class:`MemoryStore`.
+_onnx_cache_lock = threading.Lock()
+_onnx_cache: dict[tuple[str, str, int], tuple[object, object]] = {}
+
+
+def _onnx_repo_id(model_name: str) -> str:
+    return model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+
+
+def _onnx_model_file() -> str:
+    """Pick the int8 export matching this CPU (``WREN_EMBEDDING_ONNX_FILE``
+    overrides). sentence-transformers model repos ship these under ``onnx/``.
+    """
+    override = os.getenv("WREN_EMBEDDING_ONNX_FILE")
+    if override:
+        return override
+    if platform.machine().lower() in ("arm64", "aarch64"):
+        return "onnx/model_qint8_arm64.onnx"
+    return "onnx/model_quint8_avx2.onnx"
+
+
+def _hub_file(repo_id: str, filename: str) -> str:
+    from huggingface_hub import hf_hub_download  # noqa: PLC0415
+
+    try:
+        return hf_hub_download(repo_id, filename, local_files_only=True)
+    except Exception:  # not cached yet (the hub raises several types)
+        return hf_hub_download(repo_id, filename)
+
+
+def _mean_pool_normalized(hidden, mask):
+    """Mask-aware mean pooling plus L2 normalization, as sentence-transformers
+    (mean pooling module) and LanceDB (``normalize=True``) do."""
+    import numpy as np  # noqa: PLC0415
 
-    The adapter is instantiated directly, without mutating LanceDB's registry.
+    weights = mask[..., None].astype(np.float32)
+    pooled = (hidden * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+    norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+    return pooled / np.clip(norms, 1e-12, None)
+
+
+class OnnxEmbedding(EmbeddingBackend):
+    """Int8-quantized ONNX Runtime inference for sentence-transformers models.
+
+    Batching is dynamic: texts are grouped by length so each forward pass
+    pads only to the longest text in its group, at most *batch_size* texts
+    at a time. *threads* caps ONNX Runtime's intra-op thread pool.
+    """
+
+    def __init__(
+        self,
+        model_name: str = _DEFAULT_MODEL,
+        *,
+        threads: int | None = None,
+        batch_size: int | None = None,
+    ):
+        self.name = model_name
+        self.threads = _ONNX_THREADS if threads is None else threads
+        self.batch_size = max(1, batch_size or _ONNX_BATCH)
+
+    def _load(self):
+        key = (self.name, _onnx_model_file(), self.threads)
+        with _onnx_cache_lock:
+            if key in _onnx_cache:
+                return _onnx_cache[key]
+            import onnxruntime as ort  # noqa: PLC0415
+            from tokenizers import Tokenizer  # noqa: PLC0415
+
+            repo_id = _onnx_repo_id(self.name)
+            options = ort.SessionOptions()
+            options.intra_op_num_threads = self.threads
+            options.inter_op_num_threads = 1
+            session = ort.InferenceSession(
+                _hub_file(repo_id, key[1]),
+                sess_options=options,
+                providers=["CPUExecutionProvider"],
+            )
+            tokenizer = Tokenizer.from_file(_hub_file(repo_id, "tokenizer.json"))
+            tokenizer.no_padding()
+            tokenizer.enable_truncation(max_length=_MAX_SEQ_LENGTH)
+            _onnx_cache[key] = (session, tokenizer)
+            return session, tokenizer
+
+    def _embed(self, texts: list[str]) -> list[list[float]]:
+        import numpy as np  # noqa: PLC0415
+
+        if not texts:
+            return []
+        session, tokenizer = self._load()
+        inputs = {i.name for i in session.get_inputs()}
+        vectors: list = [None] * len(texts)
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start : start + self.batch_size]
+            encodings = tokenizer.encode_batch([texts[i] for i in batch])
+            width = max(len(e.ids) for e in encodings)
+            ids = np.zeros((len(batch), width), dtype=np.int64)
+            mask = np.zeros((len(batch), width), dtype=np.int64)
+            for row, enc in enumerate(encodings):
+                ids[row, : len(enc.ids)] = enc.ids
+                mask[row, : len(enc.ids)] = 1
+            feeds = {"input_ids": ids, "attention_mask": mask}
+            if "token_type_ids" in inputs:
+                feeds["token_type_ids"] = np.zeros_like(ids)
+            hidden = session.run(None, feeds)[0]
+            for row, vec in zip(batch, _mean_pool_normalized(hidden, mask)):
+                vectors[row] = vec.tolist()
+        return vectors
+
+    def compute_source_embeddings(self, texts) -> list[list[float]]:
+        return self._embed([str(t) for t in texts])
+
+    def compute_query_embeddings(self, query) -> list[list[float]]:
+        return self._embed([str(query)])
+
+
+# ── Shared embedding daemon client ─────────────────────────────────────────
+
+
+class RemoteEmbedding(EmbeddingBackend):
+    """Client for the ``wren memory embed-server`` daemon.
+
+    Each call is one request over the Unix socket; the daemon batches it with
+    concurrent requests from other processes. When the daemon is unreachable,
+    errors out or serves a different model (or backend), the call falls back
+    to an in-process model loaded once on first need, so a missing daemon
+    only costs the model load it was meant to save.
     """
+
+    def __init__(
+        self,
+        model_name: str,
+        socket_path: str | Path,
+        *,
+        timeout: float = _REMOTE_TIMEOUT,
+    ):
+        self.name = model_name
+        self.socket_path = Path(socket_path)
+        self.timeout = timeout
+        self._local = None
+        self._local_lock = threading.Lock()
+
+    def _request(self, texts: list[str]) -> list[list[float]] | None:
+        payload = {
+            "op": "embed",
+            "model": embedding_model_key(self.name),
+            "texts": texts,
+        }
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(self.timeout)
+                sock.connect(str(self.socket_path))
+                sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+                with sock.makefile("rb") as reader:
+                    reply = json.loads(reader.readline())
+        except (OSError, ValueError):
+            return None
+        vectors = reply.get("vectors") if isinstance(reply, dict) else None
+        if not isinstance(vectors, list) or len(vectors) != len(texts):
+            return None
+        return vectors
+
+    def _fallback(self):
+        with self._local_lock:
+            if self._local is None:
+                self._local = local_embedding_function(self.name)
+            return self._local
+
+    def compute_source_embeddings(self, texts) -> list[list[float]]:
+        texts = [str(t) for t in texts]
+        if not texts:
+            return []
+        vectors = self._request(texts)
+        if vectors is None:
+            return self._fallback().compute_source_embeddings(texts)
+        return vectors
+
+    def compute_query_embeddings(self, query) -> list[list[float]]:
+        vectors = self._request([str(query)])
+        if vectors is None:
+            return self._fallback().compute_query_embeddings(query)
+        return vectors
+
+
+def local_embedding_function(model_name: str = _DEFAULT_MODEL):
+    """Return an in-process embedding function of the configured backend.
+
+    ``WREN_EMBEDDING_BACKEND=onnx`` selects :class:`OnnxEmbedding`; otherwise
+    the LanceDB sentence-transformers adapter is instantiated directly,
+    without mutating LanceDB's registry.
+    """
+    if resolve_embedding_backend() == "onnx":
+        return OnnxEmbedding(model_name)
+
     _disable_transformers_progress_bar()
 
     local_first_cls = _get_local_first_embedding_class()
     return local_first_cls.create(name=model_name)
 
 
+def get_embedding_function(model_name: str = _DEFAULT_MODEL):
+    """Return the embedding function used by :class:`MemoryStore`.
+
+    The returned object implements ``compute_source_embeddings(texts)``
+    and ``compute_query_embeddings(query)``. While an embedding daemon's
+    socket exists (``WREN_EMBEDDING_SOCKET``, default
+    ``~/.wren/embedding.sock``) this is a :class:`RemoteEmbedding` client;
+    otherwise the model is loaded in-process by
+    :func:`local_embedding_function`.
+    """
+    socket_path = default_socket_path()
+    if socket_path.exists():
+        return RemoteEmbedding(model_name, socket_path)
+    return local_embedding_function(model_name)
+
+
 @contextlib.contextmanager
 def suppress_stderr():
     """Temporarily redirect stderr to /dev/null.
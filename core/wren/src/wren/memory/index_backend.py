@@ -3,10 +3,13 @@
 The markdown files are the source of truth. A backend is just a query interface
 over them:
 
-- ``GrepIndex`` — dependency-free token/substring search. The default when the
-  ``memory`` extra is absent; ``knowledge/sql/`` *is* the index (nothing to build).
+- ``GrepIndex`` — dependency-free BM25 token/substring search. The default when
+  the ``memory`` extra is absent; ``knowledge/sql/`` is the source, with a
+  per-file-invalidated token index cached under ``.wren/`` (see
+  :mod:`wren.memory.token_index`).
 - ``LanceDBIndex`` — semantic search via the ``memory`` extra (lancedb +
-  sentence-transformers), with LanceDB as a derived index.
+  sentence-transformers), with LanceDB as a derived index. Recall is hybrid
+  by default: BM25 full-text and vector rankings fused by reciprocal rank.
 
 Backend selection: ``WREN_MEMORY_BACKEND=grep|lancedb`` forces a choice;
 otherwise LanceDB is used when its extra is importable, else Grep.
@@ -15,21 +18,15 @@ otherwise LanceDB is used when its extra is importable, else Grep.
 from __future__ import annotations
 
 import os
-import re
 from abc import ABC, abstractmethod
 from importlib.util import find_spec
 from pathlib import Path
 
 from wren.memory.markdown import load_query_pairs
+from wren.memory.token_index import get_token_index
 
-_TOKEN_RE = re.compile(r"[a-z0-9]+")
 
-
-def _tokens(text: str) -> set[str]:
-    return {t for t in _TOKEN_RE.findall((text or "").lower()) if len(t) >= 2}
-
-
-def _pair_to_result(pair: dict, *, score: int | None = None) -> dict:
+def _pair_to_result(pair: dict, *, score: float | None = None) -> dict:
     """Shape a knowledge/sql pair like a recall row (parity with LanceDB)."""
     tags = pair.get("tags")
     row = {
@@ -56,9 +53,18 @@ class MemoryIndex(ABC):
 
     @abstractmethod
     def search(
-        self, query: str, *, limit: int = 3, datasource: str | None = None
+        self,
+        query: str,
+        *,
+        limit: int = 3,
+        datasource: str | None = None,
+        mode: str | None = None,
     ) -> list[dict]:
-        """Return up to *limit* NL→SQL pairs relevant to *query*."""
+        """Return up to *limit* NL→SQL pairs relevant to *query*.
+
+        *mode* (``hybrid``/``vector``) selects the ranking where a backend has
+        more than one; backends with a single strategy ignore it.
+        """
 
     @abstractmethod
     def reset(self) -> None:
@@ -70,40 +76,35 @@ class MemoryIndex(ABC):
 
 
 class GrepIndex(MemoryIndex):
-    """Dependency-free recall: token-overlap + substring over knowledge/sql/."""
+    """Dependency-free recall: BM25 over tokens + substring over knowledge/sql/."""
 
     name = "grep"
 
     def __init__(self, project_path: Path):
         self._project = project_path
+        self._index = get_token_index(project_path)
 
     def rebuild(self) -> dict:
-        # The markdown is the index — nothing to build.
-        return {"backend": self.name, "pairs": len(load_query_pairs(self._project))}
+        # The markdown is the index; the token cache re-parses changed files.
+        self._index.refresh(force=True)
+        return {"backend": self.name, "pairs": len(self._index)}
 
     def reset(self) -> None:
-        return  # no derived index to drop
+        return  # the token cache is rebuilt from markdown on demand
 
     def status(self) -> dict:
-        return {"backend": self.name, "pairs": len(load_query_pairs(self._project))}
+        return {"backend": self.name, "pairs": len(self._index)}
 
     def search(
-        self, query: str, *, limit: int = 3, datasource: str | None = None
+        self,
+        query: str,
+        *,
+        limit: int = 3,
+        datasource: str | None = None,
+        mode: str | None = None,
     ) -> list[dict]:
-        q_tokens = _tokens(query)
-        q_lower = query.strip().lower()
-        scored: list[tuple[int, dict]] = []
-        for pair in load_query_pairs(self._project):
-            if datasource and pair.get("datasource") != datasource:
-                continue
-            score = len(q_tokens & (_tokens(pair["nl"]) | _tokens(pair["sql"])))
-            if q_lower and q_lower in pair["nl"].lower():
-                score += 5  # whole-query substring match in the NL ranks highest
-            if score > 0:
-                scored.append((score, pair))
-        # Highest score first; stable tie-break by NL for determinism.
-        scored.sort(key=lambda s: (-s[0], s[1]["nl"]))
-        return [_pair_to_result(p, score=score) for score, p in scored[:limit]]
+        hits = self._index.search(query, limit=limit, datasource=datasource)
+        return [_pair_to_result(p, score=round(score, 4)) for score, p in hits]
 
 
 class LanceDBIndex(MemoryIndex):
@@ -111,11 +112,16 @@ class LanceDBIndex(MemoryIndex):
 
     name = "lancedb"
 
-    def __init__(self, project_path: Path, path: str):
-        from wren.memory.store import MemoryStore  # noqa: PLC0415
-
+    def __init__(self, project_path: Path, path: str | None = None, *, store=None):
         self._project = project_path
-        self._store = MemoryStore(path=path)
+        if store is None:
+            from wren.memory.service import project_store  # noqa: PLC0415
+            from wren.memory.store import MemoryStore  # noqa: PLC0415
+
+            store = (
+                project_store(project_path) if path is None else MemoryStore(path=path)
+            )
+        self._store = store
 
     @property
     def store(self):
@@ -135,13 +141,22 @@ class LanceDBIndex(MemoryIndex):
         return {"backend": self.name, **self._store.status()}
 
     def search(
-        self, query: str, *, limit: int = 3, datasource: str | None = None
+        self,
+        query: str,
+        *,
+        limit: int = 3,
+        datasource: str | None = None,
+        mode: str | None = None,
     ) -> list[dict]:
-        return self._store.recall_queries(query, limit=limit, datasource=datasource)
+        return self._store.recall_queries(
+            query, limit=limit, datasource=datasource, mode=mode
+        )
 
 
 def _extra_available() -> bool:
-    return bool(find_spec("lancedb")) and bool(find_spec("sentence_transformers"))
+    from wren.memory.embeddings import embedding_backend_available  # noqa: PLC0415
+
+    return bool(find_spec("lancedb")) and embedding_backend_available()
 
 
 def resolve_backend(env: str | None = None) -> str:
@@ -164,13 +179,14 @@ def resolve_backend(env: str | None = None) -> str:
 
 
 def get_index(
-    project_path: Path, path: str, *, backend: str | None = None
+    project_path: Path, path: str | None, *, backend: str | None = None
 ) -> MemoryIndex:
     """Construct the resolved MemoryIndex for *project_path*.
 
     An explicit *backend* is normalized (``" LanceDB "`` → ``lancedb``); an
     unrecognized value falls back to auto-detection. LanceDB downgrades to
-    GrepIndex when its extra is missing.
+    GrepIndex when its extra is missing. A *path* of None selects the
+    project's own store (see :func:`wren.memory.service.project_store`).
     """
     name = (backend or "").strip().lower()
     if name not in {"grep", "lancedb"}:
@@ -0,0 +1,87 @@
+"""Background maintenance for the LanceDB memory store.
+
+Every ``store_query``, seed upsert and incremental schema write appends a
+data fragment and a dataset version. A long-running ``wren serve mcp
+--allow-write`` accumulates thousands of them and scans slow down steadily.
+:class:`MemoryMaintenance` is a daemon thread that periodically runs
+:meth:`~wren.memory.store.MemoryStore.optimize` — compaction, version
+pruning and index catch-up — on one memory directory, covering every
+project namespace in it (see :mod:`wren.memory.service`); ``wren memory
+optimize`` runs the same pass once.
+
+Failures are logged and retried on the next tick; maintenance must never
+take the server down. Without the ``memory`` extra the thread exits
+immediately.
+"""
+
+from __future__ import annotations
+
+import threading
+from datetime import timedelta
+from importlib.util import find_spec
+from pathlib import Path
+
+from loguru import logger
+
+# Guard against a misconfigured interval turning maintenance into a busy loop.
+MIN_INTERVAL_SECONDS = 10.0
+
+
+def format_report(report: dict[str, dict]) -> list[str]:
+    """Render :meth:`MemoryStore.optimize` output, one line per table."""
+    return [
+        f"{name}: {r['rows']} rows, "
+        f"{r['fragments_before']} → {r['fragments_after']} fragment(s), "
+        f"{r['versions_before']} → {r['versions_after']} version(s)"
+        + (", vectors converted" if r.get("vectors_converted") else "")
+        for name, r in report.items()
+    ]
+
+
+class MemoryMaintenance(threading.Thread):
+    """Daemon thread running ``MemoryStore.optimize`` every *interval* seconds."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        interval: float,
+        *,
+        retention: timedelta | None = None,
+    ):
+        super().__init__(name="wren-memory-maintenance", daemon=True)
+        self.path = Path(path)
+        self.interval = max(interval, MIN_INTERVAL_SECONDS)
+        self.retention = retention
+        self.runs = 0
+        self.last_report: dict[str, dict] | None = None
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        if find_spec("lancedb") is None:
+            logger.info("Memory maintenance disabled: the memory extra is missing.")
+            return
+        while not self._stop_event.wait(self.interval):
+            self.run_once()
+
+    def run_once(self) -> dict[str, dict] | None:
+        """Optimize the store now; returns the report, or None on failure."""
+        if not self.path.is_dir():
+            return None
+        try:
+            from wren.memory.service import get_service  # noqa: PLC0415
+
+            report = get_service(self.path).optimize(retention=self.retention)
+        except Exception as e:
+            logger.warning(f"Memory maintenance failed (will retry): {e}")
+            return None
+        self.runs += 1
+        self.last_report = report
+        for line in format_report(report):
+            logger.info(f"Memory maintenance — {line}")
+        return report
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        """Ask the thread to exit and wait up to *timeout* seconds."""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
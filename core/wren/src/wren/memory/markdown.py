@@ -3,7 +3,9 @@
 Dependency-free: no LanceDB / pyarrow / sentence-transformers. The markdown file
 is the source of truth; the LanceDB index (when the ``memory`` extra is
 installed) is a derived artifact built from it — mirroring how ``wren context
-build`` compiles YAML into ``target/mdl.json``.
+build`` compiles YAML into ``target/mdl.json``. Bulk reads go through the packed
+per-project cache of :mod:`wren.memory.token_index`, which re-parses only files
+whose ``(mtime, size)`` changed.
 
 File format — YAML frontmatter, optional markdown body for notes::
 
@@ -27,6 +29,9 @@ import yaml
 
 _KNOWLEDGE_SQL_SUBDIR = ("knowledge", "sql")
 _MAX_SLUG_LEN = 60
+# Bumped by every write_query_markdown() call so in-process caches over
+# knowledge/sql/ (the grep token index) notice in-place updates immediately.
+_write_count = 0
 
 
 def slugify(text: str) -> str:
@@ -66,43 +71,79 @@ def parse_query_markdown(path: Path) -> dict:
     return {}
 
 
-def load_query_pairs(project_path: Path) -> list[dict]:
+def load_query_pair(md: Path, project_path: Path) -> dict | None:
+    """Load one ``knowledge/sql/*.md`` file shaped like :func:`load_query_pairs`.
+
+    Returns None when the file has no parseable ``nl``+``sql`` frontmatter.
+    """
+    fm = parse_query_markdown(md)
+    nl, sql = fm.get("nl"), fm.get("sql")
+    if not nl or not sql:
+        return None
+    pair: dict = {"nl": nl, "sql": sql, "source": fm.get("source", "user")}
+    if fm.get("datasource"):
+        pair["datasource"] = fm["datasource"]
+    if fm.get("tags"):
+        pair["tags"] = fm["tags"]
+    pair["path"] = str(md.relative_to(project_path))
+    return pair
+
+
+def load_query_pairs(project_path: Path, *, cached: bool = False) -> list[dict]:
     """Load every NL→SQL pair from ``knowledge/sql/*.md`` (the source of truth).
 
     Returns dicts shaped for ``MemoryStore.load_queries``: ``nl``, ``sql``,
     plus ``datasource`` / ``tags`` / ``source`` when present and ``path`` (the
     source file, relative to the project). Files without a parseable ``nl``+``sql``
     frontmatter are skipped.
+
+    By default every file is parsed, so values are exactly what YAML gives.
+    With *cached* the pairs come from the packed cache in ``.wren/`` (written
+    as a side effect): every file is ``stat``-ed, but only new or changed
+    ones are parsed, and values are JSON-safe copies (e.g. YAML dates become
+    strings) — fine for counting and listing, not for loading an index.
     """
+    if cached:
+        from wren.memory.token_index import get_token_index  # noqa: PLC0415
+
+        return get_token_index(project_path).pairs(force=True)
     sql_dir = knowledge_sql_dir(project_path)
     if not sql_dir.is_dir():
         return []
-    pairs: list[dict] = []
-    for md in sorted(sql_dir.glob("*.md")):
-        fm = parse_query_markdown(md)
-        nl, sql = fm.get("nl"), fm.get("sql")
-        if not nl or not sql:
-            continue
-        pair: dict = {"nl": nl, "sql": sql, "source": fm.get("source", "user")}
-        if fm.get("datasource"):
-            pair["datasource"] = fm["datasource"]
-        if fm.get("tags"):
-            pair["tags"] = fm["tags"]
-        pair["path"] = str(md.relative_to(project_path))
-        pairs.append(pair)
-    return pairs
+    pairs = (load_query_pair(md, project_path) for md in sorted(sql_dir.glob("*.md")))
+    return [pair for pair in pairs if pair is not None]
+
+
+def _cached_nls(sql_dir: Path) -> dict[str, str]:
+    """NL of every parseable file in *sql_dir*, keyed by file name."""
+    from wren.memory.token_index import get_token_index  # noqa: PLC0415
+
+    project_path = sql_dir.parents[len(_KNOWLEDGE_SQL_SUBDIR) - 1]
+    return {
+        Path(rel).name: nl
+        for rel, nl in get_token_index(project_path).nls(force=True).items()
+    }
 
 
 def _resolve_slug(base: str, nl: str, sql_dir: Path) -> str:
-    """Deterministic slug; reuse the file for the same NL, suffix on collision."""
+    """Deterministic slug; reuse the file for the same NL, suffix on collision.
+
+    The first candidate is parsed directly (the common update-in-place case);
+    longer collision chains look NLs up in the packed cache instead.
+    """
     candidate = base
     n = 1
+    known: dict[str, str] | None = None
     while True:
         dest = sql_dir / f"{candidate}.md"
         if not dest.exists():
             return candidate
         # Same NL → same logical pair → reuse (update in place).
-        existing = parse_query_markdown(dest).get("nl")
+        if n > 1 and known is None:
+            known = _cached_nls(sql_dir)
+        existing = (known or {}).get(dest.name)
+        if existing is None:
+            existing = parse_query_markdown(dest).get("nl")
         if existing == nl:
             return candidate
         n += 1
@@ -173,4 +214,6 @@ def write_query_markdown(
         ),
         encoding="utf-8",
     )
+    global _write_count
+    _write_count += 1
     return dest
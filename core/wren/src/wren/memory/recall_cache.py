@@ -0,0 +1,91 @@
+"""Process-wide LRU caches for repeated memory searches.
+
+Agents ask ``recall_queries`` and ``get_context`` the same question several
+times in one conversation, and every call used to embed the question and
+search LanceDB again — the MCP server even builds a fresh
+:class:`~wren.memory.store.MemoryStore` per tool call. Two caches shared by
+every store in the process skip that work:
+
+* :data:`query_embeddings` — ``(embedding model key, question)`` → vector.
+  A hit also avoids loading the embedding model at all.
+* :data:`search_results` — ``(store path, table, table version, question,
+  filters, mode, limit, tuning)`` → result rows.
+
+Keys carry the LanceDB table version, which every write bumps, so a store,
+delete, re-index or compaction (from this or any other process) makes the
+old entries unreachable; they simply age out. Questions are keyed after
+whitespace normalization (:func:`normalize_question`), so trivially
+re-spaced repeats hit too.
+
+``WREN_MEMORY_RECALL_CACHE`` sets the entries per cache (default 256;
+``0`` disables both).
+"""
+
+from __future__ import annotations
+
+import copy
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable
+
+DEFAULT_SIZE = int(os.getenv("WREN_MEMORY_RECALL_CACHE", "256"))
+
+
+def normalize_question(text: str) -> str:
+    """Collapse whitespace runs and trim, the form questions are keyed by."""
+    return " ".join(text.split())
+
+
+class LRUCache:
+    """Thread-safe least-recently-used map with hit/miss counters.
+
+    Values are deep-copied on the way in and out, so callers may mutate
+    what they get back.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_SIZE):
+        self.maxsize = max(maxsize, 0)
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, object] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable):
+        """Return a copy of the value for *key*, or None on a miss."""
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            value = self._data[key]
+        return copy.deepcopy(value)
+
+    def put(self, key: Hashable, value) -> None:
+        if not self.maxsize:
+            return
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+
+query_embeddings = LRUCache()
+search_results = LRUCache()
+
+
+def clear() -> None:
+    """Empty both caches."""
+    query_embeddings.clear()
+    search_results.clear()
@@ -7,8 +7,12 @@ from __future__ import annotations
 
 import hashlib
 import json
-from collections.abc import Sequence
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
 from datetime import datetime, timezone
+from types import MappingProxyType
 
 
 def manifest_hash(manifest: dict) -> str:
@@ -91,37 +95,103 @@ def _iter_section(manifest: dict, key: str) -> list:
     return section
 
 
+# Rendered descriptions kept per manifest hash (LRU). A long-running server
+# sees one or two live manifests; a few slots cover switching back and forth.
+_DESCRIBE_CACHE_SIZE = 8
+_describe_cache: OrderedDict[str, SchemaDescription] = OrderedDict()
+_describe_cache_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class SchemaDescription:
+    """The plain-text description of one manifest, rendered once per hash.
+
+    ``fragments`` maps ``"<kind>:<name>"`` (``model:orders``,
+    ``relationship:orders_customer``, ``view:…``, ``cube:…``) to that
+    entity's block of :attr:`text`, in manifest order.
+    """
+
+    mdl_hash: str
+    text: str
+    fragments: Mapping[str, str]
+
+    @property
+    def size(self) -> int:
+        return len(self.text)
+
+    def strategy(self, threshold: int = SCHEMA_DESCRIBE_THRESHOLD) -> str:
+        """``"full"`` when the text fits in *threshold* chars, else ``"search"``."""
+        return "full" if self.size <= threshold else "search"
+
+
+def describe_manifest(manifest: dict) -> SchemaDescription:
+    """Return the memoized :class:`SchemaDescription` of *manifest*.
+
+    Keyed by :func:`manifest_hash`, so an unchanged schema costs one hash and
+    a dictionary lookup instead of a walk over every model and column.
+    """
+    mdl_h = manifest_hash(manifest)
+    with _describe_cache_lock:
+        cached = _describe_cache.get(mdl_h)
+        if cached is not None:
+            _describe_cache.move_to_end(mdl_h)
+            return cached
+    description = _render_description(manifest, mdl_h)
+    with _describe_cache_lock:
+        _describe_cache[mdl_h] = description
+        while len(_describe_cache) > _DESCRIBE_CACHE_SIZE:
+            _describe_cache.popitem(last=False)
+    return description
+
+
 def describe_schema(manifest: dict) -> str:
     """Generate a structured plain-text description of the full MDL schema.
 
     Designed to be pasted directly into an LLM prompt when the schema is
-    small enough (see :data:`SCHEMA_DESCRIBE_THRESHOLD`).
+    small enough (see :data:`SCHEMA_DESCRIBE_THRESHOLD`). Memoized per
+    manifest hash (:func:`describe_manifest`).
     """
-    lines: list[str] = []
+    return describe_manifest(manifest).text
+
+
+def _render_description(manifest: dict, mdl_h: str) -> SchemaDescription:
+    parts: list[str] = []
+    fragments: dict[str, str] = {}
 
     catalog = manifest.get("catalog", "")
     schema = manifest.get("schema", "")
     if catalog or schema:
-        lines.append(f"Catalog: {catalog}, Schema: {schema}")
-        lines.append("")
+        parts.append(f"Catalog: {catalog}, Schema: {schema}\n")
+
+    def add(kind: str, name: str, describe, entity: dict) -> None:
+        lines: list[str] = []
+        describe(entity, lines)
+        if lines:
+            block = "\n".join(lines)
+            parts.append(block)
+            fragments.setdefault(f"{kind}:{name}", block)
 
     for model in _iter_section(manifest, "models"):
         if isinstance(model, dict) and model.get("name"):
-            _describe_model(model, lines)
+            add("model", model["name"], _describe_model, model)
 
     for rel in _iter_section(manifest, "relationships"):
         if isinstance(rel, dict) and rel.get("name"):
-            _describe_relationship(rel, lines)
+            add("relationship", rel["name"], _describe_relationship, rel)
 
     for view in _iter_section(manifest, "views"):
         if isinstance(view, dict) and view.get("name"):
-            _describe_view(view, lines)
+            add("view", view["name"], _describe_view, view)
 
     for cube in _iter_section(manifest, "cubes"):
         if isinstance(cube, dict):
-            _describe_cube(cube, lines)
+            add("cube", cube.get("name", ""), _describe_cube, cube)
 
-    return "\n".join(lines)
+    return SchemaDescription(
+        mdl_hash=mdl_h,
+        text="\n".join(parts),
+        fragments=MappingProxyType(fragments),
+    )
 
 
 def _describe_model(model: dict, lines: list[str]) -> None:
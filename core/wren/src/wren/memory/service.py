@@ -0,0 +1,168 @@
+"""Shared memory service: many project namespaces in one memory directory.
+
+By default every project keeps its own LanceDB directory under
+``<project>/.wren/memory`` — its own tables, embedding cache and store
+objects. A server hosting dozens of projects can instead point them all at
+one directory with ``WREN_MEMORY_SHARED_DIR``. Each project then lives in a
+*namespace* of that directory:
+
+* its tables are ``<namespace>__schema_items`` / ``<namespace>__query_history``
+  (see ``MemoryStore(namespace=...)``), next to every other project's,
+* the on-disk embedding cache is shared, so a text embedded for one project
+  is never re-encoded for another,
+* :class:`MemoryService` keeps one :class:`~wren.memory.store.MemoryStore`
+  per namespace for the life of the process, and the embedding model and
+  :mod:`~wren.memory.recall_cache` are process-wide already.
+
+A project's namespace is derived from its resolved path
+(:func:`project_namespace`), so it is stable across processes and restarts.
+:func:`project_store` and ``get_index(project, None)`` pick the shared
+namespace or the per-project directory transparently; ``--path`` always
+means a plain, un-namespaced store.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from datetime import timedelta
+from functools import lru_cache
+from pathlib import Path
+
+from wren.memory.markdown import slugify
+
+# Characters of the project directory name kept in its namespace.
+_NAMESPACE_NAME_LEN = 40
+
+
+def shared_memory_dir() -> Path | None:
+    """``WREN_MEMORY_SHARED_DIR`` as a path, or None when unset."""
+    env = os.getenv("WREN_MEMORY_SHARED_DIR", "").strip()
+    return Path(env).expanduser() if env else None
+
+
+def project_namespace(project_path: str | Path) -> str:
+    """Stable namespace for a project: ``<dir-name-slug>-<path digest>``."""
+    resolved = Path(project_path).expanduser().resolve()
+    digest = hashlib.sha256(str(resolved).encode("utf-8")).hexdigest()[:8]
+    name = slugify(resolved.name)[:_NAMESPACE_NAME_LEN].rstrip("-")
+    return f"{name}-{digest}"
+
+
+class MemoryService:
+    """Memory stores for many namespaces sharing one directory.
+
+    Stores are created on first use and kept, so repeated calls for a
+    project reuse its store (and its lazily built embedding function).
+    """
+
+    def __init__(self, path: str | Path, model_name: str | None = None):
+        self.path = Path(path).expanduser()
+        self.model_name = model_name
+        self._stores: dict[str | None, object] = {}
+        self._lock = threading.Lock()
+
+    def store(self, namespace: str | None = None):
+        """Return the :class:`~wren.memory.store.MemoryStore` of *namespace*.
+
+        ``None`` is the directory's un-prefixed tables.
+        """
+        with self._lock:
+            store = self._stores.get(namespace)
+            if store is None:
+                from wren.memory.store import MemoryStore  # noqa: PLC0415
+
+                store = MemoryStore(
+                    path=self.path, model_name=self.model_name, namespace=namespace
+                )
+                self._stores[namespace] = store
+            return store
+
+    def store_for(self, project_path: str | Path):
+        """Return the store of *project_path*'s namespace."""
+        return self.store(project_namespace(project_path))
+
+    def index(self, project_path: str | Path):
+        """Return a :class:`~wren.memory.index_backend.LanceDBIndex` for a project."""
+        from wren.memory.index_backend import LanceDBIndex  # noqa: PLC0415
+
+        return LanceDBIndex(Path(project_path), store=self.store_for(project_path))
+
+    def namespaces(self) -> list[str]:
+        """Namespaces with at least one memory table in the directory."""
+        from wren.memory.store import (  # noqa: PLC0415
+            MEMORY_TABLES,
+            NAMESPACE_SEP,
+            _table_names,
+        )
+
+        found: set[str] = set()
+        for table in _table_names(self.store()._db):
+            namespace, sep, name = table.rpartition(NAMESPACE_SEP)
+            if sep and namespace and name in MEMORY_TABLES:
+                found.add(namespace)
+        return sorted(found)
+
+    def status(self) -> dict:
+        """Row counts per namespace (``""`` for the un-prefixed tables)."""
+        info: dict = {"path": str(self.path), "namespaces": {}}
+        for namespace in [None, *self.namespaces()]:
+            tables = self.store(namespace).status()["tables"]
+            if tables:
+                info["namespaces"][namespace or ""] = tables
+        return info
+
+    def optimize(
+        self,
+        *,
+        retention: timedelta | None = None,
+        convert_vectors: bool = False,
+    ) -> dict[str, dict]:
+        """Run :meth:`MemoryStore.optimize` on every namespace.
+
+        The report is keyed by LanceDB table name (``<namespace>__<table>``).
+        """
+        report: dict[str, dict] = {}
+        for namespace in [None, *self.namespaces()]:
+            store = self.store(namespace)
+            # The embedding cache is shared by every namespace: do it once.
+            stats_by_table = store.optimize(
+                retention=retention,
+                convert_vectors=convert_vectors,
+                include_cache=namespace is None,
+            )
+            for name, stats in stats_by_table.items():
+                report[store._physical(name)] = stats
+        return report
+
+
+@lru_cache(maxsize=None)
+def _service(path: str) -> MemoryService:
+    return MemoryService(path)
+
+
+def get_service(path: str | Path | None = None) -> MemoryService:
+    """Return the process-wide :class:`MemoryService` for *path*.
+
+    *path* defaults to :func:`shared_memory_dir`.
+    """
+    root = Path(path).expanduser() if path else shared_memory_dir()
+    if root is None:
+        raise ValueError(
+            "No shared memory directory: pass a path or set WREN_MEMORY_SHARED_DIR."
+        )
+    return _service(str(root.resolve()))
+
+
+def project_store(project_path: str | Path):
+    """The memory store of a project.
+
+    Its namespace in the shared directory when ``WREN_MEMORY_SHARED_DIR`` is
+    set, otherwise a store over ``<project>/.wren/memory``.
+    """
+    if shared_memory_dir() is not None:
+        return get_service().store_for(project_path)
+    from wren.memory.store import MemoryStore  # noqa: PLC0415
+
+    return MemoryStore(path=str(Path(project_path) / ".wren" / "memory"))
@@ -2,29 +2,139 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
+import os
+import re
 import threading
-from datetime import datetime, timezone
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 import pyarrow as pa
+import pyarrow.compute as pc
 
+from wren.memory import recall_cache
+from wren.memory.context_assembly import budget_context, estimate_tokens
 from wren.memory.embeddings import (
     _DEFAULT_DIM,
     _DEFAULT_MODEL,
+    embedding_model_key,
     get_embedding_function,
     warm_up,
 )
 from wren.memory.schema_indexer import (
     SCHEMA_DESCRIBE_THRESHOLD,
+    describe_manifest,
     describe_schema,
     extract_schema_items,
     manifest_hash,
 )
 
+try:
+    import fcntl
+except ImportError:  # Windows: writers are serialized within one process only
+    fcntl = None
+
 _WREN_MEMORY_DIR = Path.home() / ".wren" / "memory"
 
 _SCHEMA_TABLE = "schema_items"
 _QUERY_TABLE = "query_history"
+# Sidecar recording which manifest/model the schema table currently reflects.
+_SCHEMA_STATE_FILE = "schema_items.state.json"
+# Namespaced stores prefix their tables and sidecar: ``<namespace>__schema_items``.
+NAMESPACE_SEP = "__"
+_NAMESPACE_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9_-]{0,63}")
+MEMORY_TABLES = (_SCHEMA_TABLE, _QUERY_TABLE)
+
+# Columns that determine an item's row content besides the vector itself.
+_SCHEMA_PAYLOAD_FIELDS = (
+    "text",
+    "item_type",
+    "model_name",
+    "item_name",
+    "data_type",
+    "expression",
+    "is_calculated",
+)
+# One lock per table, shared by every MemoryStore on it in this process.
+_TABLE_LOCKS: dict[Path, threading.Lock] = {}
+_TABLE_LOCKS_GUARD = threading.Lock()
+# Next free query_id per query_history lock file, as (table version, id):
+# valid while the table is still at that version. Read and written under
+# the table's write lock.
+_NEXT_QUERY_IDS: dict[Path, tuple[int, int]] = {}
+# Table version after the last index/compaction check per lock file.
+_UPKEEP_VERSIONS: dict[Path, int] = {}
+# Keep LanceDB where-clauses a sane size when deleting many items.
+_DELETE_BATCH = 500
+# Schema search hits used to rank models for a token-budgeted context.
+_BUDGET_SEARCH_HITS = 20
+
+# Brute-force search is exact and already fast for small tables, and IVF
+# training needs enough vectors to form useful partitions; build the ANN index
+# only once a table reaches this many rows.
+_ANN_MIN_ROWS = int(os.getenv("WREN_MEMORY_ANN_MIN_ROWS", "10000"))
+# IVF_PQ (default) or IVF_HNSW_SQ.
+_ANN_INDEX_TYPE = os.getenv("WREN_MEMORY_ANN_INDEX", "IVF_PQ").upper()
+# IVF partitions probed per search, and the re-ranking factor applied to PQ
+# candidates with exact distances (unset → no refine step).
+_ANN_NPROBES = int(os.getenv("WREN_MEMORY_NPROBES", "20"))
+_ANN_REFINE_FACTOR = int(os.getenv("WREN_MEMORY_REFINE_FACTOR", "0")) or None
+
+# Element type of stored vectors. float16 halves the vector column on disk
+# and in memory; queries stay float32 and distances are computed in float32,
+# so rankings barely move (unit-normalized embeddings lose ~1e-3 precision).
+_VECTOR_DTYPES: dict[str, pa.DataType] = {
+    "float32": pa.float32(),
+    "float16": pa.float16(),
+}
+_VECTOR_DTYPE = os.getenv("WREN_MEMORY_VECTOR_DTYPE", "float32").strip().lower()
+
+# Texts per embedding-model call when bulk-loading query pairs.
+_EMBED_BATCH = int(os.getenv("WREN_MEMORY_EMBED_BATCH", "256"))
+# Every table.add() creates a fragment; compact once this many small ones
+# have piled up (single-pair stores add one each).
+_COMPACT_MIN_FRAGMENTS = int(os.getenv("WREN_MEMORY_COMPACT_FRAGMENTS", "32"))
+# Dataset versions younger than this survive optimize(), so a reader still
+# holding an older snapshot (another process, a long scan) keeps working.
+_VERSION_RETENTION = timedelta(
+    seconds=float(os.getenv("WREN_MEMORY_VERSION_RETENTION", "3600"))
+)
+
+# Recall mode: "hybrid" fuses BM25 full-text and vector rankings with
+# reciprocal-rank fusion; "vector" is pure embedding similarity.
+_SEARCH_MODES = ("hybrid", "vector")
+_SEARCH_MODE = os.getenv("WREN_MEMORY_SEARCH", "").strip().lower()
+if _SEARCH_MODE not in _SEARCH_MODES:
+    _SEARCH_MODE = "hybrid"
+# RRF damping constant (Cormack et al.); larger values flatten rank gaps.
+_RRF_K = 60
+# Each retriever contributes this many candidates per requested result.
+_HYBRID_DEPTH = 4
+
+# Text columns searched by the BM25 side of hybrid recall; each gets an FTS
+# index. query_history's ``text`` duplicates ``nl_query``.
+_FTS_COLUMNS: dict[str, list[str]] = {
+    _SCHEMA_TABLE: ["text"],
+    _QUERY_TABLE: ["nl_query", "sql_query"],
+}
+
+# Filter columns that get a scalar index, and the index kind: bitmaps for
+# low-cardinality columns, B-trees for near-unique ones.
+_SCALAR_INDEXES: dict[str, dict[str, str]] = {
+    _SCHEMA_TABLE: {
+        "item_key": "btree",
+        "mdl_hash": "bitmap",
+        "item_type": "bitmap",
+        "model_name": "btree",
+    },
+    _QUERY_TABLE: {
+        "query_id": "btree",
+        "datasource": "bitmap",
+        "tags": "bitmap",
+    },
+}
 
 
 def _esc(value: str) -> str:
@@ -32,11 +142,17 @@ def _esc(value: str) -> str:
     return value.replace("'", "''")
 
 
-def _schema_items_arrow_schema(dim: int = _DEFAULT_DIM) -> pa.Schema:
+def _vector_type(dim: int, dtype: str = "float32") -> pa.DataType:
+    return pa.list_(_VECTOR_DTYPES[dtype], dim)
+
+
+def _schema_items_arrow_schema(
+    dim: int = _DEFAULT_DIM, dtype: str = "float32"
+) -> pa.Schema:
     return pa.schema(
         [
             pa.field("text", pa.utf8()),
-            pa.field("vector", pa.list_(pa.float32(), dim)),
+            pa.field("vector", _vector_type(dim, dtype)),
             pa.field("item_type", pa.utf8()),
             pa.field("model_name", pa.utf8()),
             pa.field("item_name", pa.utf8()),
@@ -45,24 +161,145 @@ def _schema_items_arrow_schema(dim: int = _DEFAULT_DIM) -> pa.Schema:
             pa.field("is_calculated", pa.bool_()),
             pa.field("mdl_hash", pa.utf8()),
             pa.field("indexed_at", pa.timestamp("us", tz="UTC")),
+            pa.field("item_key", pa.utf8()),
+            pa.field("content_hash", pa.utf8()),
         ]
     )
 
 
-def _query_history_arrow_schema(dim: int = _DEFAULT_DIM) -> pa.Schema:
+def _query_history_arrow_schema(
+    dim: int = _DEFAULT_DIM, dtype: str = "float32"
+) -> pa.Schema:
     return pa.schema(
         [
             pa.field("text", pa.utf8()),
-            pa.field("vector", pa.list_(pa.float32(), dim)),
+            pa.field("vector", _vector_type(dim, dtype)),
             pa.field("nl_query", pa.utf8()),
             pa.field("sql_query", pa.utf8()),
             pa.field("datasource", pa.utf8()),
             pa.field("created_at", pa.timestamp("us", tz="UTC")),
             pa.field("tags", pa.utf8()),
+            pa.field("query_id", pa.int64()),
         ]
     )
 
 
+# query_history columns returned by list/dump (everything but the vector).
+_QUERY_ROW_COLUMNS = [
+    "text",
+    "nl_query",
+    "sql_query",
+    "datasource",
+    "created_at",
+    "tags",
+]
+
+
+def _assign_item_keys(items: list[dict]) -> None:
+    """Give every schema item a stable ``item_key`` and a ``content_hash``.
+
+    The key identifies the MDL element (``type:model:name``) independently
+    of the manifest as a whole, so an edit to one column leaves every other
+    item's key untouched. Repeated names get an occurrence suffix.
+    """
+    seen: dict[str, int] = {}
+    for item in items:
+        key = f"{item['item_type']}:{item['model_name']}:{item['item_name']}"
+        n = seen.get(key, 0)
+        seen[key] = n + 1
+        item["item_key"] = key if n == 0 else f"{key}#{n}"
+        payload = json.dumps(
+            [item.get(f) for f in _SCHEMA_PAYLOAD_FIELDS], ensure_ascii=False
+        )
+        digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+        item["content_hash"] = digest[:16]
+
+
+def _in_list(column: str, values: list[str]) -> str:
+    quoted = ", ".join(f"'{_esc(v)}'" for v in values)
+    return f"{column} IN ({quoted})"
+
+
+def _id_list(values: list[int]) -> str:
+    return f"query_id IN ({', '.join(str(int(v)) for v in values)})"
+
+
+def _source_filter(source: str | None) -> str | None:
+    return f"tags = 'source:{_esc(source)}'" if source else None
+
+
+def _scan(table, columns: list[str], where: str | None = None) -> pa.Table:
+    """Projected (and optionally filtered) full scan — never reads vectors."""
+    query = table.search().select(columns)
+    if where:
+        query = query.where(where)
+    return query.limit(None).to_arrow()
+
+
+def _check_vector_dtype(dtype: str) -> str:
+    if dtype not in _VECTOR_DTYPES:
+        raise ValueError(
+            f"Unknown vector dtype {dtype!r}; expected one of "
+            f"{', '.join(_VECTOR_DTYPES)}."
+        )
+    return dtype
+
+
+def _result_columns(table, score: str) -> list[str]:
+    """Every column but the vector, plus the retriever's *score* column."""
+    return [name for name in table.schema.names if name != "vector"] + [score]
+
+
+def _check_namespace(namespace: str | None) -> str | None:
+    if namespace is not None and (
+        not _NAMESPACE_RE.fullmatch(namespace) or NAMESPACE_SEP in namespace
+    ):
+        raise ValueError(
+            f"Invalid memory namespace {namespace!r}: use up to 64 letters, "
+            f"digits, '-' or '_' (not {NAMESPACE_SEP!r}), starting with a "
+            "letter or digit."
+        )
+    return namespace
+
+
+def _check_mode(mode: str) -> str:
+    if mode not in _SEARCH_MODES:
+        raise ValueError(
+            f"Unknown search mode {mode!r}; expected one of {', '.join(_SEARCH_MODES)}."
+        )
+    return mode
+
+
+def _rrf_fuse(rankings: list[list[dict]], limit: int) -> list[dict]:
+    """Merge ranked row lists by reciprocal-rank fusion on ``_rowid``."""
+    scores: dict[int, float] = {}
+    rows: dict[int, dict] = {}
+    for ranking in rankings:
+        for rank, row in enumerate(ranking):
+            rid = row["_rowid"]
+            scores[rid] = scores.get(rid, 0.0) + 1.0 / (_RRF_K + rank + 1)
+            merged = rows.setdefault(rid, row)
+            if merged is not row:
+                # Keep both retrievers' scores on the surviving row.
+                for key, value in row.items():
+                    merged.setdefault(key, value)
+    order = sorted(scores, key=lambda rid: -scores[rid])[:limit]
+    fused = []
+    for rid in order:
+        row = rows[rid]
+        row["_relevance_score"] = scores[rid]
+        fused.append(row)
+    return fused
+
+
+def _ann_index_config():
+    from lancedb.index import HnswSq, IvfPq  # noqa: PLC0415
+
+    if _ANN_INDEX_TYPE == "IVF_HNSW_SQ":
+        return HnswSq(distance_type="l2")
+    return IvfPq(distance_type="l2")
+
+
 def _table_names(db) -> list[str]:
     """Get table names, compatible with lancedb >=0.30 (ListTablesResponse)."""
     result = db.list_tables()
@@ -80,12 +317,42 @@ class MemoryStore:
         Directory for LanceDB storage.  Defaults to ``~/.wren/memory/``.
     model_name:
         Sentence-transformers model name.  ``None`` → default multilingual model.
+    ann_min_rows:
+        Row count at which a table gets an ANN vector index
+        (``WREN_MEMORY_ANN_MIN_ROWS``, default 10000).
+    nprobes, refine_factor:
+        ANN search tuning (``WREN_MEMORY_NPROBES`` / ``WREN_MEMORY_REFINE_FACTOR``).
+        Only take effect on indexed tables.
+    search_mode:
+        Default recall mode, ``"hybrid"`` or ``"vector"``
+        (``WREN_MEMORY_SEARCH``, default hybrid).
+    embed_batch_size:
+        Texts per embedding call in :meth:`load_queries`
+        (``WREN_MEMORY_EMBED_BATCH``, default 256).
+    vector_dtype:
+        Element type of stored vectors, ``"float32"`` or ``"float16"``
+        (``WREN_MEMORY_VECTOR_DTYPE``, default float32). Applies to tables
+        this store creates; ``optimize(convert_vectors=True)`` converts
+        existing ones.
+    namespace:
+        Keep this store's tables (``<namespace>__schema_items``, ...) and
+        schema state apart from other namespaces in the same directory, so
+        many projects can share one memory directory and embedding cache
+        (see :mod:`wren.memory.service`). ``None`` → un-prefixed tables.
     """
 
     def __init__(
         self,
         path: str | Path | None = None,
         model_name: str | None = None,
+        *,
+        ann_min_rows: int | None = None,
+        nprobes: int | None = None,
+        refine_factor: int | None = None,
+        search_mode: str | None = None,
+        embed_batch_size: int | None = None,
+        vector_dtype: str | None = None,
+        namespace: str | None = None,
     ):
         import lancedb  # noqa: PLC0415
 
@@ -94,6 +361,13 @@ class MemoryStore:
         self._path = resolved
         self._db = lancedb.connect(str(resolved))
         self._model_name = model_name or _DEFAULT_MODEL
+        self._ann_min_rows = _ANN_MIN_ROWS if ann_min_rows is None else ann_min_rows
+        self._nprobes = nprobes or _ANN_NPROBES
+        self._refine_factor = refine_factor or _ANN_REFINE_FACTOR
+        self._search_mode = _check_mode(search_mode or _SEARCH_MODE)
+        self._embed_batch_size = max(1, embed_batch_size or _EMBED_BATCH)
+        self._vector_dtype = _check_vector_dtype(vector_dtype or _VECTOR_DTYPE)
+        self._namespace = _check_namespace(namespace)
         self._embed_fn_cached = None
         self._dim_cached = None
         self._init_lock = threading.Lock()
@@ -102,11 +376,23 @@ class MemoryStore:
 
     @property
     def _embed_fn(self):
-        """Construct the shared embedding function on first use."""
+        """Construct the shared, disk-cached embedding function on first use."""
         if self._embed_fn_cached is None:
             with self._init_lock:
                 if self._embed_fn_cached is None:
-                    self._embed_fn_cached = get_embedding_function(self._model_name)
+                    from wren.memory.embedding_cache import (  # noqa: PLC0415
+                        CACHE_DIR,
+                        CachedEmbeddingFunction,
+                        EmbeddingCache,
+                    )
+
+                    self._embed_fn_cached = CachedEmbeddingFunction(
+                        get_embedding_function(self._model_name),
+                        EmbeddingCache(
+                            self._path / CACHE_DIR,
+                            embedding_model_key(self._model_name),
+                        ),
+                    )
         return self._embed_fn_cached
 
     @property
@@ -119,9 +405,12 @@ class MemoryStore:
 
     def _table_vector_dim(self, name: str) -> int | None:
         """Return an existing table's fixed vector dimension."""
-        if name not in _table_names(self._db):
+        if not self._has_table(name):
+            return None
+        try:
+            table = self._open_table(name)
+        except ValueError:  # listed, but another writer is still creating it
             return None
-        table = self._db.open_table(name)
         vector_field = table.schema.field("vector")
         if not isinstance(vector_field.type, pa.FixedSizeListType):
             raise ValueError(
@@ -133,7 +422,7 @@ class MemoryStore:
     def _resolve_dim(self) -> int:
         """Resolve dimension from existing tables or an embedding probe."""
         dims: dict[str, int] = {}
-        for name in (_SCHEMA_TABLE, _QUERY_TABLE):
+        for name in MEMORY_TABLES:
             dim = self._table_vector_dim(name)
             if dim is not None:
                 dims[name] = dim
@@ -154,7 +443,7 @@ class MemoryStore:
     def _validate_and_set_dim(self, dim: int) -> None:
         """Validate a computed vector dimension before caching it."""
         with self._dim_lock:
-            for name in (_SCHEMA_TABLE, _QUERY_TABLE):
+            for name in MEMORY_TABLES:
                 existing_dim = self._table_vector_dim(name)
                 if existing_dim is not None and existing_dim != dim:
                     raise ValueError(
@@ -167,11 +456,55 @@ class MemoryStore:
                     )
             self._dim_cached = dim
 
+    # ── Namespaced table access ───────────────────────────────────────────
+
+    @property
+    def namespace(self) -> str | None:
+        return self._namespace
+
+    def _physical(self, name: str) -> str:
+        """LanceDB table name of the logical table *name* in this namespace."""
+        if self._namespace is None:
+            return name
+        return f"{self._namespace}{NAMESPACE_SEP}{name}"
+
+    def _has_table(self, name: str) -> bool:
+        return self._physical(name) in _table_names(self._db)
+
+    def _open_table(self, name: str):
+        return self._db.open_table(self._physical(name))
+
+    def _create_table(self, name: str, data, **kwargs):
+        return self._db.create_table(self._physical(name), data, **kwargs)
+
+    def _drop_table(self, name: str) -> None:
+        self._db.drop_table(self._physical(name))
+
+    def _lock_path(self, name: str) -> Path:
+        return self._path.resolve() / f".{self._physical(name)}.lock"
+
+    @contextmanager
+    def _write_lock(self, name: str):
+        """Hold the write lock of table *name*.
+
+        Serializes ``query_id`` allocation and whole-table rewrites: threads
+        of this process share one lock per table, and other processes (the
+        CLI, ``memory watch``, another server) are excluded with ``flock`` on
+        a ``.<table>.lock`` file next to the tables.
+        """
+        lock_path = self._lock_path(name)
+        with _TABLE_LOCKS_GUARD:
+            lock = _TABLE_LOCKS.setdefault(lock_path, threading.Lock())
+        with lock, open(lock_path, "a") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            yield
+
     def _schema_table_schema(self) -> pa.Schema:
-        return _schema_items_arrow_schema(dim=self._dim)
+        return _schema_items_arrow_schema(dim=self._dim, dtype=self._vector_dtype)
 
     def _query_table_schema(self) -> pa.Schema:
-        return _query_history_arrow_schema(dim=self._dim)
+        return _query_history_arrow_schema(dim=self._dim, dtype=self._vector_dtype)
 
     # ── Schema indexing ───────────────────────────────────────────────────
 
@@ -184,6 +517,12 @@ class MemoryStore:
     ) -> dict:
         """Extract schema items from *manifest*, embed, and store.
 
+        With *replace* (the default) an existing index is updated in place:
+        only items whose content changed since the last run are embedded,
+        items gone from the manifest are deleted, and untouched rows are not
+        rewritten. Stores written by older versions, or with a different
+        embedding model, are rebuilt from scratch once.
+
         If *seed_queries* is True, also generates canonical NL-SQL pairs
         and inserts them into query_history (tagged 'source:seed').
         Old seed entries are replaced; user-confirmed entries are preserved.
@@ -191,39 +530,44 @@ class MemoryStore:
         Returns {"schema_items": int, "seed_queries": int}.
         """
         items = extract_schema_items(manifest)
-        table_exists = _SCHEMA_TABLE in _table_names(self._db)
+        _assign_item_keys(items)
+        table_exists = self._has_table(_SCHEMA_TABLE)
 
         if not items:
             if replace and table_exists:
-                self._db.drop_table(_SCHEMA_TABLE)
+                self._drop_table(_SCHEMA_TABLE)
+            self._clear_schema_state()
             schema_count = 0
+        elif replace and table_exists and self._schema_state_usable():
+            self._sync_schema_items(items)
+            self._write_schema_state(manifest_hash(manifest))
+            schema_count = len(items)
         else:
-            texts = [item["text"] for item in items]
-            vectors = self._embed_fn.compute_source_embeddings(texts)
-            self._validate_and_set_dim(len(vectors[0]))
-
-            for item, vec in zip(items, vectors):
-                item["vector"] = vec
-
+            self._embed_schema_items(items)
             if replace:
                 if table_exists:
-                    self._db.drop_table(_SCHEMA_TABLE)
-                self._db.create_table(
+                    self._drop_table(_SCHEMA_TABLE)
+                self._create_table(
                     _SCHEMA_TABLE,
                     items,
                     schema=self._schema_table_schema(),
                 )
+                self._write_schema_state(manifest_hash(manifest))
             else:
+                # Appended rows mix manifests; fall back to per-row hashes.
+                self._clear_schema_state()
                 if table_exists:
-                    tbl = self._db.open_table(_SCHEMA_TABLE)
+                    tbl = self._open_table(_SCHEMA_TABLE)
                     tbl.add(items)
                 else:
-                    self._db.create_table(
+                    self._create_table(
                         _SCHEMA_TABLE,
                         items,
                         schema=self._schema_table_schema(),
                     )
             schema_count = len(items)
+        if items:
+            self._ensure_indexes(_SCHEMA_TABLE)
 
         seed_count = 0
         if seed_queries:
@@ -231,6 +575,219 @@ class MemoryStore:
 
         return {"schema_items": schema_count, "seed_queries": seed_count}
 
+    def _embed_schema_items(self, items: list[dict]) -> None:
+        texts = [item["text"] for item in items]
+        vectors = self._embed_fn.compute_source_embeddings(texts)
+        self._validate_and_set_dim(len(vectors[0]))
+        for item, vec in zip(items, vectors):
+            item["vector"] = vec
+
+    def _sync_schema_items(self, items: list[dict]) -> None:
+        """Bring the schema table in line with *items*, touching only diffs.
+
+        Rows are matched by ``item_key``: unchanged ``content_hash`` → row
+        kept as-is (including its ``mdl_hash`` and ``indexed_at``); changed or
+        new → embedded and written; keys no longer present → deleted.
+        """
+        table = self._open_table(_SCHEMA_TABLE)
+        existing = (
+            table.search()
+            .select(["item_key", "content_hash"])
+            .limit(None)
+            .to_arrow()
+            .to_pydict()
+        )
+        current: dict[str, str | None] = {}
+        duplicated: set[str] = set()
+        for key, digest in zip(existing["item_key"], existing["content_hash"]):
+            if key in current:
+                duplicated.add(key)
+            current[key] = digest
+
+        pending = [
+            item
+            for item in items
+            if item["item_key"] in duplicated
+            or current.get(item["item_key"]) != item["content_hash"]
+        ]
+        wanted = {item["item_key"] for item in items}
+        # Changed items are deleted and re-added; deleted items just go.
+        stale = [key for key in current if key not in wanted]
+        stale += [item["item_key"] for item in pending if item["item_key"] in current]
+        if pending:
+            self._embed_schema_items(pending)
+        for i in range(0, len(stale), _DELETE_BATCH):
+            table.delete(_in_list("item_key", stale[i : i + _DELETE_BATCH]))
+        if pending:
+            table.add(pending)
+
+    # ── Table indexes ─────────────────────────────────────────────────────
+
+    def _ensure_indexes(self, name: str) -> None:
+        """Create any missing scalar indexes, and the ANN index once due.
+
+        Rows written after an index was built stay searchable (LanceDB scans
+        them exhaustively) until the index is optimized.
+        """
+        from lancedb.index import FTS, Bitmap, BTree  # noqa: PLC0415
+
+        table = self._open_table(name)
+        rows = table.count_rows()
+        if rows == 0:
+            return
+        indexed = {col for ix in table.list_indices() for col in ix.columns}
+        columns = set(table.schema.names)
+        for col, kind in _SCALAR_INDEXES[name].items():
+            if col in columns and col not in indexed:
+                config = Bitmap() if kind == "bitmap" else BTree()
+                table.create_index(col, config=config)
+        for col in _FTS_COLUMNS[name]:
+            if col not in indexed:
+                table.create_index(col, config=FTS())
+        if "vector" not in indexed and rows >= self._ann_min_rows:
+            table.create_index("vector", config=_ann_index_config())
+
+    def _search(
+        self,
+        name: str,
+        query: str,
+        *,
+        limit: int,
+        where: str | None = None,
+        mode: str | None = None,
+    ) -> list[dict]:
+        """Rank rows of table *name* for *query* (vector or hybrid).
+
+        Results carry every column but the vector, which is never read back.
+        Repeated searches are answered from :mod:`~wren.memory.recall_cache`
+        until the table's version changes.
+        """
+        mode = _check_mode(mode or self._search_mode)
+        query = recall_cache.normalize_question(query)
+        table = self._open_table(name)
+        key = (
+            str(self._path),
+            self._physical(name),
+            table.version,
+            embedding_model_key(self._model_name),
+            query,
+            where,
+            mode,
+            limit,
+            self._nprobes,
+            self._refine_factor,
+        )
+        cached = recall_cache.search_results.get(key)
+        if cached is not None:
+            return cached
+        results = self._run_search(table, name, query, limit, where, mode)
+        recall_cache.search_results.put(key, results)
+        return results
+
+    def _query_vector(self, query: str):
+        key = (embedding_model_key(self._model_name), query)
+        vector = recall_cache.query_embeddings.get(key)
+        if vector is None:
+            vector = self._embed_fn.compute_query_embeddings(query)[0]
+            recall_cache.query_embeddings.put(key, vector)
+        return vector
+
+    def _run_search(
+        self,
+        table,
+        name: str,
+        query: str,
+        limit: int,
+        where: str | None,
+        mode: str,
+    ) -> list[dict]:
+        depth = limit * _HYBRID_DEPTH if mode == "hybrid" else limit
+        q = table.search(self._query_vector(query))
+        q = q.select(_result_columns(table, "_distance")).nprobes(self._nprobes)
+        if self._refine_factor:
+            q = q.refine_factor(self._refine_factor)
+        if where:
+            q = q.where(where)
+        if mode == "vector":
+            results = q.limit(limit).to_list()
+        else:
+            fts = table.search(query, query_type="fts", fts_columns=_FTS_COLUMNS[name])
+            fts = fts.select(_result_columns(table, "_score"))
+            if where:
+                fts = fts.where(where)
+            vector_hits = q.with_row_id(True).limit(depth).to_list()
+            text_hits = fts.with_row_id(True).limit(depth).to_list()
+            results = _rrf_fuse([vector_hits, text_hits], limit)
+            for r in results:
+                r.pop("_rowid", None)
+                r.pop("_score", None)
+        return results
+
+    def index_health(self) -> dict[str, list[dict]]:
+        """Return the indexes of each memory table with their coverage."""
+        health: dict[str, list[dict]] = {}
+        for name in MEMORY_TABLES:
+            if not self._has_table(name):
+                continue
+            health[name] = [
+                {
+                    "name": ix.name,
+                    "type": ix.index_type,
+                    "columns": list(ix.columns),
+                    "indexed_rows": ix.num_indexed_rows,
+                    "unindexed_rows": ix.num_unindexed_rows,
+                }
+                for ix in self._open_table(name).list_indices()
+            ]
+        return health
+
+    # ── Schema index state ────────────────────────────────────────────────
+
+    @property
+    def _schema_state_path(self) -> Path:
+        return self._path / self._physical(_SCHEMA_STATE_FILE)
+
+    def _read_schema_state(self) -> dict | None:
+        try:
+            state = json.loads(self._schema_state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return state if isinstance(state, dict) else None
+
+    def _write_schema_state(self, mdl_hash: str) -> None:
+        state = {"mdl_hash": mdl_hash, "model": self._model_name}
+        tmp = self._schema_state_path.with_name(self._schema_state_path.name + ".tmp")
+        tmp.write_text(json.dumps(state), encoding="utf-8")
+        os.replace(tmp, self._schema_state_path)
+
+    def _clear_schema_state(self) -> None:
+        """Drop the recorded manifest hash, falling back to per-row hashes.
+
+        Rows kept by :meth:`_sync_schema_items` still carry the hash they
+        were embedded under; they are stamped with the recorded hash first,
+        or per-row checks would treat them as stale.
+        """
+        state = self._read_schema_state()
+        if state and state.get("mdl_hash") and self._has_table(_SCHEMA_TABLE):
+            mdl_hash = state["mdl_hash"]
+            older = f"mdl_hash != '{_esc(mdl_hash)}'"
+            table = self._open_table(_SCHEMA_TABLE)
+            if table.count_rows(older):
+                table.update(where=older, values={"mdl_hash": mdl_hash})
+        self._schema_state_path.unlink(missing_ok=True)
+
+    def _schema_state_usable(self) -> bool:
+        """Whether existing schema rows can be diffed instead of rebuilt.
+
+        Requires the item-key columns (absent in stores written by older
+        versions) and vectors produced by the current embedding model.
+        """
+        state = self._read_schema_state()
+        if state is None or state.get("model") != self._model_name:
+            return False
+        names = self._open_table(_SCHEMA_TABLE).schema.names
+        return "item_key" in names and "content_hash" in names
+
     def _upsert_seed_queries(self, manifest: dict) -> int:
         """Replace seed queries after their embeddings are ready."""
         from wren.memory.seed_queries import (  # noqa: PLC0415
@@ -241,15 +798,15 @@ class MemoryStore:
         pairs = generate_seed_queries(manifest)
 
         if not pairs:
-            if _QUERY_TABLE in _table_names(self._db):
-                table = self._db.open_table(_QUERY_TABLE)
+            if self._has_table(_QUERY_TABLE):
+                table = self._open_table(_QUERY_TABLE)
                 table.delete(f"tags = '{SEED_TAG}'")
             return 0
 
         records = self._prepare_query_records(pairs, tags=SEED_TAG)
 
-        if _QUERY_TABLE in _table_names(self._db):
-            table = self._db.open_table(_QUERY_TABLE)
+        if self._has_table(_QUERY_TABLE):
+            table = self._open_table(_QUERY_TABLE)
             table.delete(f"tags = '{SEED_TAG}'")
 
         self._write_query_records(records)
@@ -258,18 +815,21 @@ class MemoryStore:
     def schema_is_current(self, manifest: dict) -> bool:
         """Check whether the indexed schema matches *manifest*.
 
-        Returns ``True`` only when every row in the schema table carries
-        the current manifest hash (i.e. no stale rows from a previous
-        manifest remain).
+        Uses the manifest hash recorded by the last :meth:`index_schema`.
+        Stores without that record (older versions, appended indexes) are
+        current only when every row carries the current manifest hash.
         """
-        if _SCHEMA_TABLE not in _table_names(self._db):
+        if not self._has_table(_SCHEMA_TABLE):
             return False
-        table = self._db.open_table(_SCHEMA_TABLE)
+        table = self._open_table(_SCHEMA_TABLE)
         if table.count_rows() == 0:
             return False
         current_hash = manifest_hash(manifest)
-        df = table.to_pandas()
-        return bool((df["mdl_hash"] == current_hash).all())
+        state = self._read_schema_state()
+        if state is not None:
+            return state.get("mdl_hash") == current_hash
+        stale = table.count_rows(f"mdl_hash != '{_esc(current_hash)}'")
+        return stale == 0
 
     # ── Plain-text / hybrid ────────────────────────────────────────────────
 
@@ -287,30 +847,64 @@ class MemoryStore:
         item_type: str | None = None,
         model_name: str | None = None,
         threshold: int = SCHEMA_DESCRIBE_THRESHOLD,
+        mode: str | None = None,
+        budget: int | None = None,
     ) -> dict:
         """Return schema context using the best strategy for the schema size.
 
         For small schemas (plain-text description below *threshold* chars),
         returns the full text (``strategy="full"``).  For large schemas,
-        uses embedding search with optional filters (``strategy="search"``).
-
-        Returns a dict with keys ``strategy``, ``schema`` (full) or
-        ``results`` (search).
+        uses embedding search with optional filters (``strategy="search"``);
+        *mode* picks hybrid or vector-only ranking as in :meth:`recall_queries`.
+
+        With a token *budget* the threshold is ignored: a description that
+        fits is returned in full, otherwise the search hits (re-ranked
+        lexically when the index has none) seed
+        :func:`~wren.memory.context_assembly.assemble_context`
+        (``strategy="budget"``). *item_type* does not apply there; *model_name*
+        is packed first.
+
+        Returns a dict with keys ``strategy``, ``schema`` (full/budget) or
+        ``results`` (search); see ``assemble_context`` for the budget keys.
         """
-        text = describe_schema(manifest)
-        if len(text) <= threshold:
-            return {"strategy": "full", "schema": text}
+        if budget is not None:
+            return self._budget_context(
+                manifest, query, budget, model_name=model_name, mode=mode
+            )
+        description = describe_manifest(manifest)
+        if description.strategy(threshold) == "full":
+            return {"strategy": "full", "schema": description.text}
 
-        mdl_hash_val = manifest_hash(manifest)
         results = self._search_schema(
             query,
             limit=limit,
             item_type=item_type,
             model_name=model_name,
-            mdl_hash=mdl_hash_val,
+            mdl_hash=description.mdl_hash,
+            mode=mode,
         )
         return {"strategy": "search", "results": results}
 
+    def _budget_context(
+        self,
+        manifest: dict,
+        query: str,
+        budget: int,
+        *,
+        model_name: str | None = None,
+        mode: str | None = None,
+    ) -> dict:
+        description = describe_manifest(manifest)
+        hits = []
+        if estimate_tokens(description.text) > budget:
+            hits = self._search_schema(
+                query,
+                limit=_BUDGET_SEARCH_HITS,
+                mdl_hash=description.mdl_hash,
+                mode=mode,
+            )
+        return budget_context(manifest, query, budget, hits=hits, model_name=model_name)
+
     def _search_schema(
         self,
         query: str,
@@ -319,30 +913,33 @@ class MemoryStore:
         item_type: str | None = None,
         model_name: str | None = None,
         mdl_hash: str | None = None,
+        mode: str | None = None,
     ) -> list[dict]:
-        """Embedding search over indexed schema items (internal)."""
-        if _SCHEMA_TABLE not in _table_names(self._db):
+        """Embedding (or hybrid) search over indexed schema items (internal)."""
+        if not self._has_table(_SCHEMA_TABLE):
             return []
 
-        table = self._db.open_table(_SCHEMA_TABLE)
-        q = table.search(
-            self._embed_fn.compute_query_embeddings(query)[0],
-        )
-
         where_parts: list[str] = []
         if mdl_hash:
-            where_parts.append(f"mdl_hash = '{_esc(mdl_hash)}'")
+            state = self._read_schema_state()
+            if state is None:
+                where_parts.append(f"mdl_hash = '{_esc(mdl_hash)}'")
+            elif state.get("mdl_hash") != mdl_hash:
+                # Rows keep the hash they were embedded under, so staleness
+                # is decided by the index state rather than per row.
+                return []
         if item_type:
             where_parts.append(f"item_type = '{_esc(item_type)}'")
         if model_name:
             where_parts.append(f"model_name = '{_esc(model_name)}'")
-        if where_parts:
-            q = q.where(" AND ".join(where_parts))
 
-        results = q.limit(limit).to_list()
-        for r in results:
-            r.pop("vector", None)
-        return results
+        return self._search(
+            _SCHEMA_TABLE,
+            query,
+            limit=limit,
+            where=" AND ".join(where_parts) or None,
+            mode=mode,
+        )
 
     # ── Query history ─────────────────────────────────────────────────────
 
@@ -368,16 +965,7 @@ class MemoryStore:
             "created_at": now,
             "tags": tags or "",
         }
-
-        if _QUERY_TABLE in _table_names(self._db):
-            table = self._db.open_table(_QUERY_TABLE)
-            table.add([record])
-        else:
-            self._db.create_table(
-                _QUERY_TABLE,
-                [record],
-                schema=self._query_table_schema(),
-            )
+        self._write_query_records([record])
 
     def recall_queries(
         self,
@@ -385,25 +973,83 @@ class MemoryStore:
         *,
         limit: int = 3,
         datasource: str | None = None,
+        mode: str | None = None,
     ) -> list[dict]:
-        """Search past NL→SQL pairs by semantic similarity."""
-        if _QUERY_TABLE not in _table_names(self._db):
+        """Search past NL→SQL pairs by similarity.
+
+        *mode* ``"hybrid"`` (the default) also matches the question and SQL
+        text with BM25, so exact table/column/metric names rank high even
+        when their embeddings do not; ``"vector"`` is embedding-only.
+        """
+        if not self._has_table(_QUERY_TABLE):
             return []
+        where = f"datasource = '{_esc(datasource)}'" if datasource else None
+        return self._search(_QUERY_TABLE, query, limit=limit, where=where, mode=mode)
 
-        table = self._db.open_table(_QUERY_TABLE)
-        q = table.search(
-            self._embed_fn.compute_query_embeddings(query)[0],
-        )
+    # ── Query listing & management ───────────────────────────────────────
 
-        if datasource:
-            q = q.where(f"datasource = '{_esc(datasource)}'")
+    def _open_query_table(self):
+        """Open query_history for reading, or None when it does not exist.
 
-        results = q.limit(limit).to_list()
-        for r in results:
-            r.pop("vector", None)
-        return results
+        Legacy tables written before stable ids existed may lack
+        ``query_id``; read them with :meth:`_scan_queries`.
+        """
+        if not self._has_table(_QUERY_TABLE):
+            return None
+        return self._open_table(_QUERY_TABLE)
 
-    # ── Query listing & management ───────────────────────────────────────
+    def _scan_queries(
+        self,
+        table,
+        columns: list[str],
+        *,
+        source: str | None = None,
+        ids: list[int] | None = None,
+    ) -> pa.Table:
+        """Projected query_history scan, filtered by source tag and/or ids.
+
+        On a legacy table without ``query_id`` the positional ids
+        :meth:`_migrate_query_ids` would assign are synthesized in memory;
+        the table is not rewritten.
+        """
+        if "query_id" in table.schema.names:
+            where = [_source_filter(source), _id_list(ids) if ids else None]
+            return _scan(table, columns, " AND ".join(w for w in where if w) or None)
+        base = [c for c in columns if c not in ("query_id", "tags")]
+        data = _scan(table, base + ["tags"])
+        data = data.append_column(
+            pa.field("query_id", pa.int64()),
+            pa.array(range(data.num_rows), type=pa.int64()),
+        )
+        mask = None
+        if source:
+            mask = pc.equal(data["tags"], f"source:{source}")
+        if ids:
+            matched = pc.is_in(data["query_id"], pa.array(ids, type=pa.int64()))
+            mask = matched if mask is None else pc.and_(mask, matched)
+        if mask is not None:
+            data = data.filter(mask)
+        return data.select(columns)
+
+    def _migrate_query_ids(self):
+        """Open query_history for writing, giving legacy tables ``query_id``.
+
+        Tables written before stable ids existed are numbered once, in
+        storage order — the positional ids ``list_queries`` reports for them.
+        The caller holds the table's write lock. Returns None when the table
+        does not exist.
+        """
+        table = self._open_query_table()
+        if table is None or "query_id" in table.schema.names:
+            return table
+        data = table.to_arrow()
+        ids = pa.array(range(data.num_rows), type=pa.int64())
+        data = data.append_column(pa.field("query_id", pa.int64()), ids)
+        table = self._create_table(
+            _QUERY_TABLE, data, schema=data.schema, mode="overwrite"
+        )
+        self._ensure_indexes(_QUERY_TABLE)
+        return table
 
     def list_queries(
         self,
@@ -412,73 +1058,102 @@ class MemoryStore:
         limit: int = 20,
         offset: int = 0,
     ) -> tuple[list[dict], int]:
-        """List query_history pairs.
+        """List query_history pairs, newest first.
 
-        Returns (rows, total_count).  Rows include ``_row_id`` for use
-        with :meth:`forget_queries_by_ids`.  The ``_row_id`` is the
-        positional index in the *unfiltered* table so it can be passed
-        directly to :meth:`forget_queries_by_ids`.
+        Returns (rows, total_count).  Rows include ``_row_id``, the pair's
+        stable ``query_id``, for use with :meth:`forget_queries_by_ids`.
+        Only the ids and timestamps of the matching rows are scanned to pick
+        the page; the page itself is fetched by id.
         """
-        if _QUERY_TABLE not in _table_names(self._db):
+        table = self._open_query_table()
+        if table is None:
             return [], 0
-
-        table = self._db.open_table(_QUERY_TABLE)
-        df = table.to_pandas()
-        # Ensure a clean 0-based index matching the unfiltered table.
-        df = df.reset_index(drop=True)
-        if source:
-            df = df[df["tags"] == f"source:{source}"]
-        total = len(df)
-        df = df.sort_values("created_at", ascending=False)
-        rows = df.iloc[offset : offset + limit]
-        results = rows.drop(columns=["vector"], errors="ignore").to_dict("records")
-        # Attach the *original* DataFrame index so forget_queries_by_ids
-        # deletes the correct rows even when a source filter is applied.
-        for idx, (orig_idx, _) in zip(range(len(results)), rows.iterrows()):
-            results[idx]["_row_id"] = orig_idx
+        keys = self._scan_queries(table, ["query_id", "created_at"], source=source)
+        total = keys.num_rows
+        if offset >= total:
+            return [], total
+        order = pc.sort_indices(
+            keys,
+            sort_keys=[("created_at", "descending"), ("query_id", "descending")],
+        )
+        page = keys["query_id"].take(order[offset : offset + limit]).to_pylist()
+        by_id = {
+            row["query_id"]: row
+            for row in self._scan_queries(
+                table, _QUERY_ROW_COLUMNS + ["query_id"], ids=page
+            ).to_pylist()
+        }
+        results = []
+        for query_id in page:
+            row = by_id[query_id]
+            row["_row_id"] = row.pop("query_id")
+            results.append(row)
         return results, total
 
     def count_queries_by_source(self, source: str) -> int:
         """Return the number of query_history rows matching *source* tag."""
-        if _QUERY_TABLE not in _table_names(self._db):
+        if not self._has_table(_QUERY_TABLE):
             return 0
-        table = self._db.open_table(_QUERY_TABLE)
-        df = table.to_pandas()
-        return int((df["tags"] == f"source:{source}").sum())
+        table = self._open_table(_QUERY_TABLE)
+        return table.count_rows(_source_filter(source))
 
     def forget_queries_by_ids(self, row_ids: list[int]) -> int:
-        """Delete rows at the given positional indices.  Returns deleted count."""
-        if _QUERY_TABLE not in _table_names(self._db):
+        """Delete the rows with the given ``query_id``s.  Returns deleted count.
+
+        A predicate delete: only the affected rows are touched, the rest of
+        the table is never rewritten. Unknown ids are ignored.
+        """
+        with self._write_lock(_QUERY_TABLE):
+            table = self._migrate_query_ids()
+        if table is None:
             return 0
-        table = self._db.open_table(_QUERY_TABLE)
-        existing_schema = table.schema
-        df = table.to_pandas()
-        to_delete = sorted({i for i in row_ids if 0 <= i < len(df)})
-        if not to_delete:
+        ids = sorted({int(i) for i in row_ids})
+        deleted = 0
+        for i in range(0, len(ids), _DELETE_BATCH):
+            where = _id_list(ids[i : i + _DELETE_BATCH])
+            matched = table.count_rows(where)
+            if matched:
+                table.delete(where)
+                deleted += matched
+        return deleted
+
+    def forget_query_pairs(self, pairs: list[dict]) -> int:
+        """Delete the rows loaded from *pairs* (``nl``, ``sql``, ``source``).
+
+        A row matches only with the same question, SQL and ``source:`` tag,
+        so rows stored or loaded from elsewhere under the same question are
+        kept.  Returns deleted count.
+        """
+        with self._write_lock(_QUERY_TABLE):
+            table = self._migrate_query_ids()
+        if table is None:
             return 0
-        keep = df.drop(index=to_delete).reset_index(drop=True)
-        if len(keep) == 0:
-            self._db.drop_table(_QUERY_TABLE)
-            return len(to_delete)
-        # Build the replacement before asking LanceDB to overwrite the table.
-        keep_arrow = pa.Table.from_pandas(keep, schema=existing_schema)
-        self._db.create_table(
-            _QUERY_TABLE,
-            keep_arrow,
-            schema=existing_schema,
-            mode="overwrite",
+        clauses = sorted(
+            {
+                f"(nl_query = '{_esc(p['nl'])}' AND sql_query = '{_esc(p['sql'])}'"
+                f" AND {_source_filter(p.get('source') or 'user')})"
+                for p in pairs
+            }
         )
-        return len(to_delete)
+        deleted = 0
+        for i in range(0, len(clauses), _DELETE_BATCH):
+            where = " OR ".join(clauses[i : i + _DELETE_BATCH])
+            matched = table.count_rows(where)
+            if matched:
+                table.delete(where)
+                deleted += matched
+        return deleted
 
     def forget_queries_by_source(self, source: str) -> int:
         """Delete all query_history rows matching *source* tag.  Returns deleted count."""
-        if _QUERY_TABLE not in _table_names(self._db):
+        if not self._has_table(_QUERY_TABLE):
             return 0
-        table = self._db.open_table(_QUERY_TABLE)
-        where = f"tags = 'source:{_esc(source)}'"
-        before = table.count_rows()
-        table.delete(where)
-        return before - table.count_rows()
+        table = self._open_table(_QUERY_TABLE)
+        where = _source_filter(source)
+        matched = table.count_rows(where)
+        if matched:
+            table.delete(where)
+        return matched
 
     # ── Dump / Load ──────────────────────────────────────────────────────
 
@@ -487,36 +1162,40 @@ class MemoryStore:
         *,
         source: str | None = None,
     ) -> list[dict]:
-        """Export all query_history pairs (without vector column)."""
-        if _QUERY_TABLE not in _table_names(self._db):
+        """Export all query_history pairs (without vector column), oldest first."""
+        table = self._open_query_table()
+        if table is None:
             return []
-        table = self._db.open_table(_QUERY_TABLE)
-        df = table.to_pandas()
-        if source:
-            df = df[df["tags"] == f"source:{source}"]
-        df = df.sort_values("created_at", ascending=True)
-        return df.drop(columns=["vector"], errors="ignore").to_dict("records")
+        data = self._scan_queries(
+            table, _QUERY_ROW_COLUMNS + ["query_id"], source=source
+        )
+        data = data.sort_by([("created_at", "ascending"), ("query_id", "ascending")])
+        return data.drop_columns(["query_id"]).to_pylist()
 
     def _existing_pairs_index(
         self,
     ) -> tuple[set[tuple[str, str]], dict[str, list[int]]]:
         """Build lookup indexes from existing query_history.
 
+        Only ``query_id``, ``nl_query`` and ``sql_query`` are read.
+
         Returns
         -------
         (exact_set, nl_to_rowids)
             *exact_set*: ``{(nl_query, sql_query)}`` for skip dedup.
-            *nl_to_rowids*: ``{nl_query: [positional_indices]}`` for upsert.
+            *nl_to_rowids*: ``{nl_query: [query_ids]}`` for upsert.
         """
-        if _QUERY_TABLE not in _table_names(self._db):
+        table = self._open_query_table()
+        if table is None:
             return set(), {}
-        table = self._db.open_table(_QUERY_TABLE)
-        df = table.to_pandas()
-        exact_set: set[tuple[str, str]] = set(zip(df["nl_query"], df["sql_query"]))
+        data = self._scan_queries(
+            table, ["query_id", "nl_query", "sql_query"]
+        ).to_pydict()
+        exact_set: set[tuple[str, str]] = set(zip(data["nl_query"], data["sql_query"]))
         # Collect *all* row ids per nl_query so upsert removes every duplicate.
         nl_to_rowids: dict[str, list[int]] = {}
-        for idx, nl in zip(df.index, df["nl_query"]):
-            nl_to_rowids.setdefault(nl, []).append(idx)
+        for query_id, nl in zip(data["query_id"], data["nl_query"]):
+            nl_to_rowids.setdefault(nl, []).append(query_id)
         return exact_set, nl_to_rowids
 
     def _prepare_query_records(
@@ -526,7 +1205,10 @@ class MemoryStore:
         if not pairs:
             return []
         texts = [p["nl"] for p in pairs]
-        vectors = self._embed_fn.compute_source_embeddings(texts)
+        vectors: list = []
+        for i in range(0, len(texts), self._embed_batch_size):
+            batch = texts[i : i + self._embed_batch_size]
+            vectors.extend(self._embed_fn.compute_source_embeddings(batch))
         self._validate_and_set_dim(len(vectors[0]))
         now = datetime.now(timezone.utc)
         records = []
@@ -552,15 +1234,77 @@ class MemoryStore:
         :meth:`_prepare_query_records`."""
         if not records:
             return
-        if _QUERY_TABLE in _table_names(self._db):
-            table = self._db.open_table(_QUERY_TABLE)
-            table.add(records)
-        else:
-            self._db.create_table(
-                _QUERY_TABLE,
-                records,
-                schema=self._query_table_schema(),
-            )
+        # New ids are max + 1: allocate and write them under one lock, or
+        # concurrent stores hand out the same id.
+        with self._write_lock(_QUERY_TABLE):
+            table = self._migrate_query_ids()
+            created = table is None
+            next_id = self._next_query_id(table)
+            for record in records:
+                if record.get("query_id") is None:
+                    record["query_id"] = next_id
+                    next_id += 1
+                next_id = max(next_id, record["query_id"] + 1)
+            if created:
+                table = self._create_table(
+                    _QUERY_TABLE,
+                    records,
+                    schema=self._query_table_schema(),
+                )
+            else:
+                table.add(records)
+            _NEXT_QUERY_IDS[self._lock_path(_QUERY_TABLE)] = (table.version, next_id)
+        if created or len(records) > 1 or self._upkeep_due(_QUERY_TABLE, table.version):
+            self._upkeep(_QUERY_TABLE)
+
+    def _upkeep_due(self, name: str, version: int) -> bool:
+        """Whether a single-row write to *name* should check indexes and
+        compaction.
+
+        The first write of a process always does; after that, once every
+        half ``_COMPACT_MIN_FRAGMENTS`` versions, so a burst of stores does
+        not list indexes and fragment stats each time.
+        """
+        last = _UPKEEP_VERSIONS.get(self._lock_path(name))
+        return last is None or version - last >= max(1, _COMPACT_MIN_FRAGMENTS // 2)
+
+    def _upkeep(self, name: str) -> None:
+        """Create due indexes and compact table *name* if needed.
+
+        Neither changes ids, so a remembered next ``query_id`` carries over
+        to the new version.
+        """
+        path = self._lock_path(name)
+        with self._write_lock(name):
+            before = self._open_table(name).version
+            self._ensure_indexes(name)
+            self._maybe_compact(name)
+            version = self._open_table(name).version
+            cached = _NEXT_QUERY_IDS.get(path)
+            if cached is not None and cached[0] == before:
+                _NEXT_QUERY_IDS[path] = (version, cached[1])
+        _UPKEEP_VERSIONS[path] = version
+
+    def _next_query_id(self, table) -> int:
+        """The next free ``query_id`` of *table*; the caller holds the lock.
+
+        Remembered per table version, so back-to-back stores skip the scan.
+        """
+        if table is None:
+            return 0
+        version, next_id = _NEXT_QUERY_IDS.get(self._lock_path(_QUERY_TABLE), (None, 0))
+        if version == table.version:
+            return next_id
+        top = pc.max(_scan(table, ["query_id"])["query_id"]).as_py()
+        return 0 if top is None else top + 1
+
+    def _maybe_compact(self, name: str) -> None:
+        """Merge small fragments (and fold new rows into indexes) once enough
+        have accumulated."""
+        table = self._open_table(name)
+        small = table.stats()["fragment_stats"]["num_small_fragments"]
+        if small >= _COMPACT_MIN_FRAGMENTS:
+            table.optimize()
 
     def load_queries(
         self,
@@ -593,11 +1337,13 @@ class MemoryStore:
             records = self._prepare_query_records(deduped)
 
             # Batch: collect IDs to delete, then delete once, then insert all.
+            # An updated pair keeps the id of its first existing row.
             ids_to_delete = []
             updated = 0
-            for p in deduped:
+            for p, record in zip(deduped, records):
                 if p["nl"] in nl_to_rowids:
                     ids_to_delete.extend(nl_to_rowids[p["nl"]])
+                    record["query_id"] = min(nl_to_rowids[p["nl"]])
                     updated += 1
             if ids_to_delete:
                 self.forget_queries_by_ids(ids_to_delete)
@@ -605,37 +1351,133 @@ class MemoryStore:
             loaded = len(deduped) - updated
             return {"loaded": loaded, "skipped": 0, "updated": updated}
 
-        # Default (skip duplicates)
-        loaded, skipped = 0, 0
+        # Default (skip duplicates): embed and insert all new pairs in bulk.
+        fresh: list[dict] = []
+        skipped = 0
         for p in pairs:
-            nl, sql = p["nl"], p["sql"]
-            if (nl, sql) in exact_set:
+            key = (p["nl"], p["sql"])
+            if key in exact_set:
                 skipped += 1
                 continue
-            loaded += 1
-            exact_set.add((nl, sql))  # prevent duplicates within input
-            tags = f"source:{p.get('source', 'user')}"
-            self.store_query(
-                nl_query=nl,
-                sql_query=sql,
-                datasource=p.get("datasource"),
-                tags=tags,
-            )
-
-        return {"loaded": loaded, "skipped": skipped, "updated": 0}
+            exact_set.add(key)  # prevent duplicates within input
+            fresh.append(p)
+        self._write_query_records(self._prepare_query_records(fresh))
+        return {"loaded": len(fresh), "skipped": skipped, "updated": 0}
 
     # ── Housekeeping ──────────────────────────────────────────────────────
 
     def status(self) -> dict:
         """Return index statistics."""
         info: dict = {"path": str(self._path), "tables": {}}
-        for name in _table_names(self._db):
-            table = self._db.open_table(name)
+        if self._namespace:
+            info["namespace"] = self._namespace
+        for name in MEMORY_TABLES:
+            if not self._has_table(name):
+                continue
+            table = self._open_table(name)
             info["tables"][name] = table.count_rows()
+            if "vector" in table.schema.names:
+                vector_type = table.schema.field("vector").type
+                info.setdefault("vectors", {})[name] = str(vector_type.value_type)
+        from wren.memory.embedding_cache import (  # noqa: PLC0415
+            CACHE_DIR,
+            EmbeddingCache,
+        )
+
+        if (self._path / CACHE_DIR).is_dir():
+            cache = EmbeddingCache(
+                self._path / CACHE_DIR, embedding_model_key(self._model_name)
+            )
+            info["embedding_cache"] = len(cache)
+        info["indexes"] = self.index_health()
         return info
 
+    def optimize(
+        self,
+        *,
+        retention: timedelta | None = None,
+        convert_vectors: bool = False,
+        include_cache: bool = True,
+    ) -> dict[str, dict]:
+        """Compact data files, prune old versions and catch indexes up.
+
+        Every write appends a fragment and a dataset version; this merges
+        small fragments, deletes versions older than *retention*
+        (``WREN_MEMORY_VERSION_RETENTION`` seconds, default one hour) and
+        folds unindexed rows into the existing indexes, creating any index
+        that is due. With *convert_vectors*, tables whose vectors are not
+        stored as this store's ``vector_dtype`` are rewritten in it first (no
+        re-embedding); scheduled maintenance never converts, so a process
+        started with a different ``WREN_MEMORY_VECTOR_DTYPE`` cannot flip a
+        store back. With *include_cache* the directory's embedding cache
+        table is compacted and pruned too (report key ``embedding_cache``).
+        Returns, per table, the fragment and version counts before and after,
+        and whether the vectors were converted.
+        """
+        retention = _VERSION_RETENTION if retention is None else retention
+        report: dict[str, dict] = {}
+        for name in MEMORY_TABLES:
+            if not self._has_table(name):
+                continue
+            table = self._open_table(name)
+            before = table.stats()["fragment_stats"]["num_fragments"]
+            versions_before = len(table.list_versions())
+            converted = convert_vectors and self._convert_vectors(name)
+            if converted:
+                table = self._open_table(name)
+            table.optimize(cleanup_older_than=retention)
+            self._ensure_indexes(name)
+            report[name] = {
+                "rows": table.count_rows(),
+                "fragments_before": before,
+                "fragments_after": table.stats()["fragment_stats"]["num_fragments"],
+                "versions_before": versions_before,
+                "versions_after": len(table.list_versions()),
+                "vectors_converted": converted,
+            }
+        from wren.memory.embedding_cache import (  # noqa: PLC0415
+            CACHE_DIR,
+            EmbeddingCache,
+        )
+
+        if include_cache and (self._path / CACHE_DIR).is_dir():
+            cache = EmbeddingCache(
+                self._path / CACHE_DIR, embedding_model_key(self._model_name)
+            )
+            stats = cache.optimize(retention=retention)
+            if stats is not None:
+                report[CACHE_DIR] = stats
+        return report
+
+    def _convert_vectors(self, name: str) -> bool:
+        """Rewrite table *name* with ``vector_dtype`` vectors if it differs.
+
+        The cast is exact for float16 → float32 and rounds the other way.
+        The rewrite holds the table's write lock, so stores and loads wait
+        for it instead of landing in the overwritten version. Overwriting
+        drops the table's indexes; the caller rebuilds them.
+        """
+        with self._write_lock(name):
+            table = self._open_table(name)
+            if "vector" not in table.schema.names:
+                return False
+            current = table.schema.field("vector").type
+            if not isinstance(current, pa.FixedSizeListType):
+                return False
+            target = _vector_type(current.list_size, self._vector_dtype)
+            if current == target:
+                return False
+            data = table.to_arrow()
+            column = data.schema.get_field_index("vector")
+            data = data.set_column(
+                column, pa.field("vector", target), data["vector"].cast(target)
+            )
+            self._create_table(name, data, schema=data.schema, mode="overwrite")
+        return True
+
     def reset(self) -> None:
         """Drop Wren memory tables."""
-        for name in (_SCHEMA_TABLE, _QUERY_TABLE):
-            if name in _table_names(self._db):
-                self._db.drop_table(name)
+        for name in MEMORY_TABLES:
+            if self._has_table(name):
+                self._drop_table(name)
+        self._clear_schema_state()
@@ -0,0 +1,323 @@
+"""Persisted inverted token index over ``knowledge/sql/*.md`` for the grep backend.
+
+:class:`~wren.memory.index_backend.GrepIndex` used to glob, YAML-parse and
+re-tokenize every markdown pair on each search. This index keeps, per file,
+the parsed pair and its token frequencies, plus token → posting lists, in
+``<project>/.wren/grep_index.json``:
+
+* a refresh ``stat``s the markdown files and re-parses only those whose
+  ``(mtime_ns, size)`` changed (new files are parsed, deleted ones dropped),
+* ranking is BM25 over the posting lists of the query tokens, so only pairs
+  sharing a token with the query are ever scored.
+
+Stat-ing every file on every search would dominate a warm lookup on large
+projects, so a search only stats the ``knowledge/sql/`` directory itself: a
+full per-file scan runs when the directory changed (a file was added,
+removed or renamed), when :func:`~wren.memory.markdown.write_query_markdown`
+wrote in this process, or at most every ``rescan_interval`` seconds to catch
+external in-place edits.
+
+Dependency-free like :mod:`wren.memory.markdown`. The JSON file is a derived
+cache under the gitignored ``.wren/`` runtime directory; deleting or
+corrupting it only costs one full parse. Instances are shared per project
+within a process (:func:`get_token_index`), so a long-lived server answers
+repeated recalls from memory.
+
+The same file doubles as the packed form of ``knowledge/sql/``:
+:func:`~wren.memory.markdown.load_query_pairs` and slug-collision resolution
+read pairs from it (after a forced stat scan) instead of parsing every file.
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+
+from wren.memory import markdown
+from wren.memory.markdown import knowledge_sql_dir, load_query_pair
+
+INDEX_FILE = "grep_index.json"
+_INDEX_VERSION = 1
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# BM25 parameters (Robertson/Zaragoza defaults).
+_K1 = 1.2
+_B = 0.75
+# Added to pairs whose NL contains the whole query, so they rank first.
+SUBSTRING_BOOST = 100.0
+# Seconds between full per-file stat scans when nothing else signals a change.
+RESCAN_INTERVAL = 1.0
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-cased alphanumeric tokens of at least two characters."""
+    return [t for t in _TOKEN_RE.findall((text or "").lower()) if len(t) >= 2]
+
+
+def _pair_from_markdown(md: Path, project_path: Path) -> dict | None:
+    """Shape one markdown file like :func:`~wren.memory.markdown.load_query_pairs`."""
+    pair = load_query_pair(md, project_path)
+    if pair is None:
+        return None
+    # Frontmatter may hold YAML-only values; keep the cached copy JSON-safe.
+    return json.loads(json.dumps(pair, default=str))
+
+
+class TokenIndex:
+    """BM25 inverted index over one project's ``knowledge/sql/`` pairs."""
+
+    def __init__(self, project_path: Path, *, rescan_interval: float = RESCAN_INTERVAL):
+        self.project_path = project_path
+        self.path = project_path / ".wren" / INDEX_FILE
+        self.rescan_interval = rescan_interval
+        self._lock = threading.Lock()
+        self._loaded = False
+        # rel path → {"mtime_ns", "size", "pair" | None, "tf", "len"}
+        self._files: dict[str, dict] = {}
+        self._docs: list[str] = []
+        self._postings: dict[str, list[list[int]]] = {}
+        self._avg_len = 0.0
+        # Derived per doc id, never persisted.
+        self._pairs: list[dict] = []
+        self._nl_lower: list[str] = []
+        self._norms: list[float] = []
+        self._nl_rank: list[int] = []
+        # rel path → (mtime_ns, size) of the last full scan.
+        self._stats: dict[str, tuple[int, int]] = {}
+        self._dir_stat: tuple[int, int] | None = None
+        self._write_count = -1
+        self._scanned_at = 0.0
+
+    # ── Freshness ─────────────────────────────────────────────────────────
+
+    def _dir_signature(self) -> tuple[int, int] | None:
+        try:
+            st = os.stat(knowledge_sql_dir(self.project_path))
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_ino)
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        sql_dir = knowledge_sql_dir(self.project_path)
+        try:
+            entries = list(os.scandir(sql_dir))
+        except OSError:
+            return {}
+        prefix = sql_dir.relative_to(self.project_path).as_posix()
+        stats: dict[str, tuple[int, int]] = {}
+        for entry in entries:
+            if entry.name.endswith(".md") and entry.is_file():
+                st = entry.stat()
+                stats[f"{prefix}/{entry.name}"] = (st.st_mtime_ns, st.st_size)
+        return stats
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._loaded
+            and self._write_count == markdown._write_count
+            and time.monotonic() - self._scanned_at < self.rescan_interval
+            and self._dir_signature() == self._dir_stat
+        )
+
+    def refresh(self, *, force: bool = False) -> int:
+        """Bring the index up to date with the markdown files.
+
+        Skips the per-file scan while nothing signals a change (see the module
+        docstring); *force* always scans. Returns the number of files that had
+        to be (re)parsed.
+        """
+        with self._lock:
+            if not force and self._is_fresh():
+                return 0
+            if not self._loaded:
+                self._load()
+                self._loaded = True
+            self._write_count = markdown._write_count
+            self._dir_stat = self._dir_signature()
+            stats = self._scan()
+            self._scanned_at = time.monotonic()
+            if stats == self._stats:
+                return 0
+            parsed = 0
+            files: dict[str, dict] = {}
+            for rel, sig in stats.items():
+                entry = self._files.get(rel)
+                if entry is None or (entry["mtime_ns"], entry["size"]) != sig:
+                    entry = self._parse(rel, *sig)
+                    parsed += 1
+                files[rel] = entry
+            changed = parsed or files.keys() != self._files.keys()
+            self._files = files
+            self._stats = stats
+            if changed:
+                self._rebuild_postings()
+                self._save()
+            return parsed
+
+    def _parse(self, rel: str, mtime_ns: int, size: int) -> dict:
+        try:
+            pair = _pair_from_markdown(self.project_path / rel, self.project_path)
+        except (OSError, UnicodeDecodeError):
+            pair = None
+        tf: dict[str, int] = {}
+        if pair is not None:
+            tf = dict(Counter(tokenize(pair["nl"]) + tokenize(pair["sql"])))
+        return {
+            "mtime_ns": mtime_ns,
+            "size": size,
+            "pair": pair,
+            "tf": tf,
+            "len": sum(tf.values()),
+        }
+
+    def _rebuild_postings(self) -> None:
+        # Sorted like load_query_pairs() so ties break the same way.
+        self._docs = sorted(r for r, e in self._files.items() if e["pair"] is not None)
+        postings: dict[str, list[list[int]]] = {}
+        total = 0
+        for doc_id, rel in enumerate(self._docs):
+            entry = self._files[rel]
+            total += entry["len"]
+            for token, count in entry["tf"].items():
+                postings.setdefault(token, []).append([doc_id, count])
+        self._postings = postings
+        self._avg_len = total / len(self._docs) if self._docs else 0.0
+        self._derive()
+
+    def _derive(self) -> None:
+        """Per-doc lookups for :meth:`search`: pair, lower-cased NL, BM25 length
+        norm, and position in NL order (the tie-break)."""
+        entries = [self._files[rel] for rel in self._docs]
+        avg = self._avg_len or 1.0
+        self._pairs = [e["pair"] for e in entries]
+        self._nl_lower = [p["nl"].lower() for p in self._pairs]
+        self._norms = [_K1 * (1.0 - _B + _B * e["len"] / avg) for e in entries]
+        by_nl = sorted(range(len(self._pairs)), key=lambda i: self._pairs[i]["nl"])
+        self._nl_rank = [0] * len(by_nl)
+        for rank, doc_id in enumerate(by_nl):
+            self._nl_rank[doc_id] = rank
+
+    # ── Persistence ───────────────────────────────────────────────────────
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("version") != _INDEX_VERSION:
+            return
+        files, docs = data.get("files"), data.get("docs")
+        postings = data.get("postings")
+        if not (
+            isinstance(files, dict)
+            and isinstance(docs, list)
+            and isinstance(postings, dict)
+        ):
+            return
+        self._files = files
+        self._docs = docs
+        self._postings = postings
+        self._avg_len = float(data.get("avg_len") or 0.0)
+        self._stats = {rel: (e["mtime_ns"], e["size"]) for rel, e in files.items()}
+        self._derive()
+
+    def _save(self) -> None:
+        payload = {
+            "version": _INDEX_VERSION,
+            "files": self._files,
+            "docs": self._docs,
+            "postings": self._postings,
+            "avg_len": self._avg_len,
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            tmp.write_text(
+                json.dumps(payload, ensure_ascii=False, separators=(",", ":")),
+                encoding="utf-8",
+            )
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # read-only project: the in-memory index still works
+
+    # ── Queries ───────────────────────────────────────────────────────────
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._docs)
+
+    def pairs(self, *, force: bool = False) -> list[dict]:
+        """Return every indexed pair (copies), in path order.
+
+        *force* stats every file first (see :meth:`refresh`).
+        """
+        self.refresh(force=force)
+        with self._lock:
+            return [dict(pair) for pair in self._pairs]
+
+    def nls(self, *, force: bool = False) -> dict[str, str]:
+        """Map each parseable file's project-relative path to its NL."""
+        self.refresh(force=force)
+        with self._lock:
+            return {
+                rel: entry["pair"]["nl"]
+                for rel, entry in self._files.items()
+                if entry["pair"] is not None
+            }
+
+    def search(
+        self, query: str, *, limit: int = 3, datasource: str | None = None
+    ) -> list[tuple[float, dict]]:
+        """Return up to *limit* ``(score, pair)`` tuples, best first.
+
+        Pairs score by BM25 over the query tokens; a pair whose NL contains
+        the whole query gets :data:`SUBSTRING_BOOST` on top.
+        """
+        self.refresh()
+        with self._lock:
+            n_docs = len(self._docs)
+            if not n_docs:
+                return []
+            scores: dict[int, float] = {}
+            norms = self._norms
+            for token in set(tokenize(query)):
+                posting = self._postings.get(token)
+                if not posting:
+                    continue
+                df = len(posting)
+                idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+                for doc_id, tf in posting:
+                    weight = idf * tf * (_K1 + 1.0) / (tf + norms[doc_id])
+                    scores[doc_id] = scores.get(doc_id, 0.0) + weight
+
+            q_lower = query.strip().lower()
+            # Token-less queries (e.g. one character) can only match by substring.
+            candidates = scores if scores else range(n_docs) if q_lower else ()
+            pairs, nl_lower, nl_rank = self._pairs, self._nl_lower, self._nl_rank
+            ranked: list[tuple[float, int, int]] = []
+            for doc_id in candidates:
+                if datasource and pairs[doc_id].get("datasource") != datasource:
+                    continue
+                score = scores.get(doc_id, 0.0)
+                if q_lower and q_lower in nl_lower[doc_id]:
+                    score += SUBSTRING_BOOST
+                if score > 0:
+                    ranked.append((-score, nl_rank[doc_id], doc_id))
+            # Highest score first; stable tie-break by NL for determinism.
+            top = heapq.nsmallest(limit, ranked)
+            return [(-neg, dict(pairs[doc_id])) for neg, _, doc_id in top]
+
+
+@lru_cache(maxsize=8)
+def get_token_index(project_path: Path) -> TokenIndex:
+    """Return the process-wide :class:`TokenIndex` for *project_path*."""
+    return TokenIndex(project_path)
@@ -1,4 +1,4 @@
-"""Polling watch loop that auto-reindexes memory when project sources change.
+"""Watch loop that auto-reindexes memory when project sources change.
 
 The semantic memory index (``wren memory index``) is a derived artifact built
 from a project's source of truth:
@@ -7,9 +7,19 @@ from a project's source of truth:
 * the NL→SQL pairs under ``knowledge/sql/*.md``.
 
 During active modelling these sources change often, and a stale index silently
-returns wrong schema context to the LLM. ``wren memory watch`` closes that loop:
-it polls the watched sources on an interval, and whenever their content
-fingerprint changes it triggers a reindex.
+returns wrong schema context to the LLM. ``wren memory watch`` closes that loop.
+
+:func:`watch_changes` drives it. By default it sleeps on inotify events for
+the watched directories (:class:`InotifyWaiter`); where inotify is not
+available (non-Linux, or no free inotify instance) — or with ``--poll`` — it
+falls back to waking every interval. Either way it then diffs a per-file stat
+snapshot against the last applied one and hands the classified
+:class:`ChangeSet` (the MDL, or specific ``knowledge/sql/*.md`` files) to a
+callback that runs only the matching partial reindex. Bursts of events are
+debounced into one diff.
+
+:func:`watch_loop` / :func:`poll_once` are the original fingerprint-only
+polling loop, for callers whose reindex is all-or-nothing.
 
 The change-detection logic lives here, decoupled from the CLI and from the
 optional ``memory`` extra, so it is fully unit-testable with only the standard
@@ -18,7 +28,12 @@ library. The CLI (:mod:`wren.memory.cli`) supplies the reindex callback.
 
 from __future__ import annotations
 
+import ctypes
+import ctypes.util
 import hashlib
+import os
+import select
+import sys
 import time
 from collections.abc import Callable, Iterable
 from dataclasses import dataclass, field
@@ -32,6 +47,30 @@ _KNOWLEDGE_SQL_REL = ("knowledge", "sql")
 
 # Guard against pathological tight loops while still allowing snappy local use.
 MIN_INTERVAL_SECONDS = 1.0
+# Quiet period that ends a burst of file events (an editor save, a git pull).
+DEBOUNCE_SECONDS = 0.2
+# A burst that never goes quiet is still applied after this long.
+MAX_DEBOUNCE_SECONDS = 2.0
+
+# inotify(7) event masks.
+_IN_MODIFY = 0x002
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_DELETE_SELF = 0x400
+_IN_MOVE_SELF = 0x800
+_WATCH_MASK = (
+    _IN_MODIFY
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_MOVE_SELF
+)
 
 
 def _iter_watched_files(project_path: Path) -> list[Path]:
@@ -86,6 +125,53 @@ def compute_fingerprint(
     return hasher.hexdigest()
 
 
+Snapshot = dict[str, tuple[int, int]]
+
+
+def take_snapshot(project_path: Path) -> Snapshot:
+    """Map each watched file's project-relative POSIX path to ``(size, mtime_ns)``."""
+    snapshot: Snapshot = {}
+    for path in _iter_watched_files(project_path):
+        try:
+            stat = path.stat()
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            continue
+        rel = path.relative_to(project_path).as_posix()
+        snapshot[rel] = (stat.st_size, stat.st_mtime_ns)
+    return snapshot
+
+
+@dataclass(frozen=True)
+class ChangeSet:
+    """What changed between two snapshots.
+
+    ``mdl`` is True when ``target/mdl.json`` was added, edited or removed;
+    ``changed`` / ``removed`` list project-relative ``knowledge/sql/*.md``
+    paths that were added or edited / deleted.
+    """
+
+    mdl: bool = False
+    changed: tuple[str, ...] = ()
+    removed: tuple[str, ...] = ()
+
+    def __bool__(self) -> bool:
+        return self.mdl or bool(self.changed) or bool(self.removed)
+
+
+def diff_snapshots(old: Snapshot, new: Snapshot) -> ChangeSet:
+    """Classify the difference between two :func:`take_snapshot` results."""
+    mdl_rel = "/".join(_DEFAULT_MDL_REL)
+    changed = sorted(
+        rel for rel, sig in new.items() if rel != mdl_rel and old.get(rel) != sig
+    )
+    removed = sorted(rel for rel in old if rel != mdl_rel and rel not in new)
+    return ChangeSet(
+        mdl=old.get(mdl_rel) != new.get(mdl_rel),
+        changed=tuple(changed),
+        removed=tuple(removed),
+    )
+
+
 @dataclass
 class WatchState:
     """Mutable bookkeeping for a running (or simulated) watch loop."""
@@ -96,6 +182,8 @@ class WatchState:
     errors: int = 0
     last_change_poll: int = 0
     history: list[str] = field(default_factory=list)
+    snapshot: Snapshot = field(default_factory=dict)
+    mode: str = "poll"
 
 
 def poll_once(
@@ -188,3 +276,192 @@ def watch_loop(
         if on_event is not None:
             on_event("stopped")
     return state
+
+
+# ── Event-driven watching ────────────────────────────────────────────────
+
+
+def _load_libc():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        libc.inotify_init1  # noqa: B018 — probe the symbol (musl/glibc)
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+def inotify_available() -> bool:
+    """True when the platform exposes inotify (Linux)."""
+    return _load_libc() is not None
+
+
+class InotifyWaiter:
+    """Block until a watched directory reports a file event.
+
+    Watches the project root, ``target/``, ``knowledge/`` and
+    ``knowledge/sql/`` — the parents cover a directory created after the
+    watcher started. Events are only a wake-up signal; the caller diffs
+    snapshots to learn what actually changed, so dropped or coalesced events
+    cannot desynchronize it.
+    """
+
+    def __init__(self, project_path: Path):
+        libc = _load_libc()
+        if libc is None:
+            raise OSError("inotify is not available on this platform")
+        self._libc = libc
+        self.project_path = project_path
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self._arm()
+
+    def _arm(self) -> None:
+        """(Re-)add watches for the directories that exist now; idempotent."""
+        for rel in (
+            (),
+            _DEFAULT_MDL_REL[:1],
+            _KNOWLEDGE_SQL_REL[:1],
+            _KNOWLEDGE_SQL_REL,
+        ):
+            path = self.project_path.joinpath(*rel)
+            if path.is_dir():
+                self._libc.inotify_add_watch(
+                    self._fd, os.fsencode(path), ctypes.c_uint32(_WATCH_MASK)
+                )
+
+    def wait(self, timeout: float) -> bool:
+        """Wait up to *timeout* seconds; True if any event arrived (drained)."""
+        ready, _, _ = select.select([self._fd], [], [], max(timeout, 0.0))
+        if not ready:
+            return False
+        while True:
+            try:
+                if not os.read(self._fd, 65536):
+                    break
+            except BlockingIOError:
+                break
+        self._arm()
+        return True
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def poll_changes(
+    project_path: Path,
+    state: WatchState,
+    apply: Callable[[ChangeSet], object],
+    *,
+    on_event: Callable[[str], None] | None = None,
+) -> ChangeSet | None:
+    """Diff the sources against ``state.snapshot`` and apply any changes.
+
+    Returns the applied :class:`ChangeSet`, or None when nothing changed. Like
+    :func:`poll_once`, a failing *apply* keeps the old snapshot, so the same
+    changes are retried on the next check.
+    """
+    state.polls += 1
+    current = take_snapshot(project_path)
+    changes = diff_snapshots(state.snapshot, current)
+    if not changes:
+        return None
+
+    if on_event is not None:
+        on_event("change-detected")
+    try:
+        apply(changes)
+    except Exception:  # noqa: BLE001 — surface count, keep change pending for retry
+        state.errors += 1
+        if on_event is not None:
+            on_event("reindex-error")
+        raise
+    state.snapshot = current
+    state.fingerprint = compute_fingerprint(project_path)
+    state.reindexes += 1
+    state.last_change_poll = state.polls
+    state.history.append(state.fingerprint)
+    if on_event is not None:
+        on_event("reindexed")
+    return changes
+
+
+def watch_changes(
+    project_path: Path,
+    apply: Callable[[ChangeSet], object],
+    *,
+    interval: float = 5.0,
+    debounce: float = DEBOUNCE_SECONDS,
+    use_inotify: bool = True,
+    max_polls: int | None = None,
+    reindex_on_start: bool = False,
+    on_event: Callable[[str], None] | None = None,
+    sleep: Callable[[float], None] = time.sleep,
+) -> WatchState:
+    """Apply partial reindexes as project sources change, until interrupted.
+
+    Parameters
+    ----------
+    interval:
+        Polling period without inotify; with inotify, the longest wait
+        between checks (so a failed reindex is still retried). Clamped to
+        :data:`MIN_INTERVAL_SECONDS`.
+    debounce:
+        After an event, keep draining events until none arrive for this
+        long (at most :data:`MAX_DEBOUNCE_SECONDS`), then diff once.
+    use_inotify:
+        Use :class:`InotifyWaiter` when available; False forces polling.
+    max_polls:
+        Stop after this many checks. ``None`` runs until ``KeyboardInterrupt``.
+    reindex_on_start:
+        Treat every existing source as changed on the first check.
+    sleep:
+        Injectable sleep for the polling mode.
+    """
+    interval = max(float(interval), MIN_INTERVAL_SECONDS)
+    waiter: InotifyWaiter | None = None
+    if use_inotify and inotify_available():
+        try:
+            waiter = InotifyWaiter(project_path)
+        except OSError:  # e.g. fs.inotify.max_user_instances exhausted
+            waiter = None
+    state = WatchState(
+        fingerprint="" if reindex_on_start else compute_fingerprint(project_path),
+        snapshot={} if reindex_on_start else take_snapshot(project_path),
+        mode="inotify" if waiter is not None else "poll",
+    )
+
+    def _wait() -> None:
+        if waiter is None:
+            sleep(interval)
+            return
+        if not waiter.wait(interval):
+            return
+        deadline = time.monotonic() + MAX_DEBOUNCE_SECONDS
+        while time.monotonic() < deadline and waiter.wait(debounce):
+            pass
+
+    try:
+        if not reindex_on_start:
+            _wait()
+        while True:
+            try:
+                poll_changes(project_path, state, apply, on_event=on_event)
+            except Exception:
+                if on_event is not None:
+                    on_event("error")
+            if max_polls is not None and state.polls >= max_polls:
+                break
+            _wait()
+    except KeyboardInterrupt:
+        if on_event is not None:
+            on_event("stopped")
+    finally:
+        if waiter is not None:
+            waiter.close()
+    return state
@@ -21,6 +21,33 @@ serve_app = typer.Typer(
 _SOURCE_FILES = ("wren_project.yml", "relationships.yml")
 _SOURCE_DIRS = ("models", "views", "cubes")
 
+# Carries the serve options from the `wren serve mcp --workers N` supervisor
+# to its worker processes, which uvicorn starts from an import string and
+# cannot hand arguments to. Secrets never go here: workers re-resolve the
+# profile by name.
+_WORKER_SPEC_ENV = "WREN_SERVE_WORKER_SPEC"
+
+
+def _tree_newer_than(root: Path, mtime: float) -> bool:
+    """Return True if any file under ``root`` has an mtime after ``mtime``.
+
+    Walks with ``os.scandir`` so directory entries cost no extra ``stat`` for
+    their type, and stops at the first newer file.
+    """
+    stack = [root]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(Path(entry.path))
+                elif entry.is_file() and entry.stat().st_mtime > mtime:
+                    return True
+    return False
+
 
 def _mdl_is_stale(project: Path, mdl_path: Path) -> bool:
     """Return True if any project source file is newer than mdl_path."""
@@ -31,15 +58,7 @@ def _mdl_is_stale(project: Path, mdl_path: Path) -> bool:
         if f.exists() and f.stat().st_mtime > mdl_mtime:
             return True
 
-    for dirname in _SOURCE_DIRS:
-        d = project / dirname
-        if not d.is_dir():
-            continue
-        for f in d.rglob("*"):
-            if f.is_file() and f.stat().st_mtime > mdl_mtime:
-                return True
-
-    return False
+    return any(_tree_newer_than(project / d, mdl_mtime) for d in _SOURCE_DIRS)
 
 
 def _serve_args(
@@ -118,6 +137,127 @@ def _print_connection_help(
     echo(line)
 
 
+def _profile_connection_info(profile: str | None) -> str | None:
+    """Resolve ``--profile`` into a connection-info JSON string, or None."""
+    if profile is None:
+        return None
+
+    from wren.profile import (  # noqa: PLC0415
+        MissingSecretError,
+        expand_profile_secrets,
+        list_profiles,
+    )
+
+    profiles = list_profiles()
+    if profile not in profiles:
+        typer.echo(f"Error: profile '{profile}' not found.", err=True)
+        raise typer.Exit(1)
+    prof_dict = dict(profiles[profile])
+    ds = prof_dict.pop("datasource", None)
+    if ds is None:
+        typer.echo(f"Error: profile '{profile}' has no datasource.", err=True)
+        raise typer.Exit(1)
+    try:
+        prof_dict = expand_profile_secrets(prof_dict)
+    except MissingSecretError as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(1)
+    return json.dumps({"datasource": ds, **prof_dict})
+
+
+def _parse_tool_limits(specs: list[str]) -> dict[str, int]:
+    """Parse repeated ``--tool-limit NAME=N`` options into overrides."""
+    limits: dict[str, int] = {}
+    for spec in specs:
+        name, sep, value = spec.partition("=")
+        try:
+            limit = int(value)
+        except ValueError:
+            limit = 0
+        if not sep or not name.strip() or limit < 1:
+            typer.echo(
+                f"Error: invalid --tool-limit '{spec}'. Expected NAME=N with N >= 1.",
+                err=True,
+            )
+            raise typer.Exit(1)
+        limits[name.strip()] = limit
+    return limits
+
+
+def _build_serve_context(
+    project_path: Path,
+    connection_info: str | None,
+    *,
+    allow_write: bool,
+    no_connect: bool,
+    threads: int,
+    tool_limits: dict[str, int],
+    queue_size: int,
+    session_rate: float,
+):
+    """Build the engine pool and ServeContext for one serving process."""
+    from wren.cli import _build_engine  # noqa: PLC0415
+    from wren.mcp_server import DEFAULT_TOOL_LIMITS, ServeContext  # noqa: PLC0415
+
+    engine = _build_engine(
+        str(project_path / "target" / "mdl.json"),
+        connection_info,
+        None,
+        conn_required=not no_connect,
+    )
+    ctx = ServeContext(
+        project=project_path,
+        engine=engine,
+        allow_write=allow_write,
+        no_connect=no_connect,
+        threads=threads,
+        tool_limits={**DEFAULT_TOOL_LIMITS, **tool_limits},
+        queue_size=queue_size,
+        session_rate=session_rate,
+        # One engine (and connector) per concurrently running handler.
+        engine_factory=engine.clone if hasattr(engine, "clone") else None,
+    )
+    atexit.register(ctx.close)
+    return ctx
+
+
+def _start_memory_maintenance(project_path: Path, interval: float) -> None:
+    """Compact the memory index and prune old versions every *interval* seconds.
+
+    Runs in the process that owns the listening socket — the ``--workers``
+    supervisor, not each worker — so one thread maintains the store.
+    """
+    from wren.memory.maintenance import MemoryMaintenance  # noqa: PLC0415
+    from wren.memory.service import shared_memory_dir  # noqa: PLC0415
+
+    maintenance = MemoryMaintenance(
+        shared_memory_dir() or project_path / ".wren" / "memory", interval
+    )
+    maintenance.start()
+    atexit.register(maintenance.stop)
+
+
+def _http_worker_app():
+    """uvicorn app factory for one ``--workers`` worker process."""
+    from wren.mcp_server import build_http_app  # noqa: PLC0415
+
+    spec = json.loads(os.environ[_WORKER_SPEC_ENV])
+    project_path = Path(spec["project"])
+    ctx = _build_serve_context(
+        project_path,
+        _profile_connection_info(spec["profile"]),
+        allow_write=spec["allow_write"],
+        no_connect=spec["no_connect"],
+        threads=spec["threads"],
+        tool_limits=spec["tool_limits"],
+        queue_size=spec["queue_size"],
+        session_rate=spec["session_rate"],
+    )
+    return build_http_app(
+        ctx, host=spec["host"], port=spec["port"], stateless_http=True
+    )
+
+
 @serve_app.command("mcp")
 def serve_mcp(
     transport: Annotated[
@@ -157,6 +297,63 @@ def serve_mcp(
             help="Suppress the client-registration help banner.",
         ),
     ] = False,
+    workers: Annotated[
+        int,
+        typer.Option(
+            "--workers",
+            min=1,
+            help="Worker processes for --transport http (>1 implies stateless).",
+        ),
+    ] = 1,
+    threads: Annotated[
+        int,
+        typer.Option(
+            "--threads",
+            min=1,
+            help="Max concurrent tool calls per process (worker-thread pool).",
+        ),
+    ] = 8,
+    drain_timeout: Annotated[
+        float,
+        typer.Option(
+            "--drain-timeout",
+            min=0,
+            help="Seconds to let in-flight HTTP requests finish on shutdown.",
+        ),
+    ] = 30.0,
+    tool_limit: Annotated[
+        Optional[list[str]],
+        typer.Option(
+            "--tool-limit",
+            help="Per-tool concurrency limit as NAME=N (repeatable), e.g. "
+            "run_sql=2. run_sql, query_cube and dry_run default to 4.",
+        ),
+    ] = None,
+    queue_size: Annotated[
+        int,
+        typer.Option(
+            "--queue-size",
+            min=0,
+            help="Calls that may wait per limited tool before 'busy' rejection.",
+        ),
+    ] = 16,
+    session_rate: Annotated[
+        float,
+        typer.Option(
+            "--session-rate",
+            min=0,
+            help="Max tool calls per second per MCP session (0 = unlimited).",
+        ),
+    ] = 0.0,
+    maintain_memory: Annotated[
+        float,
+        typer.Option(
+            "--maintain-memory",
+            min=0,
+            help="Compact the memory index and prune old versions every N "
+            "seconds in a background thread (0 = off).",
+        ),
+    ] = 0.0,
 ) -> None:
     """Serve wren's query + context/knowledge tools as an MCP server.
 
@@ -168,6 +365,10 @@ def serve_mcp(
             err=True,
         )
         raise typer.Exit(1)
+    if workers > 1 and transport != "http":
+        typer.echo("Error: --workers requires --transport http.", err=True)
+        raise typer.Exit(1)
+    tool_limits = _parse_tool_limits(tool_limit or [])
 
     try:
         import mcp  # noqa: F401, PLC0415
@@ -180,7 +381,6 @@ def serve_mcp(
 
     from loguru import logger  # noqa: PLC0415
 
-    from wren.cli import _build_engine  # noqa: PLC0415
     from wren.context import discover_project_path  # noqa: PLC0415
 
     try:
@@ -206,45 +406,65 @@ def serve_mcp(
             "MDL may be stale — re-run `wren context build`",
         )
 
-    connection_info = None
-    if profile is not None:
-        import json  # noqa: PLC0415
-
-        from wren.profile import (  # noqa: PLC0415
-            MissingSecretError,
-            expand_profile_secrets,
-            list_profiles,
+    if maintain_memory > 0:
+        _start_memory_maintenance(project_path, maintain_memory)
+
+    if workers > 1:
+        # Fail fast on a bad profile before forking the workers.
+        _profile_connection_info(profile)
+        if not quiet:
+            _print_connection_help(
+                transport=transport,
+                host=host,
+                port=port,
+                project=project_path,
+                profile=profile,
+                allow_write=allow_write,
+                no_connect=no_connect,
+            )
+        import uvicorn  # noqa: PLC0415
+
+        os.environ[_WORKER_SPEC_ENV] = json.dumps(
+            {
+                "project": str(project_path),
+                "profile": profile,
+                "allow_write": allow_write,
+                "no_connect": no_connect,
+                "threads": threads,
+                "tool_limits": tool_limits,
+                "queue_size": queue_size,
+                "session_rate": session_rate,
+                "host": host,
+                "port": port,
+            }
         )
+        logger.info(
+            f"Serving wren MCP over streamable-http at {host}:{port} "
+            f"with {workers} workers"
+        )
+        uvicorn.run(
+            "wren.serve_cli:_http_worker_app",
+            factory=True,
+            host=host,
+            port=port,
+            workers=workers,
+            timeout_graceful_shutdown=drain_timeout,
+        )
+        return
 
-        profiles = list_profiles()
-        if profile not in profiles:
-            typer.echo(f"Error: profile '{profile}' not found.", err=True)
-            raise typer.Exit(1)
-        prof_dict = dict(profiles[profile])
-        ds = prof_dict.pop("datasource", None)
-        if ds is None:
-            typer.echo(f"Error: profile '{profile}' has no datasource.", err=True)
-            raise typer.Exit(1)
-        try:
-            prof_dict = expand_profile_secrets(prof_dict)
-        except MissingSecretError as e:
-            typer.echo(f"Error: {e}", err=True)
-            raise typer.Exit(1)
-        connection_info = json.dumps({"datasource": ds, **prof_dict})
-
-    engine = _build_engine(
-        str(mdl_path), connection_info, None, conn_required=not no_connect
-    )
-    atexit.register(lambda: engine.close() if hasattr(engine, "close") else None)
-
-    from wren.mcp_server import ServeContext, run_server  # noqa: PLC0415
-
-    ctx = ServeContext(
-        project=project_path,
-        engine=engine,
+    ctx = _build_serve_context(
+        project_path,
+        _profile_connection_info(profile),
         allow_write=allow_write,
         no_connect=no_connect,
+        threads=threads,
+        tool_limits=tool_limits,
+        queue_size=queue_size,
+        session_rate=session_rate,
     )
+
+    from wren.mcp_server import run_server  # noqa: PLC0415
+
     if not quiet:
         _print_connection_help(
             transport=transport,
@@ -255,4 +475,10 @@ def serve_mcp(
             allow_write=allow_write,
             no_connect=no_connect,
         )
-    run_server(ctx, transport=transport, host=host, port=port)
+    run_server(
+        ctx,
+        transport=transport,
+        host=host,
+        port=port,
+        drain_timeout=drain_timeout,
+    )
@@ -0,0 +1,356 @@
+"""Runtime bookkeeping for ``wren serve`` — load metrics and admission control.
+
+The MCP server (:mod:`wren.mcp_server`) runs blocking tool handlers on a
+bounded worker-thread pool. This module records what that pool is doing so
+the HTTP transport can expose it on ``/metrics``:
+
+* **in-flight** — tool calls currently executing on a worker thread,
+* **queue depth** — tool calls waiting for a free worker thread,
+* **latency** — a per-tool histogram of execution time (queue wait excluded),
+* **rejections** — calls turned away by admission control,
+* **coalescing** — identical concurrent calls answered by one execution
+  (see :class:`SingleFlight`).
+
+It also holds the pieces of admission control that do not depend on the
+event loop: the :class:`ToolBusyError` returned to clients and the per-session
+:class:`SessionRateLimiter`.
+
+Kept free of the ``mcp`` SDK and starlette so it is importable and
+unit-testable with only the standard library, like :mod:`wren.memory.watch`;
+:class:`SingleFlight` imports anyio only when a call is awaited.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+import weakref
+from collections.abc import Awaitable, Callable, Hashable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+# Histogram upper bounds in seconds. Metadata tools land in the first few
+# buckets; warehouse queries spread across the tail.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+@dataclass
+class _ToolStats:
+    calls: int = 0
+    errors: int = 0
+    queued: int = 0
+    in_flight: int = 0
+    rejected: dict[str, int] = field(default_factory=dict)
+    flights: int = 0
+    coalesced: int = 0
+    latency_sum: float = 0.0
+    bucket_counts: list[int] = field(
+        default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1)
+    )
+
+
+class ToolMetrics:
+    """Thread-safe counters for tool calls served by one process.
+
+    Call :meth:`enqueue` when a call starts waiting for a worker thread, then
+    wrap the handler execution in :meth:`track` on that worker thread. Every
+    enqueued call must be followed by exactly one :meth:`track` or
+    :meth:`dequeue`, otherwise the queue depth drifts.
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tools: dict[str, _ToolStats] = {}
+
+    def _stats(self, tool: str) -> _ToolStats:
+        stats = self._tools.get(tool)
+        if stats is None:
+            stats = self._tools[tool] = _ToolStats()
+        return stats
+
+    def enqueue(self, tool: str) -> None:
+        """Record a call waiting for a worker thread."""
+        with self._lock:
+            self._stats(tool).queued += 1
+
+    def dequeue(self, tool: str) -> None:
+        """Drop a queued call that never reached a worker (e.g. cancelled)."""
+        with self._lock:
+            self._stats(tool).queued -= 1
+
+    def queued(self, tool: str) -> int:
+        """Return how many calls to ``tool`` are waiting for a worker thread."""
+        with self._lock:
+            stats = self._tools.get(tool)
+            return stats.queued if stats is not None else 0
+
+    def mean_latency(self, tool: str) -> float | None:
+        """Return the mean execution time of ``tool``, or None before any call."""
+        with self._lock:
+            stats = self._tools.get(tool)
+            if stats is None or not stats.calls:
+                return None
+            return stats.latency_sum / stats.calls
+
+    def reject(self, tool: str, reason: str) -> None:
+        """Record a call refused by admission control (``busy``/``rate_limited``)."""
+        with self._lock:
+            rejected = self._stats(tool).rejected
+            rejected[reason] = rejected.get(reason, 0) + 1
+
+    def record_flight(self, tool: str, *, coalesced: bool) -> None:
+        """Record a single-flight request that executed or joined another."""
+        with self._lock:
+            stats = self._stats(tool)
+            stats.flights += 1
+            stats.coalesced += int(coalesced)
+
+    @contextmanager
+    def track(self, tool: str) -> Iterator[None]:
+        """Move a queued call to in-flight and time it until it returns."""
+        with self._lock:
+            stats = self._stats(tool)
+            stats.queued -= 1
+            stats.in_flight += 1
+        start = self._clock()
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            elapsed = self._clock() - start
+            with self._lock:
+                stats.in_flight -= 1
+                stats.calls += 1
+                stats.errors += int(failed)
+                stats.latency_sum += elapsed
+                stats.bucket_counts[_bucket_index(elapsed)] += 1
+
+    def snapshot(self) -> dict:
+        """Return a JSON-friendly copy of the current counters."""
+        with self._lock:
+            tools = {
+                name: {
+                    "calls": s.calls,
+                    "errors": s.errors,
+                    "queued": s.queued,
+                    "in_flight": s.in_flight,
+                    "rejected": dict(s.rejected),
+                    "coalesced": s.coalesced,
+                    "coalescing_ratio": s.coalesced / s.flights if s.flights else 0.0,
+                    "latency_sum": s.latency_sum,
+                    "bucket_counts": list(s.bucket_counts),
+                }
+                for name, s in sorted(self._tools.items())
+            }
+        return {
+            "in_flight": sum(t["in_flight"] for t in tools.values()),
+            "queue_depth": sum(t["queued"] for t in tools.values()),
+            "tools": tools,
+        }
+
+    def render_prometheus(self) -> str:
+        """Render the counters in the Prometheus text exposition format."""
+        snap = self.snapshot()
+        lines = [
+            "# HELP wren_mcp_in_flight Tool calls currently executing.",
+            "# TYPE wren_mcp_in_flight gauge",
+            f"wren_mcp_in_flight {snap['in_flight']}",
+            "# HELP wren_mcp_queue_depth Tool calls waiting for a worker thread.",
+            "# TYPE wren_mcp_queue_depth gauge",
+            f"wren_mcp_queue_depth {snap['queue_depth']}",
+            "# HELP wren_mcp_tool_in_flight Tool calls currently executing, by tool.",
+            "# TYPE wren_mcp_tool_in_flight gauge",
+        ]
+        tools = snap["tools"]
+        for name, t in tools.items():
+            lines.append(f'wren_mcp_tool_in_flight{{tool="{name}"}} {t["in_flight"]}')
+        lines += [
+            "# HELP wren_mcp_tool_queued Tool calls waiting for a worker, by tool.",
+            "# TYPE wren_mcp_tool_queued gauge",
+        ]
+        for name, t in tools.items():
+            lines.append(f'wren_mcp_tool_queued{{tool="{name}"}} {t["queued"]}')
+        lines += [
+            "# HELP wren_mcp_tool_errors_total Tool calls that raised.",
+            "# TYPE wren_mcp_tool_errors_total counter",
+        ]
+        for name, t in tools.items():
+            lines.append(f'wren_mcp_tool_errors_total{{tool="{name}"}} {t["errors"]}')
+        lines += [
+            "# HELP wren_mcp_tool_rejected_total Tool calls refused by admission "
+            "control.",
+            "# TYPE wren_mcp_tool_rejected_total counter",
+        ]
+        for name, t in tools.items():
+            for reason, count in sorted(t["rejected"].items()):
+                lines.append(
+                    f'wren_mcp_tool_rejected_total{{tool="{name}",reason="{reason}"}} '
+                    f"{count}"
+                )
+        lines += [
+            "# HELP wren_mcp_tool_coalesced_total Calls answered by an identical "
+            "in-flight call.",
+            "# TYPE wren_mcp_tool_coalesced_total counter",
+        ]
+        for name, t in tools.items():
+            lines.append(
+                f'wren_mcp_tool_coalesced_total{{tool="{name}"}} {t["coalesced"]}'
+            )
+        lines += [
+            "# HELP wren_mcp_tool_coalescing_ratio Share of single-flight calls "
+            "that were coalesced.",
+            "# TYPE wren_mcp_tool_coalescing_ratio gauge",
+        ]
+        for name, t in tools.items():
+            lines.append(
+                f'wren_mcp_tool_coalescing_ratio{{tool="{name}"}} '
+                f"{t['coalescing_ratio']:.6f}"
+            )
+        lines += [
+            "# HELP wren_mcp_tool_latency_seconds Tool execution time.",
+            "# TYPE wren_mcp_tool_latency_seconds histogram",
+        ]
+        for name, t in tools.items():
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, t["bucket_counts"]):
+                cumulative += count
+                lines.append(
+                    f'wren_mcp_tool_latency_seconds_bucket{{tool="{name}",le="{bound:g}"}} '
+                    f"{cumulative}"
+                )
+            lines.append(
+                f'wren_mcp_tool_latency_seconds_bucket{{tool="{name}",le="+Inf"}} '
+                f"{t['calls']}"
+            )
+            lines.append(
+                f'wren_mcp_tool_latency_seconds_sum{{tool="{name}"}} '
+                f"{t['latency_sum']:.6f}"
+            )
+            lines.append(
+                f'wren_mcp_tool_latency_seconds_count{{tool="{name}"}} {t["calls"]}'
+            )
+        return "\n".join(lines) + "\n"
+
+
+def _bucket_index(elapsed: float) -> int:
+    for i, bound in enumerate(LATENCY_BUCKETS):
+        if elapsed <= bound:
+            return i
+    return len(LATENCY_BUCKETS)
+
+
+class ToolBusyError(RuntimeError):
+    """A tool call refused by admission control; the client should retry.
+
+    The message is a JSON object (``error``, ``tool``, ``reason``,
+    ``retry_after`` in seconds) so agents can parse the back-off hint out of
+    the MCP error text.
+    """
+
+    def __init__(self, tool: str, reason: str, retry_after: float):
+        self.tool = tool
+        self.reason = reason
+        self.retry_after = retry_after
+        super().__init__(
+            json.dumps(
+                {
+                    "error": "busy",
+                    "tool": tool,
+                    "reason": reason,
+                    "retry_after": round(retry_after, 3),
+                }
+            )
+        )
+
+
+class SessionRateLimiter:
+    """Token-bucket rate limit keyed by MCP session.
+
+    Each session may make ``burst`` calls at once and ``rate`` calls per
+    second sustained. Buckets are held weakly, so they disappear with the
+    session object.
+    """
+
+    def __init__(self, rate: float, burst: int, clock=time.monotonic):
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1.")
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._buckets: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def acquire(self, session: object) -> float:
+        """Take one token for ``session``.
+
+        Returns 0.0 when the call may proceed, otherwise the number of seconds
+        until a token is available (nothing is consumed in that case).
+        """
+        now = self._clock()
+        with self._lock:
+            tokens, last = self._buckets.get(session, (float(self.burst), now))
+            tokens = min(float(self.burst), tokens + (now - last) * self.rate)
+            if tokens >= 1.0:
+                self._buckets[session] = (tokens - 1.0, now)
+                return 0.0
+            self._buckets[session] = (tokens, now)
+            return (1.0 - tokens) / self.rate
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error", "cancelled")
+
+    def __init__(self, done):
+        self.done = done
+        self.result = None
+        self.error: BaseException | None = None
+        self.cancelled = False
+
+
+class SingleFlight:
+    """Collapse identical concurrent calls into one execution.
+
+    Runs on the event loop, before admission control: the first caller for
+    a key awaits ``fn``; callers arriving with the same key while it runs
+    wait on an event — holding no worker thread or limiter token — and share
+    its result (or exception). If the leader is cancelled, one waiter runs
+    ``fn`` itself. Nothing is cached — once the execution completes, the
+    next call for the key runs again.
+    """
+
+    def __init__(self, metrics: ToolMetrics | None = None):
+        self._metrics = metrics
+        self._flights: dict[tuple[str, Hashable], _Flight] = {}
+
+    async def do(self, tool: str, key: Hashable, fn: Callable[[], Awaitable]):
+        """Await ``fn`` once per in-flight ``(tool, key)`` and return its result."""
+        import anyio  # noqa: PLC0415
+
+        flight_key = (tool, key)
+        if self._metrics is not None:
+            self._metrics.record_flight(tool, coalesced=flight_key in self._flights)
+        while (flight := self._flights.get(flight_key)) is not None:
+            await flight.done.wait()
+            if not flight.cancelled:
+                if flight.error is not None:
+                    raise flight.error
+                return flight.result
+
+        flight = self._flights[flight_key] = _Flight(anyio.Event())
+        try:
+            flight.result = await fn()
+            return flight.result
+        except anyio.get_cancelled_exc_class():
+            flight.cancelled = True
+            raise
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            del self._flights[flight_key]
+            flight.done.set()
@@ -232,3 +232,42 @@ def translate_types_cmd(
     typer.echo(json.dumps(results, indent=2))
     if strict and _has_corrupt_skips(skipped):
         raise typer.Exit(1)
+
+
+@utils_app.command(name="list-functions")
+def list_functions_cmd(
+    datasource: Annotated[
+        str,
+        typer.Option("--datasource", "-d", help="Data source (e.g. postgres, duckdb)"),
+    ],
+    prefix: Annotated[
+        Optional[str], typer.Option("--prefix", help="Function name prefix")
+    ] = None,
+    keyword: Annotated[
+        Optional[str],
+        typer.Option("--keyword", "-k", help="Substring of name or description"),
+    ] = None,
+    function_type: Annotated[
+        Optional[str],
+        typer.Option("--type", "-t", help="scalar, aggregate, or window"),
+    ] = None,
+    function_path: Annotated[
+        Optional[str],
+        typer.Option("--function-path", help="CSV of custom function definitions"),
+    ] = None,
+):
+    """List SQL functions available for a data source as JSON. No DB required."""
+    from wren.mdl.function_catalog import get_function_catalog  # noqa: PLC0415
+    from wren.model.data_source import DataSource  # noqa: PLC0415
+
+    try:
+        ds = DataSource(datasource.lower())
+    except ValueError:
+        typer.echo(f"Error: unknown datasource '{datasource}'", err=True)
+        raise typer.Exit(1)
+
+    catalog = get_function_catalog(ds.name, function_path)
+    results = catalog.search(
+        prefix=prefix, keyword=keyword, function_type=function_type
+    )
+    typer.echo(json.dumps(results, indent=2))
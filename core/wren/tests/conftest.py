@@ -29,6 +29,16 @@ def pytest_configure(config: pytest.Config) -> None:
     config.addinivalue_line("markers", "trino: Trino connector tests — requires Docker")
     config.addinivalue_line(
         "markers",
-        "slow: slow tests that load a real model / hit real LanceDB "
-        "(e.g. cross-model vector-compatibility checks)",
+        "slow: slow or timing-sensitive tests that load a real model, hit "
+        "real LanceDB or assert wall-clock budgets (e.g. cross-model "
+        "vector-compatibility checks, CLI import time)",
     )
+
+
+@pytest.fixture(autouse=True)
+def _clear_recall_cache():
+    """Tests swap embedding functions freely; never share cached searches."""
+    from wren.memory import recall_cache  # noqa: PLC0415
+
+    recall_cache.clear()
+    yield
@@ -9,6 +9,7 @@ import subprocess
 import sys
 
 import pytest
+import typer
 
 MEMORY_INSTALLED = bool(importlib.util.find_spec("lancedb")) and bool(
     importlib.util.find_spec("sentence_transformers")
@@ -29,6 +30,11 @@ def _fresh_import_modules() -> dict[str, bool]:
     }
 
 
+def _subcommand_names(app) -> set[str]:
+    """Subcommand names of the root group (sub-apps are registered lazily)."""
+    return set(typer.main.get_command(app).commands)
+
+
 def test_import_cli_does_not_pull_heavy_ml_stack():
     """Importing the CLI must NOT load torch/lancedb, even when memory is installed."""
     loaded = _fresh_import_modules()
@@ -40,7 +46,7 @@ def test_import_cli_does_not_pull_heavy_ml_stack():
 def test_memory_subcommand_registered_when_extra_present():
     """The `memory` subcommand group is registered when the extra is installed."""
     cli = importlib.import_module("wren.cli")
-    names = {g.typer_instance.info.name for g in cli.app.registered_groups}
+    names = _subcommand_names(cli.app)
     assert "memory" in names, "memory subcommand not registered despite extra installed"
 
 
@@ -48,5 +54,5 @@ def test_memory_subcommand_always_registered():
     """`memory` is always registered — `wren memory store` writes knowledge/sql/*.md
     without the extra; lancedb-backed commands degrade with a clear message."""
     cli = importlib.import_module("wren.cli")
-    names = {g.typer_instance.info.name for g in cli.app.registered_groups}
+    names = _subcommand_names(cli.app)
     assert "memory" in names, "memory subcommand should always be registered"
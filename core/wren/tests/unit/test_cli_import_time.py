@@ -0,0 +1,110 @@
+"""Cold-start guard: ``wren <command>`` must not import more than it needs.
+
+Every command runs in a fresh interpreter under ``python -X importtime``.
+Two regressions are caught: a command pulling in one of the heavy modules
+(the engine stack, the memory stack) it does not use, and — marked ``slow``,
+since it depends on the machine — the total import time of the CLI and its
+dependencies exceeding a generous budget.
+"""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+# Modules that cost tens to hundreds of milliseconds to import.
+_HEAVY = ("wren.engine", "sqlglot", "pyarrow", "wren_core", "lancedb", "torch")
+
+# Import time (µs) of everything beyond interpreter startup. Typer, click and
+# the wren CLI modules take about 100 ms on a laptop, rich help rendering
+# another 150 ms; the engine stack alone took over 400 ms.
+_BUDGET_US = 500_000
+
+_COMMANDS = [
+    ["version"],
+    ["--version"],
+    ["--help"],
+    ["query", "--help"],
+    ["dry-plan", "--help"],
+    ["docs", "--help"],
+    ["ask", "--help"],
+    ["context", "show", "--help"],
+    ["context", "build", "--help"],
+    ["cube", "--help"],
+    ["utils", "--help"],
+    ["skills", "--help"],
+    ["memory", "recall", "--help"],
+    ["genbi", "--help"],
+    ["profile", "list", "--help"],
+    ["serve", "--help"],
+    ["daemon", "--help"],
+]
+
+_RUN = "import sys; from wren.cli import app; sys.argv[0] = 'wren'; app()"
+
+
+def _importtime(*args: str, env: dict[str, str]) -> dict[str, int]:
+    """Modules imported by ``python -X importtime <args>``.
+
+    Maps every imported module to its cumulative import time in
+    microseconds; nested imports map to 0 so their time is not counted twice.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True,
+        text=True,
+        env=env,
+        timeout=60,
+    )
+    assert proc.returncode == 0, proc.stdout + proc.stderr
+    modules: dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        nested = name.startswith("  ")  # "| name" at top level, "|   name" below
+        modules[name.strip()] = 0 if nested else int(cumulative)
+    return modules
+
+
+@pytest.fixture(scope="module")
+def env(tmp_path_factory) -> dict[str, str]:
+    home = tmp_path_factory.mktemp("wren_home")
+    return {
+        "PATH": "/usr/bin:/bin",
+        "HOME": str(home),
+        "WREN_HOME": str(home / ".wren"),
+    }
+
+
+@pytest.fixture(scope="module")
+def startup(env) -> set[str]:
+    """Modules a bare interpreter imports before running any code."""
+    return set(_importtime("-c", "pass", env=env))
+
+
+@pytest.mark.parametrize("argv", _COMMANDS, ids=" ".join)
+def test_command_skips_heavy_imports(argv, env):
+    modules = _importtime("-c", _RUN, *argv, env=env)
+    heavy = [name for name in _HEAVY if name in modules]
+    assert heavy == [], f"`wren {' '.join(argv)}` imports {heavy}"
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("argv", _COMMANDS, ids=" ".join)
+def test_command_import_budget(argv, env, startup):
+    # Best of a few runs: a busy machine can slow down any single one.
+    best = None
+    for _ in range(3):
+        modules = _importtime("-c", _RUN, *argv, env=env)
+        total = sum(us for name, us in modules.items() if name not in startup)
+        best = total if best is None else min(best, total)
+        if best < _BUDGET_US:
+            break
+    assert best < _BUDGET_US, (
+        f"`wren {' '.join(argv)}` spends {best / 1000:.0f} ms importing modules"
+    )
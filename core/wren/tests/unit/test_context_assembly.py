@@ -0,0 +1,169 @@
+"""Tests for token-budgeted schema context assembly."""
+
+from __future__ import annotations
+
+import pytest
+
+from wren.memory.context_assembly import (
+    CHARS_PER_TOKEN,
+    assemble_context,
+    budget_context,
+    estimate_tokens,
+    hit_entity_keys,
+    rank_entities,
+    schema_graph,
+)
+from wren.memory.schema_indexer import describe_schema
+
+pytestmark = pytest.mark.unit
+
+
+def _columns(prefix: str, n: int) -> list[dict]:
+    return [{"name": f"{prefix}_attr_{i}", "type": "varchar"} for i in range(n)]
+
+
+_MANIFEST = {
+    "models": [
+        {
+            "name": "orders",
+            "primaryKey": "o_id",
+            "columns": [
+                {"name": "o_id", "type": "int"},
+                {"name": "o_custkey", "type": "int"},
+                {"name": "o_totalprice", "type": "double"},
+                {
+                    "name": "customer",
+                    "type": "customer",
+                    "relationship": "orders_customer",
+                },
+                *_columns("o", 10),
+            ],
+        },
+        {
+            "name": "customer",
+            "primaryKey": "c_id",
+            "columns": [
+                {"name": "c_id", "type": "int"},
+                {"name": "c_nationkey", "type": "int"},
+                *_columns("c", 10),
+            ],
+        },
+        {
+            "name": "nation",
+            "primaryKey": "n_id",
+            "columns": [{"name": "n_id", "type": "int"}, *_columns("n", 10)],
+        },
+        {"name": "audit_log", "columns": _columns("a", 20)},
+    ],
+    "relationships": [
+        {
+            "name": "orders_customer",
+            "models": ["orders", "customer"],
+            "joinType": "MANY_TO_ONE",
+            "condition": "orders.o_custkey = customer.c_id",
+        },
+        {
+            "name": "customer_nation",
+            "models": ["customer", "nation"],
+            "joinType": "MANY_TO_ONE",
+            "condition": '"customer"."c_nationkey" = "nation"."n_id"',
+        },
+    ],
+}
+
+
+def test_key_blocks_keep_only_key_columns():
+    graph = schema_graph(_MANIFEST)
+    block = graph.key_blocks["model:customer"]
+    assert block.startswith("### Model: customer")
+    assert "c_id (int)" in block and "c_nationkey (int)" in block
+    assert "c_attr_0" not in block
+    assert "… 10 more column(s)" in block
+    assert graph.blocks["model:customer"] in describe_schema(_MANIFEST)
+    assert schema_graph(dict(_MANIFEST)) is graph  # memoized per hash
+
+
+def test_relationship_graph_edges():
+    edges = schema_graph(_MANIFEST).edges
+    assert edges["model:customer"] == (
+        ("relationship:orders_customer", "model:orders"),
+        ("relationship:customer_nation", "model:nation"),
+    )
+    assert "model:audit_log" not in edges
+
+
+def test_ranked_model_expands_to_neighbours_within_budget():
+    # orders in full plus customer's key block and the join, not much more.
+    result = assemble_context(_MANIFEST, ["model:orders"], 170)
+
+    assert result["included"][:3] == [
+        "model:orders",
+        "model:customer",
+        "relationship:orders_customer",
+    ]
+    assert "model:customer" in result["key_only"]
+    assert "model:audit_log" not in result["included"]
+    assert result["tokens"] <= result["budget"]
+    assert len(result["schema"]) <= result["budget"] * CHARS_PER_TOKEN
+    assert "o_attr_9" in result["schema"]  # the ranked model is complete
+
+
+def test_oversized_model_falls_back_to_key_block():
+    result = assemble_context(_MANIFEST, ["model:orders"], 45)
+    assert result["included"] == ["model:orders"]
+    assert result["key_only"] == ["model:orders"]
+    assert "o_attr_0" not in result["schema"]
+
+
+def test_leftover_budget_upgrades_key_blocks():
+    result = assemble_context(_MANIFEST, ["model:orders"], 10_000, hops=2)
+    assert result["key_only"] == []
+    assert "c_attr_9" in result["schema"] and "n_attr_9" in result["schema"]
+    assert result["omitted"] == 1  # only the unrelated audit_log
+
+
+def test_ranked_relationship_brings_its_endpoints():
+    result = assemble_context(_MANIFEST, ["relationship:customer_nation"], 200)
+    assert result["included"][:3] == [
+        "model:customer",
+        "model:nation",
+        "relationship:customer_nation",
+    ]
+
+
+def test_rank_entities_and_hit_keys():
+    assert rank_entities(_MANIFEST, "total price of orders")[0] == "model:orders"
+    assert rank_entities(_MANIFEST, "zzz") == []
+    hits = [
+        {"item_type": "column", "model_name": "nation", "item_name": "n_id"},
+        {"item_type": "model", "model_name": "nation", "item_name": "nation"},
+        {"item_type": "relationship", "model_name": "orders", "item_name": "r"},
+        {"item_type": "measure", "model_name": "revenue", "item_name": "m"},
+    ]
+    assert hit_entity_keys(hits) == ["model:nation", "relationship:r", "cube:revenue"]
+
+
+def test_budget_context_returns_full_text_when_it_fits():
+    text = describe_schema(_MANIFEST)
+    assert budget_context(_MANIFEST, "q", estimate_tokens(text)) == {
+        "strategy": "full",
+        "schema": text,
+    }
+    packed = budget_context(_MANIFEST, "nation", 100, model_name="audit_log")
+    assert packed["strategy"] == "budget"
+    assert packed["included"][0] == "model:audit_log"
+
+
+def test_memory_store_budget_uses_search_hits(tmp_path, monkeypatch):
+    pytest.importorskip("lancedb", reason="wren[memory] extras not installed")
+    from wren.memory.store import MemoryStore  # noqa: PLC0415
+
+    store = MemoryStore(path=tmp_path)
+    hits = [{"item_type": "model", "model_name": "nation", "item_name": "nation"}]
+    monkeypatch.setattr(store, "_search_schema", lambda *a, **kw: hits)
+
+    result = store.get_context(_MANIFEST, "unrelated words", budget=150)
+
+    assert result["strategy"] == "budget"
+    assert result["included"][0] == "model:nation"
+    assert "model:customer" in result["included"]
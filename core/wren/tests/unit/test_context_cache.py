@@ -0,0 +1,162 @@
+"""Tests for the incremental ``wren context build`` parse cache."""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+import yaml
+
+from wren import context_cache
+from wren.context import build_json, load_models, load_views, validate_project
+from wren.context_cache import CACHE_FILE, build_cache, safe_load
+
+pytestmark = pytest.mark.unit
+
+V5_GOLDEN = Path(__file__).resolve().parents[4] / "examples" / "v5-jaffle"
+
+
+@pytest.fixture
+def project(tmp_path):
+    dest = tmp_path / "proj"
+    shutil.copytree(V5_GOLDEN, dest, ignore=shutil.ignore_patterns("target"))
+    return dest
+
+
+def _build(project: Path):
+    with build_cache(project) as cache:
+        validate_project(project)
+        manifest = build_json(project)
+    return manifest, cache
+
+
+def test_cached_rebuild_matches_cold_build_and_parses_nothing(project):
+    cold = build_json(project)
+    first, first_cache = _build(project)
+    second, second_cache = _build(project)
+
+    assert first == second == cold
+    assert first_cache.hits == 0 and first_cache.misses > 0
+    assert second_cache.misses == 0
+    assert second_cache.hits == first_cache.misses
+    assert (project / "target" / CACHE_FILE).is_file()
+
+
+def test_edited_file_is_reparsed_and_touched_file_is_not(project):
+    _build(project)
+    model_meta = next((project / "models").glob("*/metadata.yml"))
+    other_meta = next(
+        p for p in (project / "models").glob("*/metadata.yml") if p != model_meta
+    )
+
+    model_meta.write_text(
+        model_meta.read_text().replace("name:", "name: renamed\nold_name:", 1)
+    )
+    st = other_meta.stat()
+    os.utime(other_meta, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000))
+
+    manifest, cache = _build(project)
+
+    assert cache.misses == 1
+    assert "renamed" in {m["name"] for m in manifest["models"]}
+
+
+def test_deleted_files_drop_out_of_cache(project):
+    _build(project)
+    victim = next((project / "models").iterdir())
+    shutil.rmtree(victim)
+
+    _build(project)
+
+    files = json.loads((project / "target" / CACHE_FILE).read_text())["files"]
+    assert not any(key.startswith(f"models/{victim.name}/") for key in files)
+
+
+def test_corrupt_cache_is_ignored(project):
+    (project / "target").mkdir(exist_ok=True)
+    (project / "target" / CACHE_FILE).write_text("{not json")
+
+    manifest, cache = _build(project)
+
+    assert manifest == build_json(project)
+    assert cache.hits == 0
+
+
+def test_values_json_cannot_represent_are_never_cached(project):
+    rel = project / "relationships.yml"
+    rel.write_text(rel.read_text() + "\nreviewed_on: 2024-01-02\n")
+
+    _build(project)
+    _, cache = _build(project)
+
+    files = json.loads((project / "target" / CACHE_FILE).read_text())["files"]
+    assert "relationships.yml" not in files
+    assert cache.misses == 1
+
+
+@pytest.fixture
+def sequential(monkeypatch):
+    """Switch to one-file-at-a-time pure-Python loading (the old behaviour)."""
+
+    def use(enabled: bool) -> None:
+        monkeypatch.setattr(
+            context_cache,
+            "_FAST_LOADER",
+            yaml.SafeLoader
+            if enabled
+            else getattr(yaml, "CSafeLoader", yaml.SafeLoader),
+        )
+        monkeypatch.setattr(
+            context_cache, "PREFETCH_MIN_FILES", 1 << 30 if enabled else 1
+        )
+
+    return use
+
+
+def _error(fn, *args) -> str:
+    with pytest.raises(yaml.YAMLError) as exc_info:
+        fn(*args)
+    return str(exc_info.value)
+
+
+def test_parallel_load_matches_sequential(project, sequential):
+    sequential(True)
+    expected = build_json(project)
+    expected_errors = validate_project(project)
+
+    sequential(False)
+    assert build_json(project) == expected
+    assert validate_project(project) == expected_errors
+    first, _ = _build(project)
+    second, cache = _build(project)
+    assert first == second == expected
+    assert cache.misses == 0
+
+
+def test_parallel_load_raises_the_first_error_in_order(project, sequential):
+    for name, text in (("a_bad", "a: [1, 2\nb: 3\n"), ("z_bad", "a: 'open\n")):
+        (project / "models" / name).mkdir()
+        (project / "models" / name / "metadata.yml").write_text(text)
+    view = project / "views" / "a_list"
+    view.mkdir(parents=True, exist_ok=True)
+    (view / "metadata.yml").write_text("- not a mapping\n")
+    (view / "sql.yml").write_text("statement: [unclosed\n")
+
+    sequential(True)
+    expected = _error(load_models, project)
+    expected_views = load_views(project)
+
+    sequential(False)
+    assert _error(load_models, project) == expected
+    assert load_views(project) == expected_views  # sql.yml never consulted
+
+
+def test_safe_load_reports_pure_python_errors():
+    text = "a: [1, 2\nb: 3\n"
+    assert _error(safe_load, text) == _error(yaml.safe_load, text)
+    assert safe_load("x: 2024-01-02\ny: !!binary aGk=") == yaml.safe_load(
+        "x: 2024-01-02\ny: !!binary aGk="
+    )
@@ -0,0 +1,174 @@
+"""Tests for the persistent ``wren daemon`` and its ``wrenc`` client."""
+
+from __future__ import annotations
+
+import io
+import threading
+
+import pyarrow as pa
+import pytest
+import typer
+from typer.testing import CliRunner
+
+from wren.cli import app
+from wren.daemon import EnginePool, WrenDaemon, engine_pool
+from wren.daemon_cli import daemon_app
+from wren.daemon_client import forward, request, runs_locally
+
+pytestmark = pytest.mark.unit
+
+_QUERY = [
+    "query",
+    "--sql",
+    "SELECT 1",
+    "--mdl",
+    "e30=",  # base64 of {}
+    "--connection-info",
+    '{"datasource": "duckdb", "url": "/tmp", "format": "duckdb"}',
+]
+
+
+class _FakeEngine:
+    created = 0
+
+    def __init__(self, *args, **kwargs):
+        type(self).created += 1
+        self.args = args
+        self.closed = 0
+
+    def query(self, sql, limit=None):
+        return pa.table({"answer": [42]})
+
+    def close(self):
+        self.closed += 1
+
+
+@pytest.fixture
+def daemon(tmp_path, monkeypatch):
+    monkeypatch.delenv("WREN_HOME", raising=False)
+    _FakeEngine.created = 0
+    server = WrenDaemon(
+        tmp_path / "d.sock",
+        typer.main.get_command(app),
+        pool=EnginePool(factory=_FakeEngine),
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join(timeout=5)
+
+
+def _run(daemon, argv):
+    out, err = io.StringIO(), io.StringIO()
+    code = forward(argv, socket_path=daemon.socket_path, stdout=out, stderr=err)
+    return code, out.getvalue(), err.getvalue()
+
+
+def test_forward_streams_output_and_exit_code(daemon):
+    code, out, _ = _run(daemon, ["version"])
+    assert code == 0 and out.startswith("wrenai ")
+
+    code, _, err = _run(daemon, ["no-such-command"])
+    assert code == 2 and "No such command" in err
+    assert request(daemon.socket_path, {"op": "info"})["commands"] == 2
+
+
+def test_commands_run_in_the_client_cwd(daemon, tmp_path, monkeypatch):
+    project = tmp_path / "proj"
+    project.mkdir()
+    monkeypatch.chdir(project)
+
+    code, _, _ = _run(daemon, ["context", "init"])
+
+    assert code == 0
+    assert (project / "wren_project.yml").exists()
+
+
+def test_repeated_queries_reuse_a_warm_engine(daemon):
+    for _ in range(3):
+        code, out, _ = _run(daemon, _QUERY)
+        assert code == 0 and "42" in out
+
+    assert _FakeEngine.created == 1
+    info = request(daemon.socket_path, {"op": "info"})
+    assert (info["engines"], info["engine_hits"]) == (1, 2)
+    assert engine_pool() is daemon.pool
+
+
+def test_daemon_declines_local_only_commands_and_other_wren_home(
+    daemon, tmp_path, monkeypatch
+):
+    assert _run(daemon, ["serve", "mcp"])[0] is None
+    monkeypatch.setenv("WREN_HOME", str(tmp_path / "other"))
+    assert _run(daemon, ["version"])[0] is None
+
+
+def test_forward_without_daemon_returns_none(tmp_path):
+    assert forward(["version"], socket_path=tmp_path / "absent.sock") is None
+
+
+def test_runs_locally():
+    assert runs_locally(["serve", "mcp"])
+    assert runs_locally(["memory", "watch", "--path", "x"])
+    assert runs_locally(["memory", "load", "-"])
+    assert not runs_locally(["memory", "recall", "-q", "revenue"])
+    assert not runs_locally(["--sql", "SELECT 1"])
+
+
+def test_piped_stdin_runs_locally():
+    argv = ["utils", "parse-types", "-d", "postgres"]
+    assert not runs_locally(argv)
+    assert runs_locally(argv, piped_stdin=True)
+
+
+def test_confirmation_prompts_run_locally(daemon):
+    assert runs_locally(["memory", "forget", "--source", "user"])
+    assert runs_locally(["memory", "forget", "--id", "3"])
+    assert not runs_locally(["memory", "forget", "--id", "3", "--force"])
+    assert not runs_locally(["memory", "forget", "--source", "user", "-f"])
+    assert _run(daemon, ["memory", "forget", "--id", "3"])[0] is None
+
+
+def test_wrenc_runs_piped_input_locally(monkeypatch):
+    import wren.daemon_client as client  # noqa: PLC0415
+
+    execs = []
+    monkeypatch.setattr(client.sys, "argv", ["wrenc", "utils", "parse-types"])
+    monkeypatch.setattr(client.sys, "stdin", io.StringIO('[{"type": "int"}]'))
+    monkeypatch.setattr(client, "forward", pytest.fail)
+    monkeypatch.setattr(client.os, "execv", lambda path, args: execs.append(args))
+    client.main()
+    assert execs and execs[0][-2:] == ["utils", "parse-types"]
+
+
+def test_engine_pool_keeps_engines_open():
+    pool = EnginePool(maxsize=1, factory=_FakeEngine)
+    first = pool.get("m", "duckdb", {"url": "a"})
+    with first as engine:
+        engine.close()
+    assert pool.get("m", "duckdb", {"url": "a"}) is first
+    assert first._engine.closed == 0
+
+    with pytest.raises(RuntimeError), first:
+        raise RuntimeError("connection lost")
+    assert first._engine.closed == 1  # reconnect next time
+
+    pool.get("m", "duckdb", {"url": "b"})
+    assert first._engine.closed == 2  # evicted
+    assert len(pool) == 1
+
+
+def test_status_and_stop_commands(daemon):
+    runner = CliRunner()
+    socket_args = ["--socket", str(daemon.socket_path)]
+
+    result = runner.invoke(daemon_app, ["status", *socket_args])
+    assert result.exit_code == 0 and "commands run: 0" in result.output
+
+    result = runner.invoke(daemon_app, ["stop", *socket_args])
+    assert result.exit_code == 0
+
+    result = runner.invoke(daemon_app, ["status", "--socket", "/nonexistent.sock"])
+    assert result.exit_code == 1
@@ -0,0 +1,149 @@
+"""Tests for the on-disk embedding cache used by the memory store."""
+
+from __future__ import annotations
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+pytest.importorskip("lancedb", reason="wren[memory] extras not installed")
+
+from wren.memory.embedding_cache import (  # noqa: E402
+    CACHE_DIR,
+    CachedEmbeddingFunction,
+    EmbeddingCache,
+)
+
+
+class _CountingEmbedFn:
+    def __init__(self, dim: int = 4):
+        self.dim = dim
+        self.embedded: list[str] = []
+
+    def compute_source_embeddings(self, texts):
+        self.embedded.extend(texts)
+        return [[float(len(t))] * self.dim for t in texts]
+
+    def compute_query_embeddings(self, query):
+        return [[0.5] * self.dim]
+
+
+def _cached(path, model="m", inner=None):
+    inner = inner or _CountingEmbedFn()
+    return CachedEmbeddingFunction(inner, EmbeddingCache(path, model)), inner
+
+
+def test_unchanged_texts_are_not_reembedded_across_instances(tmp_path):
+    first, inner1 = _cached(tmp_path)
+    vectors = first.compute_source_embeddings(["a", "bb"])
+    assert inner1.embedded == ["a", "bb"]
+
+    second, inner2 = _cached(tmp_path)
+    again = second.compute_source_embeddings(["bb", "ccc", "a"])
+
+    assert inner2.embedded == ["ccc"]
+    assert again[0] == vectors[1]
+    assert again[2] == vectors[0]
+    assert again[1] == [3.0] * 4
+
+
+def test_duplicate_texts_in_one_batch_embed_once(tmp_path):
+    fn, inner = _cached(tmp_path)
+    vectors = fn.compute_source_embeddings(["x", "x", "y"])
+    assert inner.embedded == ["x", "y"]
+    assert vectors[0] == vectors[1]
+    assert len(EmbeddingCache(tmp_path, "m")) == 2
+
+
+def test_cache_is_keyed_by_model(tmp_path):
+    fn, _ = _cached(tmp_path, model="m1")
+    fn.compute_source_embeddings(["same text"])
+
+    other, inner = _cached(tmp_path, model="m2")
+    other.compute_source_embeddings(["same text"])
+
+    assert inner.embedded == ["same text"]
+
+
+def test_table_still_being_created_reads_as_a_miss(tmp_path, monkeypatch):
+    fn, inner = _cached(tmp_path)
+    fn.compute_source_embeddings(["a"])
+
+    def half_created(_name):
+        raise ValueError("Table 'embeddings' was not found")
+
+    monkeypatch.setattr(fn.cache._db, "open_table", half_created)
+    assert fn.cache.get_many(["anything"]) == {}
+    assert len(fn.cache) == 0
+    assert fn.compute_source_embeddings(["a"]) == [[1.0] * 4]
+    assert inner.embedded == ["a", "a"]
+
+
+def test_query_embeddings_pass_through(tmp_path):
+    fn, inner = _cached(tmp_path)
+    assert fn.compute_query_embeddings("q") == [[0.5] * 4]
+    assert inner.embedded == []
+    assert len(EmbeddingCache(tmp_path, "m")) == 0
+
+
+def test_memory_store_reuses_cache_after_reset(tmp_path, monkeypatch):
+    from wren.memory.store import MemoryStore  # noqa: PLC0415
+
+    inner = _CountingEmbedFn()
+    monkeypatch.setattr("wren.memory.store.get_embedding_function", lambda _name: inner)
+    manifest = {
+        "models": [
+            {"name": "orders", "columns": [{"name": "id", "type": "int"}]},
+        ]
+    }
+
+    store = MemoryStore(path=tmp_path)
+    store.index_schema(manifest, seed_queries=False)
+    assert len(inner.embedded) == 2
+
+    store.reset()
+    inner.embedded.clear()
+    MemoryStore(path=tmp_path).index_schema(manifest, seed_queries=False)
+
+    assert inner.embedded == []
+    assert (tmp_path / CACHE_DIR).is_dir()
+    assert MemoryStore(path=tmp_path).status()["embedding_cache"] == 2
+
+
+def test_optimize_compacts_and_indexes_the_cache(tmp_path):
+    from datetime import timedelta  # noqa: PLC0415
+
+    fn, _ = _cached(tmp_path)
+    for text in ["a", "b", "c", "d", "e"]:
+        fn.compute_source_embeddings([text])
+    cache = EmbeddingCache(tmp_path, "m")
+
+    stats = cache.optimize(retention=timedelta(0))
+
+    assert stats["rows"] == 5
+    assert stats["fragments_after"] < stats["fragments_before"]
+    assert stats["versions_after"] < stats["versions_before"]
+    table = cache._table()
+    assert any("digest" in ix.columns for ix in table.list_indices())
+    assert fn.compute_source_embeddings(["b"]) == [[1.0] * 4]
+
+
+def test_optimize_without_a_table_reports_nothing(tmp_path):
+    from datetime import timedelta  # noqa: PLC0415
+
+    assert EmbeddingCache(tmp_path, "m").optimize(retention=timedelta(0)) is None
+
+
+def test_memory_store_optimize_includes_the_cache(tmp_path, monkeypatch):
+    from wren.memory.store import MemoryStore  # noqa: PLC0415
+
+    inner = _CountingEmbedFn()
+    monkeypatch.setattr("wren.memory.store.get_embedding_function", lambda _name: inner)
+    store = MemoryStore(path=tmp_path)
+    store.store_query("how many orders", "SELECT count(*) FROM orders")
+    store.store_query("how many users", "SELECT count(*) FROM users")
+
+    report = store.optimize()
+
+    assert report[CACHE_DIR]["rows"] == 2
+    assert CACHE_DIR not in store.optimize(include_cache=False)
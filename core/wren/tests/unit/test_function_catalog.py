@@ -0,0 +1,86 @@
+"""Tests for the precomputed per-data-source function catalog."""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import pytest
+
+from wren.mdl import function_catalog
+from wren.mdl.function_catalog import FunctionCatalog, get_function_catalog
+
+pytestmark = pytest.mark.unit
+
+
+def _fn(name, function_type="scalar", description=""):
+    return {
+        "function_type": function_type,
+        "name": name,
+        "return_type": None,
+        "param_names": None,
+        "param_types": None,
+        "description": description,
+    }
+
+
+@pytest.fixture
+def catalog():
+    return FunctionCatalog(
+        [
+            _fn("date_trunc", description="Truncates a timestamp."),
+            _fn("sum", "aggregate", description="Returns the sum."),
+            _fn("date_part", description="Returns part of a date."),
+            _fn("row_number", "window"),
+            _fn("Date_Bin", description="Bins timestamps into windows."),
+            _fn("date", description="Casts to a date."),
+        ]
+    )
+
+
+def test_search_by_prefix_is_sorted_and_case_insensitive(catalog):
+    names = [f["name"] for f in catalog.search(prefix="DATE_")]
+
+    assert names == ["Date_Bin", "date_part", "date_trunc"]
+
+
+def test_get_matches_whole_name_only(catalog):
+    assert [f["name"] for f in catalog.get("date")] == ["date"]
+    assert catalog.get("dat") == []
+
+
+def test_search_by_keyword_covers_name_and_description(catalog):
+    names = [f["name"] for f in catalog.search(keyword="windows")]
+
+    assert names == ["Date_Bin"]
+    assert [f["name"] for f in catalog.search(keyword="row_")] == ["row_number"]
+
+
+def test_search_by_type_and_limit(catalog):
+    assert [f["name"] for f in catalog.search(function_type="aggregate")] == ["sum"]
+    assert len(catalog.search(prefix="date", limit=2)) == 2
+    assert catalog.search(limit=0) == []
+    assert catalog.categories() == {"aggregate": 1, "scalar": 4, "window": 1}
+
+
+def test_results_are_copies(catalog):
+    catalog.search(prefix="sum")[0]["name"] = "mutated"
+
+    assert catalog.get("sum")[0]["name"] == "sum"
+
+
+def test_get_function_catalog_builds_once_per_data_source():
+    get_function_catalog.cache_clear()
+    real = function_catalog.wren_core.SessionContext
+    try:
+        with patch.object(
+            function_catalog.wren_core, "SessionContext", side_effect=real
+        ) as ctor:
+            first = get_function_catalog("duckdb")
+            second = get_function_catalog("duckdb")
+    finally:
+        get_function_catalog.cache_clear()
+
+    assert first is second
+    assert ctor.call_count == 1
+    assert len(first) > 0
+    assert first.get("sum")
@@ -2,9 +2,12 @@
 
 from __future__ import annotations
 
+import functools
+import threading
 from pathlib import Path
 from unittest.mock import Mock
 
+import anyio
 import pytest
 
 pytest.importorskip("mcp")
@@ -12,19 +15,32 @@ pytest.importorskip("mcp")
 import pyarrow as pa  # noqa: E402
 
 from wren.mcp_server import ServeContext, _workflow_text, build_server  # noqa: E402
+from wren.serve_runtime import ToolBusyError  # noqa: E402
 
 pytestmark = pytest.mark.unit
 
 V5_GOLDEN = Path(__file__).resolve().parents[4] / "examples" / "v5-jaffle"
 
 
+def _get_async_tool(mcp, name: str):
+    """Return the registered async wrapper, for tests that need concurrency."""
+    return mcp._tool_manager._tools[name].fn
+
+
 def _get_tool(mcp, name: str):
     """Return a registered tool implementation for handler-level tests.
 
-    FastMCP registry access is isolated here so the tests can call synchronous
-    handlers without exercising transport serialization.
+    FastMCP registry access is isolated here so the tests can call handlers
+    synchronously without exercising transport serialization. Registered
+    handlers are async wrappers that offload to a worker thread; each call
+    runs them to completion on a fresh event loop.
     """
-    return mcp._tool_manager._tools[name].fn
+    fn = _get_async_tool(mcp, name)
+
+    def call(**kwargs):
+        return anyio.run(functools.partial(fn, **kwargs))
+
+    return call
 
 
 def _make_ctx(tmp_path: Path, **overrides) -> ServeContext:
@@ -405,3 +421,197 @@ def test_query_cube_negative_limit_rejected_consistently():
             limit=-1,
             sql_only=True,
         )
+
+
+# ── Worker-thread pool, engine pool, and metrics ────────────────────────────
+
+
+def test_tools_run_off_event_loop_thread_and_record_metrics(tmp_path):
+    seen = {}
+    engine = Mock()
+
+    def fake_dry_plan(sql):
+        seen["thread"] = threading.current_thread()
+        return "SELECT 1"
+
+    engine.dry_plan = fake_dry_plan
+    ctx = _make_ctx(tmp_path, engine=engine)
+    dry_plan = _get_tool(build_server(ctx), "dry_plan")
+
+    assert dry_plan(sql="SELECT 1") == "SELECT 1"
+    assert seen["thread"] is not threading.main_thread()
+
+    snap = ctx.metrics.snapshot()
+    assert snap["tools"]["dry_plan"]["calls"] == 1
+    assert snap["in_flight"] == 0
+    assert snap["queue_depth"] == 0
+
+
+def test_tool_schema_keeps_handler_signature(tmp_path):
+    mcp = build_server(_make_ctx(tmp_path))
+    tool = mcp._tool_manager._tools["run_sql"]
+
+    assert set(tool.parameters["properties"]) == {"sql", "limit"}
+    assert tool.parameters["required"] == ["sql"]
+    assert "semantic layer" in tool.description
+
+
+def test_engine_pool_gives_concurrent_calls_their_own_engine(tmp_path):
+    primary = Mock()
+    ctx = _make_ctx(tmp_path, engine=primary, engine_factory=Mock)
+
+    with ctx.lease_engine() as first, ctx.lease_engine() as second:
+        assert first is primary
+        assert second is not primary
+    # Released engines are reused rather than recreated.
+    with ctx.lease_engine() as again:
+        assert again in (first, second)
+
+    ctx.close()
+    primary.close.assert_called_once()
+    second.close.assert_called_once()
+
+
+def test_dry_plan_runs_on_a_leased_engine(tmp_path):
+    primary = Mock()
+    ctx = _make_ctx(tmp_path, engine=primary, engine_factory=Mock)
+    dry_plan = _get_tool(build_server(ctx), "dry_plan")
+
+    with ctx.lease_engine():  # another call holds the primary engine
+        dry_plan(sql="SELECT 1")
+
+    primary.dry_plan.assert_not_called()
+    ctx._spawned_engines[0].dry_plan.assert_called_once_with("SELECT 1")
+
+
+def test_metrics_route_serves_prometheus_text(tmp_path):
+    from starlette.testclient import TestClient
+
+    ctx = _make_ctx(tmp_path)
+    ctx.metrics.enqueue("run_sql")
+    with ctx.metrics.track("run_sql"):
+        pass
+
+    mcp = build_server(ctx)
+    with TestClient(mcp.streamable_http_app()) as client:
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert 'wren_mcp_tool_latency_seconds_count{tool="run_sql"} 1' in response.text
+
+
+# ── Admission control ───────────────────────────────────────────────────────
+
+
+def test_saturated_heavy_tool_rejects_fast_while_metadata_tools_run(tmp_path):
+    release = threading.Event()
+    started = threading.Event()
+    engine = Mock()
+
+    def slow_query(sql, limit):
+        started.set()
+        release.wait(5)
+        return pa.table({"x": [1]})
+
+    engine.query = slow_query
+    engine.dry_plan = lambda sql: "SELECT 1"
+    ctx = _make_ctx(tmp_path, engine=engine, tool_limits={"run_sql": 1}, queue_size=0)
+    mcp = build_server(ctx)
+    run_sql = _get_async_tool(mcp, "run_sql")
+    dry_plan = _get_async_tool(mcp, "dry_plan")
+    outcome = {}
+
+    async def scenario():
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(functools.partial(run_sql, sql="SELECT x"))
+            await anyio.to_thread.run_sync(started.wait, 5)
+            with pytest.raises(ToolBusyError) as excinfo:
+                await run_sql(sql="SELECT y")
+            outcome["busy"] = excinfo.value
+            outcome["plan"] = await dry_plan(sql="SELECT 1")
+            release.set()
+
+    anyio.run(scenario)
+
+    assert outcome["plan"] == "SELECT 1"
+    assert outcome["busy"].reason == "busy"
+    assert '"error": "busy"' in str(outcome["busy"])
+    snap = ctx.metrics.snapshot()["tools"]
+    assert snap["run_sql"]["rejected"] == {"busy": 1}
+    assert snap["run_sql"]["calls"] == 1
+
+
+def test_session_rate_limit_rejects_with_retry_after(tmp_path):
+    ctx = _make_ctx(tmp_path, session_rate=1.0, session_burst=1)
+    session = Mock()
+
+    assert ctx.admit("list_models", session) is ctx.limiter
+    with pytest.raises(ToolBusyError) as excinfo:
+        ctx.admit("list_models", session)
+
+    assert excinfo.value.reason == "rate_limited"
+    assert 0 < excinfo.value.retry_after <= 1.0
+    # Other sessions, and calls outside any session, are unaffected.
+    assert ctx.admit("list_models", Mock()) is ctx.limiter
+    assert ctx.admit("list_models", None) is ctx.limiter
+
+
+def _coalesced(ctx: ServeContext, tool: str) -> int:
+    return ctx.metrics.snapshot()["tools"].get(tool, {}).get("coalesced", 0)
+
+
+def test_identical_concurrent_run_sql_calls_share_one_query(tmp_path):
+    release = threading.Event()
+    executions = []
+    engine = Mock()
+    # The flight is keyed on the SQL text: no extra planning per call.
+    engine.dry_plan.side_effect = AssertionError("run_sql planned twice")
+
+    def slow_query(sql, limit):
+        executions.append(sql)
+        release.wait(5)
+        return pa.table({"x": [1, 2]})
+
+    engine.query = slow_query
+    # Waiting duplicates hold no slot: a full run_sql limit admits them.
+    ctx = _make_ctx(tmp_path, engine=engine, tool_limits={"run_sql": 1}, queue_size=0)
+    run_sql = _get_async_tool(build_server(ctx), "run_sql")
+    results = []
+
+    async def call(sql):
+        results.append(await run_sql(sql=sql, limit=10))
+
+    async def scenario():
+        async with anyio.create_task_group() as tg:
+            for _ in range(3):
+                tg.start_soon(call, "SELECT x")
+            with anyio.fail_after(5):
+                while _coalesced(ctx, "run_sql") < 2:
+                    await anyio.sleep(0.001)
+            release.set()
+
+    anyio.run(scenario)
+
+    assert len(executions) == 1
+    assert [r["row_count"] for r in results] == [2, 2, 2]
+    assert ctx.metrics.snapshot()["tools"]["run_sql"]["coalescing_ratio"] == (
+        pytest.approx(2 / 3)
+    )
+
+
+def test_list_functions_filters_precomputed_catalog(tmp_path):
+    engine = Mock()
+    engine.data_source.name = "duckdb"
+    engine.function_path = None
+    list_functions = _get_tool(
+        build_server(_make_ctx(tmp_path, engine=engine)), "list_functions"
+    )
+
+    everything = list_functions()["functions"]
+    aggregates = list_functions(function_type="aggregate")["functions"]
+    dated = list_functions(prefix="date_", limit=2)["functions"]
+
+    assert len(everything) > len(aggregates) > 0
+    assert {f["function_type"] for f in aggregates} == {"aggregate"}
+    assert len(dated) == 2
+    assert all(f["name"].startswith("date_") for f in dated)
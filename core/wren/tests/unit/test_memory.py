@@ -5,6 +5,7 @@ from __future__ import annotations
 import pytest
 
 from wren.memory.schema_indexer import (
+    describe_manifest,
     describe_schema,
     extract_schema_items,
     manifest_hash,
@@ -434,6 +435,44 @@ class TestDescribeSchema:
         assert isinstance(text, str)
         assert len(text) > 0
 
+    def test_description_is_memoized_per_manifest_hash(self, monkeypatch):
+        import copy  # noqa: PLC0415
+
+        from wren.memory import schema_indexer  # noqa: PLC0415
+
+        first = describe_manifest(_MANIFEST)
+        renders = []
+        original = schema_indexer._render_description
+        monkeypatch.setattr(
+            schema_indexer,
+            "_render_description",
+            lambda m, h: renders.append(h) or original(m, h),
+        )
+        # An equal manifest (e.g. rebuilt from YAML) is a cache hit.
+        again = describe_manifest(copy.deepcopy(_MANIFEST))
+        assert again is first and renders == []
+        assert describe_schema({**_MANIFEST, "_instructions": "x"}) == first.text
+
+        changed = copy.deepcopy(_MANIFEST)
+        changed["models"][0]["name"] = "orders_v2"
+        assert "orders_v2" in describe_schema(changed)
+        assert renders == [manifest_hash(changed)]
+
+    def test_fragments_partition_the_description(self):
+        description = describe_manifest(_MANIFEST)
+        assert list(description.fragments) == [
+            "model:orders",
+            "model:customer",
+            "relationship:orders_customer",
+            "view:top_customers",
+        ]
+        assert description.fragments["model:orders"].startswith("### Model: orders")
+        for fragment in description.fragments.values():
+            assert fragment in description.text
+        assert description.size == len(description.text)
+        assert description.strategy(description.size) == "full"
+        assert description.strategy(description.size - 1) == "search"
+
 
 # ── Local-first embedding adapter tests ────────────────────────────────────
 # These exercise the control flow of LocalFirstSentenceTransformerEmbeddings
@@ -636,6 +675,196 @@ class TestLocalFirstEmbeddingsConcurrency:
         assert len(calls) == 1
 
 
+class _FakeEncoding:
+    def __init__(self, text):
+        self.ids = [ord(c) for c in text]
+
+
+class _FakeTokenizer:
+    def encode_batch(self, texts):
+        return [_FakeEncoding(t) for t in texts]
+
+
+class _FakeOnnxSession:
+    """Hidden state = token id on every dim; records each batch's shape."""
+
+    def __init__(self, dim=4):
+        self.dim = dim
+        self.shapes: list[tuple[int, int]] = []
+
+    def get_inputs(self):
+        return []
+
+    def run(self, _outputs, feeds):
+        import numpy as np  # noqa: PLC0415
+
+        ids = feeds["input_ids"]
+        self.shapes.append(ids.shape)
+        return [np.repeat(ids[..., None].astype("float32"), self.dim, axis=2)]
+
+
+@pytest.mark.unit
+class TestEmbeddingBackends:
+    def test_backend_resolution(self, monkeypatch):
+        from wren.memory.embeddings import (  # noqa: PLC0415
+            OnnxEmbedding,
+            embedding_model_key,
+            get_embedding_function,
+            resolve_embedding_backend,
+        )
+
+        monkeypatch.delenv("WREN_EMBEDDING_BACKEND", raising=False)
+        assert resolve_embedding_backend() == "sentence-transformers"
+        assert embedding_model_key("m") == "m"
+
+        monkeypatch.setenv("WREN_EMBEDDING_BACKEND", "ONNX")
+        assert resolve_embedding_backend() == "onnx"
+        assert embedding_model_key("m") == "m@onnx-int8"
+        # Construction is lazy: no onnxruntime import until the first embed.
+        assert isinstance(get_embedding_function("m"), OnnxEmbedding)
+
+        with pytest.raises(ValueError, match="Unknown embedding backend"):
+            resolve_embedding_backend("torchscript")
+
+    def test_mean_pool_ignores_padding_and_normalizes(self):
+        np = pytest.importorskip("numpy")
+        from wren.memory.embeddings import _mean_pool_normalized  # noqa: PLC0415
+
+        hidden = np.array([[[3.0, 4.0], [100.0, 100.0]]], dtype="float32")
+        mask = np.array([[1, 0]])
+        pooled = _mean_pool_normalized(hidden, mask)
+        assert pooled.tolist() == [[pytest.approx(0.6), pytest.approx(0.8)]]
+
+    def test_onnx_batches_by_length_and_keeps_order(self, monkeypatch):
+        pytest.importorskip("numpy")
+        from wren.memory.embeddings import OnnxEmbedding  # noqa: PLC0415
+
+        session = _FakeOnnxSession()
+        embedder = OnnxEmbedding("m", batch_size=2)
+        monkeypatch.setattr(embedder, "_load", lambda: (session, _FakeTokenizer()))
+
+        texts = ["aaaa", "b", "cc", "ddd", "e"]
+        vectors = embedder.compute_source_embeddings(texts)
+
+        # Sorted by length: (b, e) (cc, ddd) (aaaa) — padded per batch only.
+        assert session.shapes == [(2, 1), (2, 3), (1, 4)]
+        assert len(vectors) == 5
+        assert all(v == pytest.approx([0.5] * 4) for v in vectors)
+        assert embedder.compute_query_embeddings("q") == [pytest.approx([0.5] * 4)]
+
+
+class _SlowLengthEmbedFn:
+    """Embeds a text as ``[len(text)]``; the first batch blocks briefly so
+    concurrent requests queue up behind it."""
+
+    def __init__(self):
+        self.batches: list[list[str]] = []
+
+    def compute_source_embeddings(self, texts):
+        import time  # noqa: PLC0415
+
+        if not self.batches:
+            time.sleep(0.2)
+        self.batches.append(list(texts))
+        return [[float(len(t))] for t in texts]
+
+    def compute_query_embeddings(self, query):
+        return [[float(len(query))]]
+
+
+@pytest.fixture
+def embed_socket():
+    """A socket path short enough for AF_UNIX (tmp_path can exceed 108 bytes)."""
+    import shutil  # noqa: PLC0415
+    import tempfile  # noqa: PLC0415
+    from pathlib import Path  # noqa: PLC0415
+
+    root = tempfile.mkdtemp(prefix="wren-")
+    yield Path(root) / "e.sock"
+    shutil.rmtree(root, ignore_errors=True)
+
+
+@pytest.fixture
+def embed_server(embed_socket):
+    import threading  # noqa: PLC0415
+
+    from wren.memory.embedding_server import EmbeddingServer  # noqa: PLC0415
+
+    server = EmbeddingServer(embed_socket, "m", _SlowLengthEmbedFn())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.unit
+class TestEmbeddingDaemon:
+    def test_concurrent_clients_share_batches(self, embed_server):
+        from concurrent.futures import ThreadPoolExecutor  # noqa: PLC0415
+
+        from wren.memory.embeddings import RemoteEmbedding  # noqa: PLC0415
+
+        client = RemoteEmbedding("m", embed_server.socket_path)
+        texts = [["a" * n, "b" * (n + 1)] for n in range(1, 9)]
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(client.compute_source_embeddings, texts))
+
+        assert results == [[[float(n)], [float(n + 1)]] for n in range(1, 9)]
+        assert client.compute_query_embeddings("abc") == [[3.0]]
+        assert client._local is None  # never fell back
+        assert embed_server.batcher.batches < 8
+
+    def test_falls_back_in_process_without_daemon(self, embed_socket, monkeypatch):
+        from wren.memory.embeddings import RemoteEmbedding  # noqa: PLC0415
+
+        local = _StubEmbedFn(dim=2)
+        monkeypatch.setattr(
+            "wren.memory.embeddings.local_embedding_function", lambda _name: local
+        )
+        client = RemoteEmbedding("m", embed_socket)
+        assert client.compute_source_embeddings(["x"]) == [[0.1, 0.1]]
+        assert client.compute_query_embeddings("q") == [[0.1, 0.1]]
+
+    def test_model_mismatch_falls_back(self, embed_server, monkeypatch):
+        from wren.memory.embeddings import RemoteEmbedding  # noqa: PLC0415
+
+        local = _StubEmbedFn(dim=2)
+        monkeypatch.setattr(
+            "wren.memory.embeddings.local_embedding_function", lambda _name: local
+        )
+        client = RemoteEmbedding("other-model", embed_server.socket_path)
+        assert client.compute_source_embeddings(["x"]) == [[0.1, 0.1]]
+        assert embed_server.batcher.batches == 0
+
+    def test_get_embedding_function_uses_live_socket(
+        self, embed_server, embed_socket, monkeypatch
+    ):
+        from wren.memory.embeddings import (  # noqa: PLC0415
+            RemoteEmbedding,
+            get_embedding_function,
+        )
+
+        monkeypatch.setenv("WREN_EMBEDDING_SOCKET", str(embed_socket))
+        monkeypatch.delenv("WREN_EMBEDDING_BACKEND", raising=False)
+        assert isinstance(get_embedding_function("m"), RemoteEmbedding)
+
+    def test_second_daemon_refused_stale_socket_replaced(self, embed_server):
+        from wren.memory.embedding_server import EmbeddingServer  # noqa: PLC0415
+
+        with pytest.raises(RuntimeError, match="already listening"):
+            EmbeddingServer(embed_server.socket_path, "m", _SlowLengthEmbedFn())
+
+        embed_server.shutdown()
+        embed_server.socket.close()  # dies without unlinking its socket
+        assert embed_server.socket_path.exists()
+        replacement = EmbeddingServer(
+            embed_server.socket_path, "m", _SlowLengthEmbedFn()
+        )
+        replacement.server_close()
+        assert not embed_server.socket_path.exists()
+
+
 # ── MemoryStore integration tests ─────────────────────────────────────────
 # These require lancedb + sentence-transformers (wren[memory] extra).
 
@@ -983,6 +1212,293 @@ class TestMemoryStoreLazyModelLoad:
         assert results == [4] * 5
 
 
+class _RecordingEmbedFn(_StubEmbedFn):
+    def __init__(self, dim: int = 8):
+        super().__init__(dim)
+        self.embedded: list[str] = []
+
+    def compute_source_embeddings(self, texts):
+        self.embedded.extend(texts)
+        return super().compute_source_embeddings(texts)
+
+
+def _schema_rows(store) -> dict[str, dict]:
+    table = store._db.open_table("schema_items")
+    return {r["item_key"]: r for r in table.to_arrow().to_pylist()}
+
+
+@pytest.mark.unit
+class TestIncrementalSchemaIndex:
+    @pytest.fixture
+    def store(self, tmp_path, monkeypatch):
+        pytest.importorskip("lancedb", reason="wren[memory] extras not installed")
+        from wren.memory.store import MemoryStore  # noqa: PLC0415
+
+        store = MemoryStore(path=tmp_path)
+        monkeypatch.setattr(store, "_embed_fn_cached", _RecordingEmbedFn())
+        return store
+
+    def test_unchanged_manifest_embeds_nothing(self, store):
+        store.index_schema(_MANIFEST, seed_queries=False)
+        before = _schema_rows(store)
+        store._embed_fn.embedded.clear()
+
+        result = store.index_schema(_MANIFEST, seed_queries=False)
+
+        assert result["schema_items"] == 11
+        assert store._embed_fn.embedded == []
+        assert _schema_rows(store) == before
+        assert store.schema_is_current(_MANIFEST) is True
+
+    def test_changed_item_is_reembedded_alone(self, store):
+        import copy  # noqa: PLC0415
+
+        store.index_schema(_MANIFEST, seed_queries=False)
+        before = _schema_rows(store)
+        store._embed_fn.embedded.clear()
+
+        modified = copy.deepcopy(_MANIFEST)
+        modified["models"][1]["properties"]["description"] = "All customers"
+        store.index_schema(modified, seed_queries=False)
+
+        after = _schema_rows(store)
+        assert store._embed_fn.embedded == [after["model:customer:customer"]["text"]]
+        assert "All customers" in after["model:customer:customer"]["text"]
+        assert len(after) == len(before)
+        # Untouched rows keep the hash they were embedded under.
+        unchanged = after["column:orders:o_orderkey"]
+        assert unchanged == before["column:orders:o_orderkey"]
+        assert after["model:customer:customer"]["mdl_hash"] != unchanged["mdl_hash"]
+        assert store.schema_is_current(modified) is True
+        assert store.schema_is_current(_MANIFEST) is False
+
+    def test_append_after_sync_keeps_unchanged_rows_current(self, store):
+        import copy  # noqa: PLC0415
+
+        store.index_schema(_MANIFEST, seed_queries=False)
+        modified = copy.deepcopy(_MANIFEST)
+        modified["models"][1]["properties"]["description"] = "All customers"
+        store.index_schema(modified, seed_queries=False)
+
+        store.index_schema(modified, replace=False, seed_queries=False)
+
+        assert store.schema_is_current(modified) is True
+        rows = store._db.open_table("schema_items").to_arrow().to_pylist()
+        assert {r["mdl_hash"] for r in rows} == {manifest_hash(modified)}
+
+    def test_removed_items_are_deleted(self, store):
+        store.index_schema(_MANIFEST, seed_queries=False)
+        store._embed_fn.embedded.clear()
+
+        trimmed = {**_MANIFEST, "models": _MANIFEST["models"][:1]}
+        result = store.index_schema(trimmed, seed_queries=False)
+
+        rows = _schema_rows(store)
+        assert result["schema_items"] == len(rows)
+        assert not any(key.endswith(":customer:c_name") for key in rows)
+        assert "model:customer:customer" not in rows
+
+    def test_stale_index_returns_no_search_results(self, store):
+        store.index_schema(_MANIFEST, seed_queries=False)
+        modified = {**_MANIFEST, "catalog": "changed"}
+
+        result = store.get_context(modified, "customer", threshold=10)
+
+        assert result["results"] == []
+
+    def test_legacy_table_is_rebuilt(self, store):
+        import pyarrow as pa  # noqa: PLC0415
+
+        from wren.memory.store import _schema_items_arrow_schema  # noqa: PLC0415
+
+        legacy = pa.schema(
+            [f for f in _schema_items_arrow_schema(8) if f.name != "item_key"]
+        )
+        store._db.create_table("schema_items", schema=legacy)
+
+        store.index_schema(_MANIFEST, seed_queries=False)
+
+        assert len(store._embed_fn.embedded) == 11
+        assert "item_key" in store._db.open_table("schema_items").schema.names
+        assert store.schema_is_current(_MANIFEST) is True
+
+    def test_model_change_forces_full_reembed(self, store):
+        store.index_schema(_MANIFEST, seed_queries=False)
+        store._embed_fn.embedded.clear()
+        store._model_name = "another-model"
+
+        store.index_schema(_MANIFEST, seed_queries=False)
+
+        assert len(store._embed_fn.embedded) == 11
+
+    def test_reset_clears_index_state(self, store):
+        store.index_schema(_MANIFEST, seed_queries=False)
+        store.reset()
+        store._embed_fn.embedded.clear()
+
+        store.index_schema(_MANIFEST, seed_queries=False)
+
+        assert len(store._embed_fn.embedded) == 11
+
+
+class _HashEmbedFn:
+    """Deterministic, well-spread vectors so IVF training has real clusters."""
+
+    def __init__(self, dim: int = 16):
+        self.dim = dim
+
+    def _vec(self, text):
+        import hashlib  # noqa: PLC0415
+
+        digest = hashlib.sha256(text.encode()).digest()
+        return [b / 255.0 for b in digest[: self.dim]]
+
+    def compute_source_embeddings(self, texts):
+        return [self._vec(t) for t in texts]
+
+    def compute_query_embeddings(self, query):
+        return [self._vec(query)]
+
+
+@pytest.mark.unit
+class TestMemoryStoreIndexes:
+    @pytest.fixture
+    def make_store(self, tmp_path):
+        pytest.importorskip("lancedb", reason="wren[memory] extras not installed")
+        from wren.memory.store import MemoryStore  # noqa: PLC0415
+
+        def _make(**kwargs):
+            store = MemoryStore(path=tmp_path, **kwargs)
+            store._embed_fn_cached = _HashEmbedFn()
+            return store
+
+        return _make
+
+    def test_scalar_indexes_on_filter_columns(self, make_store):
+        store = make_store()
+        store.index_schema(_MANIFEST, seed_queries=False)
+        store.store_query(nl_query="q", sql_query="SELECT 1", datasource="pg")
+
+        health = store.index_health()
+        schema_cols = {c for ix in health["schema_items"] for c in ix["columns"]}
+        query_cols = {c for ix in health["query_history"] for c in ix["columns"]}
+        assert {"item_key", "mdl_hash", "item_type", "model_name"} <= schema_cols
+        assert {"datasource", "tags"} <= query_cols
+        assert "vector" not in schema_cols | query_cols
+
+    def test_ann_index_built_past_threshold(self, make_store):
+        store = make_store(ann_min_rows=300, nprobes=4, refine_factor=5)
+        pairs = [
+            {"nl": f"question {i}", "sql": f"SELECT {i}", "datasource": "pg"}
+            for i in range(300)
+        ]
+        store.load_queries(pairs, overwrite=True)
+
+        vector = [
+            ix
+            for ix in store.index_health()["query_history"]
+            if ix["columns"] == ["vector"]
+        ]
+        assert len(vector) == 1
+        assert vector[0]["indexed_rows"] == 300
+
+        store.store_query(nl_query="question 7", sql_query="SELECT 7")
+        results = store.recall_queries("question 7", limit=2)
+        assert results[0]["nl_query"] == "question 7"
+        status = store.status()
+        assert status["indexes"]["query_history"]
+        assert any(
+            ix["unindexed_rows"] == 1 for ix in status["indexes"]["query_history"]
+        )
+
+    def test_search_below_threshold_stays_exhaustive(self, make_store):
+        store = make_store(ann_min_rows=1000)
+        store.load_queries(
+            [{"nl": f"q {i}", "sql": f"SELECT {i}"} for i in range(50)],
+            overwrite=True,
+        )
+        columns = [ix["columns"] for ix in store.index_health()["query_history"]]
+        assert ["vector"] not in columns
+        assert store.recall_queries("q 3", limit=1)[0]["nl_query"] == "q 3"
+
+
+@pytest.mark.unit
+class TestHybridRecall:
+    @pytest.fixture
+    def store(self, tmp_path):
+        pytest.importorskip("lancedb", reason="wren[memory] extras not installed")
+        from wren.memory.store import MemoryStore  # noqa: PLC0415
+
+        store = MemoryStore(path=tmp_path)
+        # Hash vectors carry no meaning, so only the BM25 side can rank well;
+        # the table is small enough for every row to be a vector candidate.
+        store._embed_fn_cached = _HashEmbedFn()
+        pairs = [
+            {"nl": f"filler question {i}", "sql": f"SELECT {i} FROM t{i}"}
+            for i in range(10)
+        ]
+        pairs.append(
+            {
+                "nl": "largest orders",
+                "sql": "SELECT o_orderkey FROM orders ORDER BY o_totalprice DESC",
+                "datasource": "pg",
+            }
+        )
+        store.load_queries(pairs, overwrite=True)
+        return store
+
+    def test_exact_identifier_ranks_first(self, store):
+        results = store.recall_queries("o_totalprice", limit=3)
+        assert results[0]["nl_query"] == "largest orders"
+        assert "_relevance_score" in results[0]
+        assert "vector" not in results[0]
+        assert "_rowid" not in results[0]
+
+    def test_datasource_filter_applies_to_both_rankings(self, store):
+        assert store.recall_queries("o_totalprice", datasource="bq") == []
+        hits = store.recall_queries("o_totalprice", datasource="pg")
+        assert [h["nl_query"] for h in hits] == ["largest orders"]
+
+    def test_vector_mode_skips_fulltext(self, store):
+        results = store.recall_queries("o_totalprice", limit=3, mode="vector")
+        assert len(results) == 3
+        assert "_relevance_score" not in results[0]
+        assert "_distance" in results[0]
+
+    def test_unknown_mode_rejected(self, store):
+        with pytest.raises(ValueError, match="search mode"):
+            store.recall_queries("x", mode="bm25")
+
+    def test_fulltext_indexes_created(self, store):
+        store.index_schema(_MANIFEST, seed_queries=False)
+        health = store.index_health()
+        fts = {
+            table: {c for ix in indexes if ix["type"] == "FTS" for c in ix["columns"]}
+            for table, indexes in health.items()
+        }
+        assert fts == {
+            "schema_items": {"text"},
+            "query_history": {"nl_query", "sql_query"},
+        }
+
+    def test_schema_context_hybrid(self, store):
+        store.index_schema(_MANIFEST, seed_queries=False)
+        result = store.get_context(_MANIFEST, "o_totalprice", threshold=10, limit=3)
+        assert result["strategy"] == "search"
+        assert "o_totalprice" in [r["item_name"] for r in result["results"]]
+
+
+@pytest.mark.unit
+def test_rrf_fuse_rewards_agreement():
+    from wren.memory.store import _rrf_fuse  # noqa: PLC0415
+
+    vector = [{"_rowid": 1}, {"_rowid": 2}, {"_rowid": 3}]
+    text = [{"_rowid": 2}, {"_rowid": 4}, {"_rowid": 3}]
+    fused = _rrf_fuse([vector, text], limit=3)
+    assert [r["_rowid"] for r in fused] == [2, 3, 1]
+    assert fused[0]["_relevance_score"] > fused[2]["_relevance_score"]
+
+
 # ── WrenMemory public API tests ───────────────────────────────────────────
 
 
@@ -1205,6 +1721,26 @@ class TestMemoryStoreForget:
         _, total = memory_store.list_queries()
         assert total == 2
 
+    def test_forget_query_pairs_matches_only_the_loaded_rows(self, memory_store):
+        memory_store.load_queries([{"nl": "it's here", "sql": "SELECT 1"}])
+        # Same question from other sources: a different SQL, a different tag.
+        memory_store.store_query(nl_query="it's here", sql_query="SELECT 2")
+        memory_store.store_query(
+            nl_query="it's here", sql_query="SELECT 1", tags="source:seed"
+        )
+
+        gone = [
+            {"nl": "it's here", "sql": "SELECT 1", "source": "user"},
+            {"nl": "unknown", "sql": "SELECT 3"},
+        ]
+        assert memory_store.forget_query_pairs(gone) == 1
+        rows, total = memory_store.list_queries()
+        assert total == 2
+        assert {(r["sql_query"], r["tags"]) for r in rows} == {
+            ("SELECT 2", ""),
+            ("SELECT 1", "source:seed"),
+        }
+
     def test_forget_by_source(self, memory_store):
         memory_store.store_query(
             nl_query="seed q", sql_query="SELECT 1", tags="source:seed"
@@ -1229,52 +1765,12 @@ class TestMemoryStoreForget:
         assert memory_store.forget_queries_by_ids([0]) == 0
         assert memory_store.forget_queries_by_source("seed") == 0
 
-    def test_forget_rebuild_no_data_loss_on_conversion_failure(
-        self, memory_store, monkeypatch
-    ):
-        """pa.Table.from_pandas() must run BEFORE any destructive table
-        operation — a conversion failure must leave the original table +
-        all its rows untouched.
-
-        ``pyarrow.Table`` is an immutable Cython extension type — its
-        classmethods can't be monkeypatched on the real module (and lancedb
-        itself uses ``pa.Table.from_batches`` internally, so blanket-
-        replacing the real ``pyarrow.Table`` breaks unrelated lancedb
-        internals too). Instead, only the ``pa`` name bound in
-        ``wren.memory.store`` is swapped for a thin proxy that fails
-        ``Table.from_pandas`` and forwards everything else (``pa.schema``,
-        ``pa.field``, other ``pa.Table`` methods, ...) to the real module.
-        """
-        import pyarrow as real_pa  # noqa: PLC0415
-
-        _seed_pairs(memory_store, 3)
-
-        class _BoomTable:
-            # Only from_pandas is exercised by forget_queries_by_ids — no
-            # other pa.Table.* classmethod is called on this path.
-            @staticmethod
-            def from_pandas(*_args, **_kwargs):
-                raise RuntimeError("conversion boom")
-
-        class _PyarrowProxy:
-            def __getattr__(self, name):
-                if name == "Table":
-                    return _BoomTable
-                return getattr(real_pa, name)
-
-        monkeypatch.setattr("wren.memory.store.pa", _PyarrowProxy())
-        with pytest.raises(RuntimeError, match="conversion boom"):
-            memory_store.forget_queries_by_ids([0])
-        monkeypatch.undo()
-
-        _, total = memory_store.list_queries()
-        assert total == 3
-
-    def test_forget_rebuild_no_data_loss_on_create_table_failure(self, memory_store):
-        """The rebuild must not drop the original table before the
-        replacement table is safely created — a create_table failure must
-        leave the original table + all its rows untouched."""
+    def test_forget_by_ids_deletes_in_place(self, memory_store):
+        """Forgetting rows is a predicate delete: the table is never
+        rewritten, and the remaining rows keep their ids."""
         _seed_pairs(memory_store, 3)
+        before, _ = memory_store.list_queries()
+        ids = {r["nl_query"]: r["_row_id"] for r in before}
 
         def _boom_create(*_args, **_kwargs):
             raise RuntimeError("create_table boom")
@@ -1282,13 +1778,93 @@ class TestMemoryStoreForget:
         real_create_table = memory_store._db.create_table
         memory_store._db.create_table = _boom_create
         try:
-            with pytest.raises(RuntimeError, match="create_table boom"):
-                memory_store.forget_queries_by_ids([0])
+            deleted = memory_store.forget_queries_by_ids([ids["query number 1"]])
         finally:
             memory_store._db.create_table = real_create_table
 
-        _, total = memory_store.list_queries()
+        assert deleted == 1
+        after, total = memory_store.list_queries()
+        assert total == 2
+        assert {r["nl_query"]: r["_row_id"] for r in after} == {
+            "query number 0": ids["query number 0"],
+            "query number 2": ids["query number 2"],
+        }
+
+    def test_row_ids_survive_other_deletes(self, memory_store):
+        _seed_pairs(memory_store, 3)
+        rows, _ = memory_store.list_queries()
+        ids = {r["nl_query"]: r["_row_id"] for r in rows}
+
+        memory_store.forget_queries_by_ids([ids["query number 0"]])
+        # The old positional ids would now point at a different pair.
+        assert memory_store.forget_queries_by_ids([ids["query number 2"]]) == 1
+        rows, total = memory_store.list_queries()
+        assert total == 1
+        assert rows[0]["nl_query"] == "query number 1"
+
+    def test_concurrent_stores_get_distinct_ids(self, memory_store):
+        from concurrent.futures import ThreadPoolExecutor  # noqa: PLC0415
+
+        def _store(i):
+            memory_store.store_query(nl_query=f"question {i}", sql_query=f"SELECT {i}")
+
+        # Create the tables first: only id allocation is under test here.
+        _store(0)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(_store, range(1, 16)))
+
+        rows, total = memory_store.list_queries(limit=20)
+        assert total == 16
+        assert len({r["_row_id"] for r in rows}) == 16
+        assert memory_store.forget_queries_by_ids([rows[0]["_row_id"]]) == 1
+
+    def test_back_to_back_stores_skip_the_id_scan_and_upkeep(
+        self, memory_store, monkeypatch
+    ):
+        import wren.memory.store as store_mod  # noqa: PLC0415
+
+        memory_store.store_query(nl_query="first", sql_query="SELECT 0")
+        scans, upkeeps = [], []
+        real_scan = store_mod._scan
+        monkeypatch.setattr(
+            store_mod, "_scan", lambda *a, **k: scans.append(1) or real_scan(*a, **k)
+        )
+        monkeypatch.setattr(memory_store, "_ensure_indexes", upkeeps.append)
+        for i in range(1, 4):
+            memory_store.store_query(nl_query=f"q{i}", sql_query=f"SELECT {i}")
+        assert scans == [] and upkeeps == []
+
+        # Another writer moves the table on: the next id is scanned again.
+        memory_store.forget_queries_by_ids([1])
+        memory_store.store_query(nl_query="last", sql_query="SELECT 9")
+        assert scans
+        rows, _ = memory_store.list_queries(limit=10)
+        assert sorted(r["_row_id"] for r in rows) == [0, 2, 3, 4]
+
+    def test_legacy_table_gets_positional_ids(self, memory_store):
+        _seed_pairs(memory_store, 3)
+        table = memory_store._db.open_table("query_history")
+        legacy = table.to_arrow().drop_columns(["query_id"])
+        memory_store._db.create_table(
+            "query_history", legacy, schema=legacy.schema, mode="overwrite"
+        )
+        version = memory_store._db.open_table("query_history").version
+
+        # Reads synthesize the positional ids without rewriting the table.
+        rows, total = memory_store.list_queries(source="user", limit=2, offset=1)
         assert total == 3
+        assert [(r["_row_id"], r["nl_query"]) for r in rows] == [
+            (1, "query number 1"),
+            (0, "query number 0"),
+        ]
+        assert len(memory_store.dump_queries()) == 3
+        assert memory_store._db.open_table("query_history").version == version
+
+        assert memory_store.forget_queries_by_ids([1]) == 1
+        assert [r["nl_query"] for r in memory_store.dump_queries()] == [
+            "query number 0",
+            "query number 2",
+        ]
 
 
 @pytest.mark.unit
@@ -1359,6 +1935,15 @@ class TestMemoryStoreLoad:
         rows = memory_store.dump_queries()
         assert rows[0]["datasource"] == "pg"
 
+    def test_load_upsert_keeps_row_id(self, memory_store):
+        memory_store.load_queries([{"nl": "revenue", "sql": "SELECT old"}])
+        (before,), _ = memory_store.list_queries()
+
+        memory_store.load_queries([{"nl": "revenue", "sql": "SELECT new"}], upsert=True)
+        (after,), _ = memory_store.list_queries()
+        assert after["sql_query"] == "SELECT new"
+        assert after["_row_id"] == before["_row_id"]
+
     def test_existing_pairs_index(self, memory_store):
         memory_store.store_query(nl_query="a", sql_query="SELECT 1")
         memory_store.store_query(nl_query="b", sql_query="SELECT 2")
@@ -1412,9 +1997,308 @@ class TestMemoryStoreLoad:
         assert sql_by_nl["dup q"] == "SELECT OLD"
 
 
+class _BatchCountingEmbedFn(_StubEmbedFn):
+    def __init__(self, dim: int = 8):
+        super().__init__(dim)
+        self.calls: list[int] = []
+
+    def compute_source_embeddings(self, texts):
+        self.calls.append(len(texts))
+        return super().compute_source_embeddings(texts)
+
+
+@pytest.mark.unit
+class TestMemoryStoreBulkLoad:
+    @pytest.fixture
+    def store(self, tmp_path, monkeypatch):
+        pytest.importorskip("lancedb", reason="wren[memory] extras not installed")
+        from wren.memory.store import MemoryStore  # noqa: PLC0415
+
+        store = MemoryStore(path=tmp_path, embed_batch_size=4)
+        monkeypatch.setattr(store, "_embed_fn_cached", _BatchCountingEmbedFn())
+        return store
+
+    def test_default_mode_embeds_in_batches_and_adds_once(self, store):
+        store.store_query(nl_query="q0", sql_query="SELECT 0", tags="source:user")
+        store._embed_fn.calls.clear()
+        fragments = store._db.open_table("query_history").stats()["fragment_stats"]
+
+        pairs = [{"nl": f"q{i}", "sql": f"SELECT {i}"} for i in range(10)]
+        result = store.load_queries(pairs)
+
+        assert result == {"loaded": 9, "skipped": 1, "updated": 0}
+        assert store._embed_fn.calls == [4, 4, 1]
+        stats = store._db.open_table("query_history").stats()["fragment_stats"]
+        assert stats["num_fragments"] == fragments["num_fragments"] + 1
+        assert len(store.dump_queries()) == 10
+
+    def test_small_fragments_are_compacted(self, store, monkeypatch):
+        monkeypatch.setattr("wren.memory.store._COMPACT_MIN_FRAGMENTS", 3)
+        for i in range(6):
+            store.store_query(nl_query=f"q{i}", sql_query=f"SELECT {i}")
+
+        table = store._db.open_table("query_history")
+        assert table.stats()["fragment_stats"]["num_fragments"] < 3
+        assert table.count_rows() == 6
+
+
+@pytest.mark.unit
+class TestMemoryStoreOptimize:
+    @pytest.fixture
+    def store(self, tmp_path, monkeypatch):
+        pytest.importorskip("lancedb", reason="wren[memory] extras not installed")
+        from wren.memory.store import MemoryStore  # noqa: PLC0415
+
+        monkeypatch.setattr("wren.memory.store._COMPACT_MIN_FRAGMENTS", 1000)
+        store = MemoryStore(path=tmp_path)
+        monkeypatch.setattr(store, "_embed_fn_cached", _StubEmbedFn(8))
+        for i in range(8):
+            store.store_query(nl_query=f"q{i}", sql_query=f"SELECT {i}")
+        return store
+
+    def test_optimize_compacts_and_prunes_versions(self, store):
+        from datetime import timedelta  # noqa: PLC0415
+
+        with pytest.warns(UserWarning):  # LanceDB warns on a zero retention
+            report = store.optimize(retention=timedelta(0))
+
+        stats = report["query_history"]
+        assert stats["rows"] == 8
+        assert stats["fragments_before"] == 8
+        assert stats["fragments_after"] < stats["fragments_before"]
+        assert stats["versions_after"] < stats["versions_before"]
+        assert len(store.dump_queries()) == 8
+
+    def test_retention_window_keeps_recent_versions(self, store):
+        report = store.optimize()
+        stats = report["query_history"]
+        assert stats["versions_after"] >= stats["versions_before"]
+
+    def test_maintenance_thread_runs_optimize(self, store):
+        from wren.memory.maintenance import (  # noqa: PLC0415
+            MemoryMaintenance,
+            format_report,
+        )
+
+        maintenance = MemoryMaintenance(store._path, interval=3600)
+        report = maintenance.run_once()
+
+        assert maintenance.runs == 1
+        assert report["query_history"]["fragments_before"] == 8
+        (line,) = format_report(report)
+        assert line.startswith("query_history: 8 rows, 8 → ")
+
+    def test_maintenance_skips_missing_store(self, tmp_path):
+        from wren.memory.maintenance import MemoryMaintenance  # noqa: PLC0415
+
+        maintenance = MemoryMaintenance(tmp_path / "absent", interval=3600)
+        assert maintenance.run_once() is None
+        maintenance.start()
+        maintenance.stop()
+        assert not maintenance.is_alive()
+
+
+@pytest.mark.unit
+class TestVectorStorage:
+    @pytest.fixture
+    def make_store(self, tmp_path, monkeypatch):
+        pytest.importorskip("lancedb", reason="wren[memory] extras not installed")
+        from wren.memory.store import MemoryStore  # noqa: PLC0415
+
+        def make(**kwargs):
+            store = MemoryStore(path=tmp_path, **kwargs)
+            monkeypatch.setattr(store, "_embed_fn_cached", _StubEmbedFn(8))
+            return store
+
+        return make
+
+    def test_float16_store_round_trips(self, make_store):
+        store = make_store(vector_dtype="float16")
+        store.store_query(nl_query="revenue by month", sql_query="SELECT 1")
+        store.store_query(nl_query="top customers", sql_query="SELECT 2")
+
+        vector = store._db.open_table("query_history").schema.field("vector")
+        assert str(vector.type.value_type) == "halffloat"
+        for mode in ("vector", "hybrid"):
+            hits = store.recall_queries("revenue by month", limit=2, mode=mode)
+            assert len(hits) == 2
+            assert all("vector" not in hit for hit in hits)
+        assert store.status()["vectors"] == {"query_history": "halffloat"}
+
+    def test_optimize_converts_existing_vectors(self, make_store):
+        old = make_store()
+        questions = ["revenue by month", "top customers", "late shipments", "open"]
+        for i, question in enumerate(questions):
+            old.store_query(nl_query=question, sql_query=f"SELECT {i}")
+
+        store = make_store(vector_dtype="float16")
+        # Only an explicit request converts; maintenance passes never do.
+        assert store.optimize()["query_history"]["vectors_converted"] is False
+        report = store.optimize(convert_vectors=True)
+
+        assert report["query_history"]["vectors_converted"] is True
+        table = store._db.open_table("query_history")
+        assert str(table.schema.field("vector").type.value_type) == "halffloat"
+        assert len(store.dump_queries()) == 4
+        assert (
+            store.recall_queries("late shipments", limit=1)[0]["sql_query"]
+            == "SELECT 2"
+        )
+        report = store.optimize(convert_vectors=True)
+        assert report["query_history"]["vectors_converted"] is False
+
+    def test_unknown_vector_dtype(self, make_store):
+        with pytest.raises(ValueError, match="vector dtype"):
+            make_store(vector_dtype="int8")
+
+
+class _CountingQueryEmbedFn(_StubEmbedFn):
+    def __init__(self, dim: int = 8):
+        super().__init__(dim)
+        self.queries: list[str] = []
+
+    def compute_query_embeddings(self, query):
+        self.queries.append(query)
+        return super().compute_query_embeddings(query)
+
+
+@pytest.mark.unit
+class TestRecallCache:
+    @pytest.fixture
+    def make_store(self, tmp_path, monkeypatch):
+        pytest.importorskip("lancedb", reason="wren[memory] extras not installed")
+        from wren.memory.store import MemoryStore  # noqa: PLC0415
+
+        def make():
+            store = MemoryStore(path=tmp_path)
+            embed_fn = _CountingQueryEmbedFn()
+            monkeypatch.setattr(store, "_embed_fn_cached", embed_fn)
+            return store, embed_fn
+
+        return make
+
+    def test_repeated_recall_is_served_from_cache(self, make_store):
+        store, embed_fn = make_store()
+        store.store_query(nl_query="revenue by month", sql_query="SELECT 1")
+
+        first = store.recall_queries("revenue by month")
+        first[0]["sql_query"] = "mutated by caller"
+        again = store.recall_queries("  revenue   by month ")
+
+        assert again[0]["sql_query"] == "SELECT 1"
+        assert embed_fn.queries == ["revenue by month"]
+        # A store built later in the process (e.g. per MCP call) shares it.
+        other, other_fn = make_store()
+        assert other.recall_queries("revenue by month") == again
+        assert other_fn.queries == []
+
+    def test_writes_invalidate_cached_results(self, make_store):
+        store, embed_fn = make_store()
+        store.store_query(nl_query="revenue by month", sql_query="SELECT 1")
+        assert len(store.recall_queries("revenue", limit=5)) == 1
+
+        store.store_query(nl_query="revenue by region", sql_query="SELECT 2")
+        assert len(store.recall_queries("revenue", limit=5)) == 2
+        # The question's embedding is still reused.
+        assert embed_fn.queries == ["revenue"]
+
+    def test_filters_and_limits_are_part_of_the_key(self, make_store):
+        store, _ = make_store()
+        store.store_query(nl_query="q1", sql_query="SELECT 1", datasource="pg")
+        store.store_query(nl_query="q2", sql_query="SELECT 2", datasource="mysql")
+
+        assert len(store.recall_queries("q", limit=5)) == 2
+        assert len(store.recall_queries("q", limit=1)) == 1
+        assert len(store.recall_queries("q", limit=5, datasource="pg")) == 1
+
+    def test_lru_cache_evicts_and_can_be_disabled(self):
+        from wren.memory.recall_cache import LRUCache  # noqa: PLC0415
+
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        assert cache.get("b") is None and cache.get("a") == 1
+        assert (cache.hits, cache.misses) == (2, 1)
+
+        disabled = LRUCache(maxsize=0)
+        disabled.put("a", 1)
+        assert disabled.get("a") is None
+
+
 # ── CLI dump/load YAML round-trip tests ──────────────────────────────────
 
 
+@pytest.mark.unit
+class TestMemoryService:
+    @pytest.fixture
+    def service(self, tmp_path, monkeypatch):
+        pytest.importorskip("lancedb", reason="wren[memory] extras not installed")
+        from wren.memory.service import MemoryService  # noqa: PLC0415
+
+        monkeypatch.setattr(
+            "wren.memory.store.get_embedding_function", lambda _name: _StubEmbedFn(8)
+        )
+        return MemoryService(tmp_path / "shared")
+
+    def test_project_namespace_is_stable_and_valid(self, tmp_path):
+        from wren.memory.service import project_namespace  # noqa: PLC0415
+        from wren.memory.store import _check_namespace  # noqa: PLC0415
+
+        ns = project_namespace(tmp_path / "Sales Analytics")
+        assert ns == project_namespace(tmp_path / "x" / ".." / "Sales Analytics")
+        assert ns.startswith("sales-analytics-")
+        assert ns != project_namespace(tmp_path / "other" / "Sales Analytics")
+        assert _check_namespace(ns) == ns
+
+    def test_invalid_namespace_rejected(self, tmp_path):
+        pytest.importorskip("lancedb", reason="wren[memory] extras not installed")
+        from wren.memory.store import MemoryStore  # noqa: PLC0415
+
+        for bad in ("", "a__b", "../x", "with space"):
+            with pytest.raises(ValueError):
+                MemoryStore(path=tmp_path, namespace=bad)
+
+    def test_namespaces_are_isolated_in_one_directory(self, service, tmp_path):
+        sales = service.store_for(tmp_path / "sales")
+        ops = service.store_for(tmp_path / "ops")
+        assert service.store_for(tmp_path / "sales") is sales
+
+        sales.store_query(nl_query="revenue by month", sql_query="SELECT 1")
+        ops.store_query(nl_query="late shipments", sql_query="SELECT 2")
+        ops.store_query(nl_query="open tickets", sql_query="SELECT 3")
+
+        assert [q["sql_query"] for q in sales.dump_queries()] == ["SELECT 1"]
+        assert len(ops.dump_queries()) == 2
+        assert service.namespaces() == sorted([sales.namespace, ops.namespace])
+        status = service.status()["namespaces"]
+        assert status[ops.namespace]["query_history"] == 2
+
+        report = service.optimize()
+        assert set(report) == {
+            f"{sales.namespace}__query_history",
+            f"{ops.namespace}__query_history",
+            "embedding_cache",
+        }
+
+    def test_shared_dir_routes_project_stores(self, tmp_path, monkeypatch):
+        pytest.importorskip("lancedb", reason="wren[memory] extras not installed")
+        from wren.memory.index_backend import get_index  # noqa: PLC0415
+        from wren.memory.service import (  # noqa: PLC0415
+            project_namespace,
+            project_store,
+        )
+
+        project = tmp_path / "proj"
+        assert project_store(project).namespace is None
+        monkeypatch.setenv("WREN_MEMORY_SHARED_DIR", str(tmp_path / "shared"))
+        store = project_store(project)
+        assert store.namespace == project_namespace(project)
+        assert store._path == (tmp_path / "shared").resolve()
+        assert get_index(project, None)._store is store
+
+
 @pytest.mark.unit
 class TestYamlRoundTrip:
     def test_pairs_to_yaml_and_back(self, memory_store):
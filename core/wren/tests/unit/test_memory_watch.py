@@ -17,9 +17,14 @@ from wren.cli import app
 from wren.memory.markdown import write_query_markdown
 from wren.memory.watch import (
     MIN_INTERVAL_SECONDS,
+    ChangeSet,
     WatchState,
     compute_fingerprint,
+    diff_snapshots,
+    inotify_available,
     poll_once,
+    take_snapshot,
+    watch_changes,
     watch_loop,
 )
 
@@ -230,6 +235,113 @@ def test_watch_loop_clamps_interval(tmp_path, monkeypatch):
     assert all(s >= MIN_INTERVAL_SECONDS for s in seen)
 
 
+# ── Classified changes (watch_changes) ───────────────────────────────────────
+
+
+def _md_rels(project):
+    return sorted(
+        p.relative_to(project).as_posix()
+        for p in (project / "knowledge" / "sql").glob("*.md")
+    )
+
+
+def test_diff_snapshots_classifies_changes(tmp_path):
+    _touch_mdl(tmp_path, '{"v": 1}')
+    write_query_markdown(tmp_path, "Kept", "SELECT 1")
+    write_query_markdown(tmp_path, "Edited", "SELECT 2")
+    write_query_markdown(tmp_path, "Deleted", "SELECT 3")
+    before = take_snapshot(tmp_path)
+    deleted, edited, kept = _md_rels(tmp_path)
+
+    (tmp_path / deleted).unlink()
+    write_query_markdown(tmp_path, "Edited", "SELECT 22")
+    write_query_markdown(tmp_path, "Added", "SELECT 4")
+    changes = diff_snapshots(before, take_snapshot(tmp_path))
+
+    assert changes.mdl is False
+    assert kept not in changes.changed
+    assert edited in changes.changed and len(changes.changed) == 2
+    assert changes.removed == (deleted,)
+
+    time.sleep(0.01)
+    snap = take_snapshot(tmp_path)
+    _touch_mdl(tmp_path, '{"v": 2}')
+    assert diff_snapshots(snap, take_snapshot(tmp_path)) == ChangeSet(mdl=True)
+    assert not diff_snapshots(snap, snap)
+
+
+def test_watch_changes_polling_applies_only_the_edit(tmp_path):
+    _touch_mdl(tmp_path)
+    write_query_markdown(tmp_path, "Existing", "SELECT 1")
+    applied: list[ChangeSet] = []
+
+    def fake_sleep(_seconds):
+        if not getattr(fake_sleep, "done", False):
+            write_query_markdown(tmp_path, "New pair", "SELECT 2")
+            fake_sleep.done = True
+
+    state = watch_changes(
+        tmp_path,
+        applied.append,
+        use_inotify=False,
+        max_polls=2,
+        sleep=fake_sleep,
+    )
+
+    assert state.mode == "poll"
+    assert state.reindexes == 1
+    assert applied == [ChangeSet(changed=("knowledge/sql/new-pair.md",))]
+
+
+def test_watch_changes_retries_failed_apply(tmp_path):
+    _touch_mdl(tmp_path)
+    attempts: list[ChangeSet] = []
+
+    def flaky(changes):
+        attempts.append(changes)
+        if len(attempts) == 1:
+            raise RuntimeError("transient")
+
+    state = watch_changes(
+        tmp_path,
+        flaky,
+        use_inotify=False,
+        max_polls=2,
+        reindex_on_start=True,
+        sleep=lambda _s: None,
+    )
+
+    assert state.errors == 1 and state.reindexes == 1
+    assert attempts[0] == attempts[1] == ChangeSet(mdl=True)
+
+
+@pytest.mark.skipif(not inotify_available(), reason="inotify is Linux-only")
+def test_watch_changes_inotify_wakes_without_polling(tmp_path):
+    import threading  # noqa: PLC0415
+
+    _touch_mdl(tmp_path)
+    (tmp_path / "knowledge" / "sql").mkdir(parents=True)
+    applied: list[ChangeSet] = []
+    result: list[WatchState] = []
+    thread = threading.Thread(
+        target=lambda: result.append(
+            watch_changes(
+                tmp_path, applied.append, interval=30.0, debounce=0.05, max_polls=1
+            )
+        )
+    )
+    start = time.monotonic()
+    thread.start()
+    time.sleep(0.2)
+    write_query_markdown(tmp_path, "Fast edit", "SELECT 1")
+    thread.join(timeout=10)
+
+    assert not thread.is_alive()
+    assert time.monotonic() - start < 5  # woke on the event, not the 30 s interval
+    assert result[0].mode == "inotify"
+    assert applied == [ChangeSet(changed=("knowledge/sql/fast-edit.md",))]
+
+
 # ── CLI guard (grep backend has no derived index to watch) ────────────────────
 
 
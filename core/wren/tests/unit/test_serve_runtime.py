@@ -0,0 +1,213 @@
+"""Tests for wren.serve_runtime metrics and admission-control helpers."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from wren.serve_runtime import (
+    LATENCY_BUCKETS,
+    SessionRateLimiter,
+    SingleFlight,
+    ToolBusyError,
+    ToolMetrics,
+)
+
+pytestmark = pytest.mark.unit
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_queue_then_track_moves_call_to_in_flight():
+    metrics = ToolMetrics()
+    metrics.enqueue("run_sql")
+    metrics.enqueue("run_sql")
+    assert metrics.snapshot()["queue_depth"] == 2
+
+    with metrics.track("run_sql"):
+        snap = metrics.snapshot()
+        assert snap["queue_depth"] == 1
+        assert snap["in_flight"] == 1
+
+    metrics.dequeue("run_sql")
+    snap = metrics.snapshot()
+    assert snap["queue_depth"] == 0
+    assert snap["in_flight"] == 0
+    assert snap["tools"]["run_sql"]["calls"] == 1
+
+
+def test_track_records_latency_bucket_and_errors():
+    clock = _Clock()
+    metrics = ToolMetrics(clock=clock)
+
+    metrics.enqueue("dry_run")
+    with metrics.track("dry_run"):
+        clock.now += 0.2
+    metrics.enqueue("dry_run")
+    with pytest.raises(RuntimeError):
+        with metrics.track("dry_run"):
+            clock.now += 100
+            raise RuntimeError("boom")
+
+    stats = metrics.snapshot()["tools"]["dry_run"]
+    assert stats["calls"] == 2
+    assert stats["errors"] == 1
+    assert stats["latency_sum"] == pytest.approx(100.2)
+    assert stats["bucket_counts"][LATENCY_BUCKETS.index(0.25)] == 1
+    assert stats["bucket_counts"][-1] == 1
+
+
+def test_render_prometheus_histogram_is_cumulative():
+    clock = _Clock()
+    metrics = ToolMetrics(clock=clock)
+    for elapsed in (0.001, 0.3):
+        metrics.enqueue("list_models")
+        with metrics.track("list_models"):
+            clock.now += elapsed
+
+    text = metrics.render_prometheus()
+
+    assert "wren_mcp_in_flight 0" in text
+    assert (
+        'wren_mcp_tool_latency_seconds_bucket{tool="list_models",le="0.005"} 1' in text
+    )
+    assert 'wren_mcp_tool_latency_seconds_bucket{tool="list_models",le="0.5"} 2' in text
+    assert (
+        'wren_mcp_tool_latency_seconds_bucket{tool="list_models",le="+Inf"} 2' in text
+    )
+    assert 'wren_mcp_tool_latency_seconds_count{tool="list_models"} 2' in text
+
+
+def test_session_rate_limiter_refills_per_session():
+    clock = _Clock()
+    limiter = SessionRateLimiter(rate=2.0, burst=2, clock=clock)
+    alice, bob = _Clock(), _Clock()  # any weak-referenceable object
+
+    assert limiter.acquire(alice) == 0.0
+    assert limiter.acquire(alice) == 0.0
+    assert limiter.acquire(alice) == pytest.approx(0.5)
+    assert limiter.acquire(bob) == 0.0
+
+    clock.now += 0.5
+    assert limiter.acquire(alice) == 0.0
+
+
+def test_tool_busy_error_message_is_json():
+    err = ToolBusyError("run_sql", "busy", 1.23456)
+
+    assert json.loads(str(err)) == {
+        "error": "busy",
+        "tool": "run_sql",
+        "reason": "busy",
+        "retry_after": 1.235,
+    }
+
+
+def test_render_prometheus_reports_rejections():
+    metrics = ToolMetrics()
+    metrics.reject("run_sql", "busy")
+    metrics.reject("run_sql", "busy")
+
+    text = metrics.render_prometheus()
+
+    assert 'wren_mcp_tool_rejected_total{tool="run_sql",reason="busy"} 2' in text
+
+
+def test_single_flight_shares_one_execution_between_concurrent_callers():
+    anyio = pytest.importorskip("anyio")
+    metrics = ToolMetrics()
+    flight = SingleFlight(metrics)
+    calls = []
+    results = []
+
+    async def scenario():
+        release = anyio.Event()
+
+        async def execute():
+            calls.append(1)
+            await release.wait()
+            return "rows"
+
+        async def call():
+            results.append(await flight.do("run_sql", "k", execute))
+
+        async with anyio.create_task_group() as tg:
+            for _ in range(3):
+                tg.start_soon(call)
+            while metrics.snapshot()["tools"].get("run_sql", {}).get("coalesced") != 2:
+                await anyio.sleep(0.001)
+            release.set()
+
+        # Completed flights are not cached.
+        async def fresh():
+            return "fresh"
+
+        assert await flight.do("run_sql", "k", fresh) == "fresh"
+
+    anyio.run(scenario)
+
+    assert results == ["rows"] * 3
+    assert len(calls) == 1
+    stats = metrics.snapshot()["tools"]["run_sql"]
+    assert stats["coalesced"] == 2
+    assert stats["coalescing_ratio"] == pytest.approx(2 / 4)
+
+
+def test_single_flight_propagates_leader_error():
+    anyio = pytest.importorskip("anyio")
+    flight = SingleFlight()
+
+    async def fail():
+        raise ValueError("bad sql")
+
+    async def one():
+        return 1
+
+    async def scenario():
+        with pytest.raises(ValueError, match="bad sql"):
+            await flight.do("run_sql", "k", fail)
+        assert await flight.do("run_sql", "k", one) == 1
+
+    anyio.run(scenario)
+
+
+def test_single_flight_waiter_takes_over_from_a_cancelled_leader():
+    anyio = pytest.importorskip("anyio")
+    flight = SingleFlight()
+    results = []
+
+    async def scenario():
+        started = anyio.Event()
+        leader = anyio.CancelScope()
+
+        async def hang():
+            started.set()
+            await anyio.sleep_forever()
+
+        async def answer():
+            return "rows"
+
+        async def lead():
+            with leader:
+                await flight.do("run_sql", "k", hang)
+
+        async def follow():
+            results.append(await flight.do("run_sql", "k", answer))
+
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(lead)
+            await started.wait()
+            tg.start_soon(follow)
+            await anyio.sleep(0.01)
+            leader.cancel()
+
+    anyio.run(scenario)
+
+    assert results == ["rows"]
@@ -0,0 +1,175 @@
+"""Persisted BM25 token index behind the grep recall backend."""
+
+from __future__ import annotations
+
+import json
+import os
+
+import pytest
+
+from wren.memory.markdown import write_query_markdown
+from wren.memory.token_index import (
+    INDEX_FILE,
+    SUBSTRING_BOOST,
+    TokenIndex,
+    get_token_index,
+)
+
+pytestmark = pytest.mark.unit
+
+
+def _seed(project):
+    write_query_markdown(
+        project, "Total revenue by month", "SELECT month, SUM(amount) FROM orders"
+    )
+    write_query_markdown(
+        project, "Number of customers", "SELECT COUNT(*) FROM customers"
+    )
+    write_query_markdown(project, "Revenue per region", "SELECT region FROM orders")
+
+
+def _touch(path, text):
+    """Rewrite *path* with a distinct size so the stat signature changes."""
+    path.write_text(text, encoding="utf-8")
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+
+def test_index_is_persisted_and_reloaded_without_parsing(tmp_path):
+    _seed(tmp_path)
+    assert TokenIndex(tmp_path).refresh() == 3
+
+    data = json.loads((tmp_path / ".wren" / INDEX_FILE).read_text())
+    assert len(data["docs"]) == 3
+    assert "revenue" in data["postings"]
+
+    fresh = TokenIndex(tmp_path)
+    assert fresh.refresh() == 0
+    assert len(fresh) == 3
+
+
+def test_only_changed_files_are_reparsed(tmp_path):
+    _seed(tmp_path)
+    index = TokenIndex(tmp_path, rescan_interval=0)
+    index.refresh()
+
+    md = tmp_path / "knowledge" / "sql" / "number-of-customers.md"
+    _touch(md, "---\nnl: Number of active shoppers\nsql: SELECT 1\n---\n")
+    assert index.refresh() == 1
+    assert index.search("shoppers")[0][1]["nl"] == "Number of active shoppers"
+    assert index.refresh() == 0
+
+
+def test_deleted_files_drop_out(tmp_path):
+    _seed(tmp_path)
+    index = TokenIndex(tmp_path)
+    assert len(index) == 3
+
+    (tmp_path / "knowledge" / "sql" / "revenue-per-region.md").unlink()
+    assert index.refresh() == 0
+    assert [p["nl"] for p in index.pairs()] == [
+        "Number of customers",
+        "Total revenue by month",
+    ]
+
+
+def test_in_process_writes_are_seen_before_the_rescan_interval(tmp_path):
+    _seed(tmp_path)
+    index = TokenIndex(tmp_path, rescan_interval=3600)
+    index.search("revenue")
+
+    # Same NL → updated in place: the directory listing does not change.
+    write_query_markdown(tmp_path, "Number of customers", "SELECT COUNT(id) FROM users")
+    hits = index.search("customers")
+    assert hits[0][1]["sql"] == "SELECT COUNT(id) FROM users"
+
+
+def test_bm25_ranking_and_substring_boost(tmp_path):
+    _seed(tmp_path)
+    index = TokenIndex(tmp_path)
+
+    hits = index.search("orders revenue", limit=3)
+    assert {p["nl"] for _, p in hits} == {
+        "Total revenue by month",
+        "Revenue per region",
+    }
+    assert all(0 < score < SUBSTRING_BOOST for score, _ in hits)
+
+    top_score, top = index.search("revenue per reg", limit=1)[0]
+    assert top["nl"] == "Revenue per region"
+    assert top_score > SUBSTRING_BOOST
+
+
+def test_corrupt_cache_falls_back_to_full_parse(tmp_path):
+    _seed(tmp_path)
+    TokenIndex(tmp_path).refresh()
+    (tmp_path / ".wren" / INDEX_FILE).write_text("{not json", encoding="utf-8")
+
+    index = TokenIndex(tmp_path)
+    assert index.refresh() == 3
+    assert index.search("customers")[0][1]["nl"] == "Number of customers"
+
+
+def test_load_query_pairs_reads_the_packed_cache(tmp_path, monkeypatch):
+    from wren.memory import token_index  # noqa: PLC0415
+    from wren.memory.markdown import load_query_pairs  # noqa: PLC0415
+
+    _seed(tmp_path)
+    assert load_query_pairs(tmp_path, cached=True) == load_query_pairs(tmp_path)
+
+    parsed = []
+    original = token_index._pair_from_markdown
+    monkeypatch.setattr(
+        token_index,
+        "_pair_from_markdown",
+        lambda md, project: parsed.append(md.name) or original(md, project),
+    )
+    md = tmp_path / "knowledge" / "sql" / "number-of-customers.md"
+    _touch(md, "---\nnl: Number of active shoppers\nsql: SELECT 1\n---\n")
+
+    pairs = load_query_pairs(tmp_path, cached=True)
+    assert parsed == ["number-of-customers.md"]
+    assert "Number of active shoppers" in {p["nl"] for p in pairs}
+    assert len(pairs) == 3
+
+
+def test_load_query_pairs_parses_exact_values_by_default(tmp_path):
+    import datetime  # noqa: PLC0415
+
+    from wren.memory.markdown import load_query_pairs  # noqa: PLC0415
+
+    sql_dir = tmp_path / "knowledge" / "sql"
+    sql_dir.mkdir(parents=True)
+    (sql_dir / "daily.md").write_text(
+        "---\nnl: Orders per day\nsql: SELECT 1\ntags: [2024-01-31]\n---\n",
+        encoding="utf-8",
+    )
+
+    assert load_query_pairs(tmp_path)[0]["tags"] == [datetime.date(2024, 1, 31)]
+    assert not (tmp_path / ".wren" / INDEX_FILE).exists()
+    assert load_query_pairs(tmp_path, cached=True)[0]["tags"] == ["2024-01-31"]
+
+
+def test_slug_collision_chain_uses_cached_nls(tmp_path, monkeypatch):
+    from wren.memory import markdown  # noqa: PLC0415
+
+    prefix = "Revenue " * 10  # slugs truncate to the same 60-character base
+    paths = [
+        write_query_markdown(tmp_path, f"{prefix}{suffix}", "SELECT 1")
+        for suffix in ("north", "south", "east")
+    ]
+    assert [p.stem[-2:] for p in paths[1:]] == ["-2", "-3"]
+    get_token_index(tmp_path).refresh(force=True)
+
+    parsed = []
+    original = markdown.parse_query_markdown
+    monkeypatch.setattr(
+        markdown,
+        "parse_query_markdown",
+        lambda path: parsed.append(path.name) or original(path),
+    )
+    again = write_query_markdown(tmp_path, f"{prefix}east", "SELECT 2")
+
+    assert again == paths[2]
+    # The base file, then the existing body of the reused file.
+    assert parsed == [paths[0].name, paths[2].name]